@@ -1,6 +1,36 @@
 """Application configuration module exports."""
+from .admission import AdmissionSettings
+from .bulk import BulkSettings
+from .cache import CacheSettings
+from .changes import ChangeFeedSettings
+from .compression import CompressionSettings
 from .db import TortoiseSettings
+from .health import HealthSettings
+from .idempotency import IdempotencySettings
+from .jobs import JobSettings
+from .logging import LoggingSettings
+from .metrics import MetricsSettings
 from .openapi import OpenAPISettings
+from .pagination import PaginationSettings
+from .responses import ResponseSettings
+from .server import ServerSettings
+from .sync import SyncSettings
+from .transfer import TransferSettings
 
 tortoise_config = TortoiseSettings.generate()
 openapi_config = OpenAPISettings()
+pagination_config = PaginationSettings()
+bulk_config = BulkSettings()
+cache_config = CacheSettings()
+metrics_config = MetricsSettings()
+logging_config = LoggingSettings()
+server_config = ServerSettings()
+health_config = HealthSettings()
+response_config = ResponseSettings()
+compression_config = CompressionSettings()
+idempotency_config = IdempotencySettings()
+admission_config = AdmissionSettings()
+changes_config = ChangeFeedSettings()
+sync_config = SyncSettings()
+jobs_config = JobSettings()
+transfer_config = TransferSettings()
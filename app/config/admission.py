@@ -0,0 +1,26 @@
+"""Admission control configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_bool, to_float, to_int
+
+class AdmissionSettings(Config):
+    """Rate limit and concurrency cap settings from environment variables."""
+    enabled: bool = field("ADMISSION_ENABLED", default=True, caster=to_bool)
+    # Comma-separated route prefixes under admission control; health and metrics stay outside
+    paths: str = field("ADMISSION_PATHS", default="/items")
+    # Route prefixes left out of admission control: change feed streams would hold a slot for hours
+    exclude_paths: str = field("ADMISSION_EXCLUDE_PATHS", default="/items/events")
+    # Requests in flight per route and worker; 0 means twice the worker's database pool size
+    max_in_flight: int = field("ADMISSION_MAX_IN_FLIGHT", default=0, caster=to_int)
+    # Comma-separated route=limit pairs overriding ADMISSION_MAX_IN_FLIGHT, by route template
+    route_limits: str = field("ADMISSION_ROUTE_LIMITS", default="/items/bulk=4")
+    max_queue: int = field("ADMISSION_MAX_QUEUE", default=64, caster=to_int)
+    queue_timeout: float = field("ADMISSION_QUEUE_TIMEOUT", default=1.0, caster=to_float)
+    # Token bucket per client; a rate of 0 disables rate limiting
+    rate_limit: float = field("RATE_LIMIT_PER_SECOND", default=0.0, caster=to_float)
+    rate_burst: int = field("RATE_LIMIT_BURST", default=0, caster=to_int)  # 0 means twice the rate
+    key_header: str = field("RATE_LIMIT_KEY_HEADER", default="X-API-Key")
+    # Identify clients without an API key by the first X-Forwarded-For address (only behind a trusted proxy)
+    trust_forwarded: bool = field("RATE_LIMIT_TRUST_FORWARDED", default=False, caster=to_bool)
+    backend: str = field("RATE_LIMIT_BACKEND", default="memory")  # memory or redis
+    redis_url: str = field("RATE_LIMIT_REDIS_URL", default="redis://localhost:6379/0")
+    key_prefix: str = field("RATE_LIMIT_KEY_PREFIX", default="ratelimit:")
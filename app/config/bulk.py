@@ -0,0 +1,8 @@
+"""Bulk operations configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_int
+
+class BulkSettings(Config):
+    """Bulk endpoint settings from environment variables."""
+    batch_size: int = field("BULK_BATCH_SIZE", default=500, caster=to_int)
+    max_items: int = field("BULK_MAX_ITEMS", default=10000, caster=to_int)
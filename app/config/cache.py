@@ -0,0 +1,14 @@
+"""Cache configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_float, to_int
+
+class CacheSettings(Config):
+    """Item cache settings from environment variables."""
+    backend: str = field("CACHE_BACKEND", default="memory")  # memory, redis or none
+    max_entries: int = field("CACHE_MAX_ENTRIES", default=10000, caster=to_int)
+    ttl_seconds: float = field("CACHE_TTL_SECONDS", default=60.0, caster=to_float)
+    redis_url: str = field("CACHE_REDIS_URL", default="redis://localhost:6379/0")
+    key_prefix: str = field("CACHE_KEY_PREFIX", default="items:")
+    # Aggregates (stats and list counts) are cached in-process only, for a short time
+    stats_ttl_seconds: float = field("CACHE_STATS_TTL_SECONDS", default=5.0, caster=to_float)
+    stats_max_entries: int = field("CACHE_STATS_MAX_ENTRIES", default=1000, caster=to_int)
@@ -0,0 +1,18 @@
+"""Change feed configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_bool, to_float, to_int
+
+class ChangeFeedSettings(Config):
+    """Item change feed settings from environment variables."""
+    enabled: bool = field("CHANGES_ENABLED", default=True, caster=to_bool)
+    # auto uses Postgres LISTEN/NOTIFY when the database is Postgres, else the in-process broadcaster
+    backend: str = field("CHANGES_BACKEND", default="auto")  # auto, postgres or memory
+    channel: str = field("CHANGES_CHANNEL", default="item_changes")
+    # Recent events kept per worker so reconnecting clients can resume from their cursor
+    history_size: int = field("CHANGES_HISTORY_SIZE", default=1000, caster=to_int)
+    # Events buffered per subscriber; a subscriber falling further behind is disconnected
+    queue_size: int = field("CHANGES_QUEUE_SIZE", default=500, caster=to_int)
+    max_subscribers: int = field("CHANGES_MAX_SUBSCRIBERS", default=1000, caster=to_int)
+    heartbeat_seconds: float = field("CHANGES_HEARTBEAT_SECONDS", default=15.0, caster=to_float)
+    # Delay before the Postgres listener reconnects after losing its connection
+    reconnect_seconds: float = field("CHANGES_RECONNECT_SECONDS", default=1.0, caster=to_float)
@@ -0,0 +1,16 @@
+"""Response compression configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_bool, to_int
+
+class CompressionSettings(Config):
+    """Response compression settings from environment variables."""
+    enabled: bool = field("COMPRESSION_ENABLED", default=True, caster=to_bool)
+    # Bodies smaller than this are sent as-is; compressing them costs more than it saves
+    min_size: int = field("COMPRESSION_MIN_SIZE", default=500, caster=to_int)
+    # Encodings in server preference order; br and zstd need the brotli and zstandard packages
+    algorithms: str = field("COMPRESSION_ALGORITHMS", default="zstd,br,gzip")
+    # Content-type prefixes worth compressing
+    content_types: str = field("COMPRESSION_CONTENT_TYPES", default="application/json,application/x-ndjson,text/")
+    gzip_level: int = field("COMPRESSION_GZIP_LEVEL", default=6, caster=to_int)
+    brotli_quality: int = field("COMPRESSION_BROTLI_QUALITY", default=4, caster=to_int)
+    zstd_level: int = field("COMPRESSION_ZSTD_LEVEL", default=3, caster=to_int)
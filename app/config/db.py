@@ -1,8 +1,10 @@
 """Database configuration module."""
+import asyncio
 import os
 import sys
-import socket
+from typing import Optional
 from loguru import logger
+from tortoise.backends.base.config_generator import expand_db_url
 
 DB_MODELS = ["app.core.models.tortoise"]
 
@@ -10,6 +12,10 @@ DB_MODELS = ["app.core.models.tortoise"]
 POSTGRES_DB_URL = "postgres://{postgres_user}:{postgres_password}@{postgres_host}:{postgres_port}/{postgres_db}"
 SQLITE_DB_URL = "sqlite://db.sqlite3"
 
+# asyncpg engine with pool utilisation tracking, see app/utils/db/pool.py
+POSTGRES_ENGINE = "app.utils.db.pool"
+REPLICA_ROUTER = "app.utils.db.replicas.ReplicaRouter"
+
 class PostgresSettings:
     """Postgres environment settings."""
     def __init__(self):
@@ -18,9 +24,12 @@ class PostgresSettings:
         self.postgres_password = os.environ.get("POSTGRES_PASSWORD", "postgres")
         self.postgres_db = os.environ.get("POSTGRES_DB", "mydb")
         self.postgres_port = os.environ.get("POSTGRES_PORT", "5432")
-        
-        # Try to determine the best postgres host
-        self.postgres_host = self._determine_postgres_host()
+        self.postgres_host = os.environ.get("POSTGRES_HOST", "postgres")
+
+        # Probing alternate hosts happens at startup, never at import time
+        self.probe_host = os.environ.get("POSTGRES_HOST_PROBE", "true").lower() in ("1", "true", "yes")
+        self.probe_timeout = float(os.environ.get("POSTGRES_HOST_PROBE_TIMEOUT", "1"))
+        self._host_resolved = False
         
         # Log the settings to help with debugging
         logger.info(f"PostgreSQL Settings loaded from environment")
@@ -28,55 +37,159 @@ class PostgresSettings:
         logger.info(f"Port: {self.postgres_port}")
         logger.info(f"Database: {self.postgres_db}")
         logger.info(f"User: {self.postgres_user}")
-        logger.info(f"All ENV variables: {', '.join([f'{k}={v}' for k, v in os.environ.items() if 'POSTGRES' in k])}")
     
-    def _determine_postgres_host(self):
-        """Try different strategies to determine the best PostgreSQL host."""
-        # Get the host from the environment variable
-        host = os.environ.get("POSTGRES_HOST", "postgres")
-        
+    async def resolve_host(self) -> str:
+        """
+        Determine the best PostgreSQL host, probing alternates concurrently.
+
+        Only runs once per process; later calls return the cached result.
+        """
+        if self._host_resolved:
+            return self.postgres_host
+        self._host_resolved = True
+
         # If running in Coolify with the default value, try some alternate options
-        if host == "postgres":
-            # Check if host.docker.internal is reachable (works on Docker Desktop)
-            if self._is_host_reachable("host.docker.internal"):
-                logger.info("Using host.docker.internal as PostgreSQL host")
-                return "host.docker.internal"
-            
-            # Check if postgres.coolify is reachable (might work in Coolify network)
-            if self._is_host_reachable("postgres.coolify"):
-                logger.info("Using postgres.coolify as PostgreSQL host")
-                return "postgres.coolify"
+        if self.probe_host and self.postgres_host == "postgres":
+            # host.docker.internal works on Docker Desktop, postgres.coolify might work in the Coolify network
+            candidates = ["host.docker.internal", "postgres.coolify"]
+            reachable = await asyncio.gather(*(self._is_host_reachable(host) for host in candidates))
+            for host, is_reachable in zip(candidates, reachable):
+                if is_reachable:
+                    self.postgres_host = host
+                    break
         
-        logger.info(f"Using {host} as PostgreSQL host")
-        return host
+        logger.info(f"Using {self.postgres_host} as PostgreSQL host")
+        return self.postgres_host
     
-    def _is_host_reachable(self, host):
+    async def _is_host_reachable(self, host: str) -> bool:
         """Check if a host is reachable on the PostgreSQL port."""
         try:
             port = int(self.postgres_port)
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(1)
-                result = s.connect_ex((host, port))
-                reachable = (result == 0)
-                logger.info(f"Host {host}:{port} reachable: {reachable}")
-                return reachable
-        except Exception as e:
-            logger.warning(f"Error checking if {host} is reachable: {e}")
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), self.probe_timeout)
+            writer.close()
+            logger.info(f"Host {host}:{port} reachable: True")
+            return True
+        except (OSError, ValueError, asyncio.TimeoutError) as e:
+            logger.info(f"Host {host}:{self.postgres_port} reachable: False ({type(e).__name__})")
             return False
 
 
+class PoolSettings:
+    """Postgres connection pool environment settings."""
+    def __init__(self):
+        self.minsize = int(os.environ.get("DB_POOL_MIN_SIZE", "1"))
+        self.maxsize = int(os.environ.get("DB_POOL_MAX_SIZE", "10"))
+        self.max_queries = int(os.environ.get("DB_POOL_MAX_QUERIES", "50000"))
+        self.max_inactive_connection_lifetime = float(os.environ.get("DB_POOL_MAX_INACTIVE_CONNECTION_LIFETIME", "300"))
+        self.statement_cache_size = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", "100"))
+        # A timeout of 0 disables the per-query limit
+        self.command_timeout = float(os.environ.get("DB_COMMAND_TIMEOUT", "30")) or None
+        # Total connections all workers may hold against the primary, 0 disables the cap
+        self.connection_budget = int(os.environ.get("DB_CONNECTION_BUDGET", "0"))
+
+        logger.info(f"Connection pool: minsize={self.minsize}, maxsize={self.maxsize}, command_timeout={self.command_timeout}")
+
+    def worker_sizes(self) -> tuple:
+        """
+        Pool min and max sizes for this worker process.
+
+        WEB_CONCURRENCY is read at call time because start.py exports the
+        resolved worker count after the settings have been imported.
+        """
+        if not self.connection_budget:
+            return self.minsize, self.maxsize
+        workers = max(1, int(os.environ.get("WEB_CONCURRENCY", "1") or 1))
+        maxsize = max(1, min(self.maxsize, self.connection_budget // workers))
+        return min(self.minsize, maxsize), maxsize
+
+    def credentials(self) -> dict:
+        """Pool options in the form expected by Tortoise's asyncpg credentials."""
+        minsize, maxsize = self.worker_sizes()
+        if maxsize != self.maxsize:
+            logger.info(f"Connection pool capped by DB_CONNECTION_BUDGET: minsize={minsize}, maxsize={maxsize}")
+        return {
+            "minsize": minsize,
+            "maxsize": maxsize,
+            "max_queries": self.max_queries,
+            "max_inactive_connection_lifetime": self.max_inactive_connection_lifetime,
+            "statement_cache_size": self.statement_cache_size,
+            "command_timeout": self.command_timeout,
+        }
+
+
+class ReplicaSettings:
+    """Read-replica environment settings."""
+    def __init__(self):
+        urls = os.environ.get("DB_READ_REPLICA_URLS", "")
+        self.urls = [url.strip() for url in urls.split(",") if url.strip()]
+        self.strategy = os.environ.get("DB_REPLICA_STRATEGY", "round_robin")
+        # Reads stay on the primary this long after a write so clients see their own writes
+        self.sticky_seconds = float(os.environ.get("DB_REPLICA_STICKY_SECONDS", "2"))
+
+        if self.urls:
+            logger.info(f"Read replicas: {len(self.urls)} configured, strategy={self.strategy}")
+
+    @property
+    def connection_names(self) -> list:
+        """Tortoise connection names the replicas are registered under."""
+        return [f"replica_{index}" for index in range(len(self.urls))]
+
+
 class TortoiseSettings:
     """Tortoise ORM configuration settings."""
-    def __init__(self, db_url: str, modules: dict, generate_schemas: bool):
+    def __init__(
+        self,
+        db_url: str,
+        modules: dict,
+        migrate_on_startup: bool = False,
+        pool: Optional[PoolSettings] = None,
+        replicas: Optional[ReplicaSettings] = None,
+        postgres: Optional[PostgresSettings] = None,
+    ):
         self.db_url = db_url
         self.modules = modules
-        self.generate_schemas = generate_schemas
+        # Deploys normally run `python migrate.py upgrade` once before the workers start
+        self.migrate_on_startup = migrate_on_startup
+        self.pool = pool or PoolSettings()
+        self.replicas = replicas or ReplicaSettings()
+        self.postgres = postgres
 
-    @classmethod
-    def generate(cls) -> "TortoiseSettings":
-        """Generate Tortoise ORM configuration from environment settings."""
-        postgres = PostgresSettings()
-        
+    async def resolve_host(self) -> None:
+        """Resolve the Postgres host at startup and rebuild the URL if it changed."""
+        if self.postgres is None:
+            return
+        host = self.postgres.postgres_host
+        if await self.postgres.resolve_host() != host:
+            self.db_url = self.build_db_url(self.postgres)
+
+    def _connection_config(self, db_url: str) -> dict:
+        """Expand a database URL, applying the pool settings to Postgres connections."""
+        connection = expand_db_url(db_url)
+        if connection["engine"] == "tortoise.backends.asyncpg":
+            connection["engine"] = POSTGRES_ENGINE
+            connection["credentials"].update(self.pool.credentials())
+        return connection
+
+    def to_config(self) -> dict:
+        """Build a Tortoise config dict with the primary and any read-replica connections."""
+        connections = {"default": self._connection_config(self.db_url)}
+        for name, url in zip(self.replicas.connection_names, self.replicas.urls):
+            connections[name] = self._connection_config(url)
+
+        config = {
+            "connections": connections,
+            "apps": {
+                name: {"models": models, "default_connection": "default"}
+                for name, models in self.modules.items()
+            },
+        }
+        if self.replicas.urls:
+            config["routers"] = [REPLICA_ROUTER]
+        return config
+
+    @staticmethod
+    def build_db_url(postgres: PostgresSettings) -> str:
+        """Build the database URL from Postgres settings, falling back to SQLite."""
         try:
             # Format the database URL with the settings
             db_url = POSTGRES_DB_URL.format(
@@ -94,6 +207,21 @@ class TortoiseSettings:
             logger.error(f"Error creating PostgreSQL connection string: {e}")
             logger.warning("Falling back to SQLite database")
             db_url = SQLITE_DB_URL
-        
+        return db_url
+
+    @classmethod
+    def generate(cls) -> "TortoiseSettings":
+        """Generate Tortoise ORM configuration from environment settings without touching the network."""
         modules = {"models": DB_MODELS}
-        return TortoiseSettings(db_url=db_url, modules=modules, generate_schemas=True) 
\ No newline at end of file
+
+        # An explicit URL (e.g. sqlite://:memory: for benchmarks) skips the Postgres settings
+        database_url = os.environ.get("DATABASE_URL")
+        postgres = None if database_url else PostgresSettings()
+        return TortoiseSettings(
+            db_url=database_url or cls.build_db_url(postgres),
+            modules=modules,
+            migrate_on_startup=os.environ.get("DB_MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes"),
+            pool=PoolSettings(),
+            replicas=ReplicaSettings(),
+            postgres=postgres,
+        )
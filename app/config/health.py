@@ -0,0 +1,13 @@
+"""Health check configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_float
+
+class HealthSettings(Config):
+    """Health check settings from environment variables."""
+    # Dependency checks run in the background this often; probes only read the results
+    interval: float = field("HEALTH_CHECK_INTERVAL", default=5.0, caster=to_float)
+    timeout: float = field("HEALTH_CHECK_TIMEOUT", default=2.0, caster=to_float)
+    # Results older than this many intervals count as failing
+    stale_intervals: float = field("HEALTH_STALE_INTERVALS", default=3.0, caster=to_float)
+    db_latency_degraded: float = field("HEALTH_DB_LATENCY_DEGRADED", default=0.25, caster=to_float)
+    pool_saturation_degraded: float = field("HEALTH_POOL_SATURATION_DEGRADED", default=0.9, caster=to_float)
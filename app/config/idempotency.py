@@ -0,0 +1,11 @@
+"""Idempotency key configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_float, to_int
+
+class IdempotencySettings(Config):
+    """Idempotency key settings from environment variables."""
+    backend: str = field("IDEMPOTENCY_BACKEND", default="memory")  # memory, database or none
+    ttl_seconds: float = field("IDEMPOTENCY_TTL_SECONDS", default=86400.0, caster=to_float)
+    max_entries: int = field("IDEMPOTENCY_MAX_ENTRIES", default=10000, caster=to_int)
+    # A key claimed this long ago without a stored response is treated as abandoned by a crashed worker
+    pending_timeout_seconds: float = field("IDEMPOTENCY_PENDING_TIMEOUT_SECONDS", default=60.0, caster=to_float)
@@ -0,0 +1,28 @@
+"""Background job configuration module."""
+import os
+import tempfile
+
+from betterconf import Config, field
+from betterconf.caster import to_bool, to_float, to_int
+
+class JobSettings(Config):
+    """Background job queue settings from environment variables."""
+    enabled: bool = field("JOBS_ENABLED", default=True, caster=to_bool)
+    # database survives restarts and is shared by every worker; memory is for a single process
+    backend: str = field("JOBS_BACKEND", default="database")  # database or memory
+    # Run jobs inside the web workers; set to false when `python worker.py` runs them instead
+    run_in_app: bool = field("JOBS_RUN_IN_APP", default=True, caster=to_bool)
+    # Jobs run at once per process, and comma-separated type=limit caps per job type
+    concurrency: int = field("JOBS_CONCURRENCY", default=2, caster=to_int)
+    type_limits: str = field("JOBS_TYPE_LIMITS", default="items.import=1,items.export=2,items.reindex=1")
+    max_attempts: int = field("JOBS_MAX_ATTEMPTS", default=3, caster=to_int)
+    # Retries wait JOBS_BACKOFF_SECONDS, doubling per attempt up to JOBS_BACKOFF_MAX_SECONDS
+    backoff_seconds: float = field("JOBS_BACKOFF_SECONDS", default=5.0, caster=to_float)
+    backoff_max_seconds: float = field("JOBS_BACKOFF_MAX_SECONDS", default=300.0, caster=to_float)
+    poll_interval: float = field("JOBS_POLL_INTERVAL", default=1.0, caster=to_float)
+    # A running job whose worker stops renewing its lease for this long is picked up again
+    lease_seconds: float = field("JOBS_LEASE_SECONDS", default=60.0, caster=to_float)
+    # Finished jobs and their files are deleted after this many days
+    retention_days: float = field("JOBS_RETENTION_DAYS", default=7.0, caster=to_float)
+    # Where export jobs write their files; share it between workers that serve downloads
+    files_dir: str = field("JOBS_FILES_DIR", default=os.path.join(tempfile.gettempdir(), "item-jobs"))
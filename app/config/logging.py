@@ -0,0 +1,14 @@
+"""Logging configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_bool, to_float
+
+class LoggingSettings(Config):
+    """Logging settings from environment variables."""
+    level: str = field("LOG_LEVEL", default="INFO")
+    json: bool = field("LOG_JSON", default=False, caster=to_bool)
+    # Hand records to a writer thread instead of writing to stdout on the event loop
+    enqueue: bool = field("LOG_ENQUEUE", default=True, caster=to_bool)
+    access_log: bool = field("ACCESS_LOG_ENABLED", default=True, caster=to_bool)
+    access_log_sample_rate: float = field("ACCESS_LOG_SAMPLE_RATE", default=1.0, caster=to_float)
+    # Comma-separated route=rate overrides, e.g. "/health=0,/items/{item_id}=0.1"
+    access_log_route_rates: str = field("ACCESS_LOG_ROUTE_RATES", default="/health=0,/health/live=0,/health/ready=0")
@@ -0,0 +1,14 @@
+"""Metrics configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_bool, to_float
+
+class MetricsSettings(Config):
+    """Metrics settings from environment variables."""
+    enabled: bool = field("METRICS_ENABLED", default=True, caster=to_bool)
+    loop_lag_interval: float = field("METRICS_LOOP_LAG_INTERVAL", default=0.5, caster=to_float)
+    # Directory shared by one server's workers, through which /metrics reports all of them merged; empty for per-worker
+    multiprocess_dir: str = field("METRICS_MULTIPROCESS_DIR", default="")
+    # How often each worker refreshes its snapshot in multiprocess_dir
+    snapshot_interval: float = field("METRICS_SNAPSHOT_INTERVAL", default=5.0, caster=to_float)
+    # Without multiprocess_dir, label naming the worker process on every sample; empty to omit
+    worker_label: str = field("METRICS_WORKER_LABEL", default="worker")
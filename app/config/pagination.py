@@ -0,0 +1,9 @@
+"""Pagination configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_int
+
+class PaginationSettings(Config):
+    """Pagination settings from environment variables."""
+    default_limit: int = field("PAGINATION_DEFAULT_LIMIT", default=50, caster=to_int)
+    max_limit: int = field("PAGINATION_MAX_LIMIT", default=500, caster=to_int)
+    stream_chunk_size: int = field("PAGINATION_STREAM_CHUNK_SIZE", default=1000, caster=to_int)
@@ -0,0 +1,8 @@
+"""Response serialisation configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_bool
+
+class ResponseSettings(Config):
+    """Response serialisation settings from environment variables."""
+    # Encode item reads from raw rows straight to JSON bytes, skipping response-model validation
+    fast_serialization: bool = field("RESPONSE_FAST_SERIALIZATION", default=False, caster=to_bool)
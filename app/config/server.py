@@ -0,0 +1,19 @@
+"""Server process configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_bool, to_int
+
+class ServerSettings(Config):
+    """Server launch settings from environment variables."""
+    # development runs a single uvicorn process, production a pre-fork gunicorn supervisor
+    mode: str = field("SERVER_MODE", default="development")
+    host: str = field("SERVER_HOST", default="0.0.0.0")
+    # 0 sizes the worker pool from the CPU quota
+    workers: int = field("WEB_CONCURRENCY", default=0, caster=to_int)
+    max_workers: int = field("SERVER_MAX_WORKERS", default=16, caster=to_int)
+    # Recycle a worker after this many requests (plus up to the jitter), 0 never recycles
+    max_requests: int = field("SERVER_MAX_REQUESTS", default=10000, caster=to_int)
+    max_requests_jitter: int = field("SERVER_MAX_REQUESTS_JITTER", default=1000, caster=to_int)
+    # Seconds a worker may spend draining in-flight requests after SIGTERM
+    graceful_timeout: int = field("SERVER_GRACEFUL_TIMEOUT", default=30, caster=to_int)
+    keepalive: int = field("SERVER_KEEPALIVE", default=5, caster=to_int)
+    reuse_port: bool = field("SERVER_REUSE_PORT", default=True, caster=to_bool)
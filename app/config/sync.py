@@ -0,0 +1,12 @@
+"""Delta sync configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_float, to_int
+
+class SyncSettings(Config):
+    """Delta sync settings from environment variables."""
+    # Sync tokens never move past now minus this, so writes committing late are not skipped
+    settle_seconds: float = field("SYNC_SETTLE_SECONDS", default=5.0, caster=to_float)
+    # Tombstones are kept this long; older sync tokens get 410 and need a full sync
+    tombstone_retention_days: int = field("SYNC_TOMBSTONE_RETENTION_DAYS", default=30, caster=to_int)
+    # Expired tombstones are purged by a delete at most this often
+    purge_interval_seconds: float = field("SYNC_PURGE_INTERVAL_SECONDS", default=3600.0, caster=to_float)
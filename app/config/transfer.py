@@ -0,0 +1,12 @@
+"""Bulk import and export configuration module."""
+from betterconf import Config, field
+from betterconf.caster import to_int
+
+class TransferSettings(Config):
+    """Item import and export settings from environment variables."""
+    # Rows parsed, validated and written per batch; memory use grows with this, not with the file
+    batch_size: int = field("TRANSFER_BATCH_SIZE", default=5000, caster=to_int)
+    # Largest upload POST /items/import spools to disk (0 = unlimited)
+    max_upload_bytes: int = field("TRANSFER_MAX_UPLOAD_BYTES", default=1073741824, caster=to_int)
+    # Rows per Parquet row group in exports
+    row_group_size: int = field("TRANSFER_ROW_GROUP_SIZE", default=100000, caster=to_int)
@@ -0,0 +1,58 @@
+"""Admission control exports."""
+from typing import Optional
+
+from loguru import logger
+
+from app.config import admission_config, tortoise_config
+from app.config.admission import AdmissionSettings
+from app.core.logs import parse_route_rates
+from .limiters import (
+    TOKEN_BUCKET_SCRIPT,
+    ConcurrencyLimiter,
+    MemoryRateLimiter,
+    RateLimiter,
+    RedisRateLimiter,
+    RouteLimiters,
+)
+from .middleware import AdmissionMiddleware
+
+def create_rate_limiter(settings: AdmissionSettings) -> Optional[RateLimiter]:
+    """
+    Create the per-client rate limiter selected by the settings, or None when rate limiting is off.
+
+    Args:
+        settings: Admission settings.
+    """
+    if settings.rate_limit <= 0:
+        return None
+    burst = settings.rate_burst or max(1, int(settings.rate_limit * 2))
+
+    if settings.backend == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            logger.warning("redis package not installed, falling back to in-process rate limiting")
+        else:
+            client = redis.Redis.from_url(settings.redis_url)
+            return RedisRateLimiter(client, settings.rate_limit, burst, key_prefix=settings.key_prefix)
+
+    if settings.backend not in ("memory", "redis"):
+        logger.warning(f"Unknown rate limit backend {settings.backend!r}, using in-process rate limiting")
+    return MemoryRateLimiter(settings.rate_limit, burst)
+
+def create_route_limiters(settings: AdmissionSettings) -> RouteLimiters:
+    """
+    Create the per-route concurrency limiters.
+
+    Args:
+        settings: Admission settings.
+    """
+    def default_limit() -> int:
+        # Twice this worker's database pool; resolved on first use, once WEB_CONCURRENCY is known
+        return settings.max_in_flight or 2 * tortoise_config.pool.worker_sizes()[1]
+
+    route_limits = {route: int(limit) for route, limit in parse_route_rates(settings.route_limits).items()}
+    return RouteLimiters(default_limit, route_limits, settings.max_queue, settings.queue_timeout)
+
+rate_limiter = create_rate_limiter(admission_config)
+route_limiters = create_route_limiters(admission_config)
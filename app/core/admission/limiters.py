@@ -0,0 +1,194 @@
+"""Rate limiters and concurrency limiters for admission control."""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+class RateLimiter:
+    """Interface for per-client token buckets."""
+    name = "base"
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+
+    async def acquire(self, key: str) -> float:
+        """
+        Take a token from a client's bucket.
+
+        Returns 0 when the request is allowed, otherwise the seconds until
+        the bucket has a token again.
+        """
+        raise NotImplementedError
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the limiter."""
+        return {"backend": self.name, "rate": self.rate, "burst": self.burst}
+
+class MemoryRateLimiter(RateLimiter):
+    """
+    Token buckets held in-process, one per client.
+
+    Each worker enforces the rate separately. Buckets are kept in LRU order
+    and the least recently seen clients are dropped past ``max_keys``; a
+    dropped client simply starts again with a full bucket.
+    """
+    name = "memory"
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 100000):
+        super().__init__(rate, burst)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def acquire(self, key: str) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= 1.0:
+            tokens -= 1.0
+        else:
+            wait = (1.0 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), "clients": len(self._buckets)}
+
+# Token bucket update run atomically by Redis; returns the wait in milliseconds
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+return wait
+"""
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Token buckets shared by every worker through a Redis-compatible client.
+
+    Any object exposing an async ``eval(script, numkeys, *keys_and_args)``
+    running TOKEN_BUCKET_SCRIPT works, so tests can pass a local fake.
+    When Redis cannot be reached the limiter fails open, admitting every
+    request and counting the errors, rather than failing the requests.
+    """
+    name = "redis"
+
+    def __init__(self, client: Any, rate: float, burst: int, key_prefix: str = ""):
+        super().__init__(rate, burst)
+        self.client = client
+        self.key_prefix = key_prefix
+        self.errors = 0
+        self.failing = False
+
+    async def acquire(self, key: str) -> float:
+        now_ms = int(time.time() * 1000)
+        try:
+            wait_ms = await self.client.eval(
+                TOKEN_BUCKET_SCRIPT, 1, self.key_prefix + key, self.rate, self.burst, now_ms,
+            )
+        except Exception as e:
+            self.errors += 1
+            if not self.failing:
+                # Logged once per outage, not per request
+                self.failing = True
+                logger.warning(f"Rate limiter cannot reach Redis, admitting requests unlimited: {type(e).__name__}: {e}")
+            return 0.0
+        if self.failing:
+            self.failing = False
+            logger.info("Rate limiter reached Redis again")
+        return int(wait_ms) / 1000
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), "errors": self.errors, "failing": self.failing}
+
+class ConcurrencyLimiter:
+    """
+    Cap on requests in flight, with a bounded queue and a deadline for waiting.
+
+    ``acquire`` returns at once when a slot is free, waits up to ``timeout``
+    seconds in a queue of at most ``max_queue`` requests otherwise, and
+    gives up when the queue is full or the deadline passes.
+    """
+    def __init__(self, limit: int, max_queue: int, timeout: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; returns None once taken, or why the request should be shed instead."""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        elif self.waiting >= self.max_queue or self.timeout <= 0:
+            return "queue_full"
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                return "queue_timeout"
+            finally:
+                self.waiting -= 1
+        self.in_flight += 1
+        return None
+
+    def release(self) -> None:
+        """Free a slot taken by a successful acquire."""
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the limiter's current load."""
+        return {"limit": self.limit, "in_flight": self.in_flight, "waiting": self.waiting}
+
+class RouteLimiters:
+    """
+    Concurrency limiters by route template, created on first use.
+
+    ``default_limit`` is called when the first limiter is created rather than
+    up front, so it can depend on settings resolved after import.
+    """
+    def __init__(
+        self,
+        default_limit: Callable[[], int],
+        route_limits: Dict[str, int],
+        max_queue: int,
+        timeout: float,
+    ):
+        self.default_limit = default_limit
+        self.route_limits = route_limits
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._limiters: Dict[str, ConcurrencyLimiter] = {}
+
+    def get(self, route: str) -> ConcurrencyLimiter:
+        """The limiter for a route template."""
+        limiter = self._limiters.get(route)
+        if limiter is None:
+            limit = self.route_limits.get(route) or self.default_limit()
+            limiter = self._limiters[route] = ConcurrencyLimiter(limit, self.max_queue, self.timeout)
+        return limiter
+
+    def info(self) -> Dict[str, Dict[str, Any]]:
+        """Describe the load on every route's limiter."""
+        return {route: limiter.info() for route, limiter in self._limiters.items()}
@@ -0,0 +1,53 @@
+"""Response cache exports."""
+from loguru import logger
+
+from app.config import cache_config
+from app.config.cache import CacheSettings
+from .backends import CacheBackend, CacheStats, MemoryCache, NullCache, RedisCache
+from .generations import Generations
+from .singleflight import FlightStats, SingleFlight
+
+def create_cache(settings: CacheSettings) -> CacheBackend:
+    """
+    Create the cache backend selected by the settings.
+
+    Args:
+        settings: Cache settings.
+    """
+    if settings.backend == "none":
+        return NullCache()
+
+    if settings.backend == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            logger.warning("redis package not installed, falling back to the in-process cache")
+        else:
+            client = redis.Redis.from_url(settings.redis_url)
+            return RedisCache(client, ttl_seconds=settings.ttl_seconds, key_prefix=settings.key_prefix)
+
+    if settings.backend not in ("memory", "redis"):
+        logger.warning(f"Unknown cache backend {settings.backend!r}, using the in-process cache")
+    return MemoryCache(max_entries=settings.max_entries, ttl_seconds=settings.ttl_seconds)
+
+def create_stats_cache(settings: CacheSettings) -> CacheBackend:
+    """
+    Create the cache for aggregate results.
+
+    Always in-process: entries are tiny and short-lived, and every write
+    clears the whole cache, which would mean a key scan on Redis.
+
+    Args:
+        settings: Cache settings.
+    """
+    if settings.backend == "none":
+        return NullCache()
+    return MemoryCache(max_entries=settings.stats_max_entries, ttl_seconds=settings.stats_ttl_seconds)
+
+item_cache = create_cache(cache_config)
+# Lets item cache fills that raced a write skip storing what they read
+item_generations = Generations()
+stats_cache = create_stats_cache(cache_config)
+# Concurrent identical item reads share one query: single items by ID, and list pages and aggregates
+item_flights = SingleFlight("items")
+list_flights = SingleFlight("item_lists")
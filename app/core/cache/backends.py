@@ -0,0 +1,153 @@
+"""Cache backends for serialised API responses."""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+class CacheStats:
+    """Counters used to size and monitor a cache."""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def dict(self) -> dict:
+        """Convert the counters to a dict, including the hit ratio."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+class CacheBackend:
+    """Interface for caches that map string keys to bytes values."""
+    name = "base"
+    # Whether every worker sees the same entries, so one worker's invalidation reaches all of them
+    shared = False
+
+    def __init__(self):
+        self.stats = CacheStats()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value for a key, or None on a miss."""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes) -> None:
+        """Store a value under a key."""
+        raise NotImplementedError
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        """Remove several keys; missing keys are ignored."""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        """Remove a single key."""
+        await self.delete_many([key])
+
+    async def clear(self) -> None:
+        """Remove every key."""
+        raise NotImplementedError
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the backend and its counters."""
+        return {"backend": self.name, **self.stats.dict()}
+
+class NullCache(CacheBackend):
+    """Cache that stores nothing, used when caching is disabled."""
+    name = "none"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: bytes) -> None:
+        return None
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        return None
+
+    async def clear(self) -> None:
+        return None
+
+class MemoryCache(CacheBackend):
+    """Bounded in-process LRU cache with a per-entry time to live."""
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats.evictions += 1
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), "size": len(self._entries), "max_entries": self.max_entries}
+
+class RedisCache(CacheBackend):
+    """
+    Cache backed by a Redis-compatible client.
+
+    Any object exposing async ``get``, ``set(key, value, px=...)`` and ``delete(*keys)``
+    works, so tests can pass a local fake instead of a real Redis connection.
+    """
+    name = "redis"
+    shared = True
+
+    def __init__(self, client: Any, ttl_seconds: float, key_prefix: str = ""):
+        super().__init__()
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self.client.get(self.key_prefix + key)
+        if value is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.client.set(self.key_prefix + key, value, px=int(self.ttl_seconds * 1000))
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        prefixed = [self.key_prefix + key for key in keys]
+        if prefixed:
+            await self.client.delete(*prefixed)
+
+    async def clear(self) -> None:
+        # Only drop this cache's keys, the Redis database may be shared
+        keys = [key async for key in self.client.scan_iter(match=f"{self.key_prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
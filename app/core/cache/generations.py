@@ -0,0 +1,47 @@
+"""Per-key generations that let cache fills detect a write that raced them."""
+from typing import Dict, Iterable, List
+
+class Generations:
+    """
+    Write generations for the keys a cache fill is in progress for.
+
+    A fill takes its key's generation before reading, and only stores the
+    result while the generation is unchanged. Invalidation bumps it, so a
+    fill whose read started before a write never puts the old value back.
+    Only keys with a fill running are tracked, so the memory used is bounded
+    by concurrent reads rather than by the number of keys.
+    """
+    def __init__(self):
+        # Key to [generation, fills running]
+        self._keys: Dict[str, List[int]] = {}
+
+    def begin(self, key: str) -> int:
+        """Start a fill for a key and return the generation it read at."""
+        entry = self._keys.setdefault(key, [0, 0])
+        entry[1] += 1
+        return entry[0]
+
+    def current(self, key: str, generation: int) -> bool:
+        """Whether nothing has invalidated the key since its fill began at generation."""
+        entry = self._keys.get(key)
+        return entry is not None and entry[0] == generation
+
+    def end(self, key: str) -> None:
+        """Finish a fill started with begin."""
+        entry = self._keys.get(key)
+        if entry is not None:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self._keys[key]
+
+    def bump(self, keys: Iterable[str]) -> None:
+        """Invalidate the fills running for these keys."""
+        for key in keys:
+            entry = self._keys.get(key)
+            if entry is not None:
+                entry[0] += 1
+
+    def bump_all(self) -> None:
+        """Invalidate every running fill."""
+        for entry in self._keys.values():
+            entry[0] += 1
@@ -0,0 +1,81 @@
+"""Request coalescing: concurrent identical lookups share one in-flight call."""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, TypeVar
+
+T = TypeVar("T")
+
+# Running calls listed by info(), busiest first
+INFO_MAX_KEYS = 20
+
+class FlightStats:
+    """Counters showing how many calls a single-flight group saved."""
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self.max_waiters = 0
+
+    def dict(self) -> dict:
+        """Convert the counters to a dict, including the share of calls saved."""
+        lookups = self.calls + self.shared
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "max_waiters": self.max_waiters,
+            "shared_ratio": self.shared / lookups if lookups else 0.0,
+        }
+
+class SingleFlight:
+    """
+    Group of keyed calls where only the first caller per key does the work.
+
+    Callers arriving while a call for their key is running wait for it and
+    get the same result or exception. The call runs as its own task, so a
+    disconnecting first caller does not cancel it for the others. ``forget``
+    detaches running calls from their keys: the current waiters still get
+    their result, but later callers start a fresh call, which writes use so
+    that a read issued after a write never joins a query started before it.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.stats = FlightStats()
+        self._flights: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+    async def do(self, key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of ``call()``, sharing it with concurrent callers of the same key."""
+        task = self._flights.get(key)
+        if task is None:
+            self.stats.calls += 1
+            task = asyncio.ensure_future(call())
+            self._flights[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.stats.shared += 1
+            self._waiters[key] += 1
+            self.stats.max_waiters = max(self.stats.max_waiters, self._waiters[key])
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._flights.get(key) is task:
+            del self._flights[key]
+            del self._waiters[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every caller has gone away
+            task.exception()
+
+    def forget(self, keys: Iterable[str]) -> None:
+        """Make later callers of these keys start a new call instead of joining a running one."""
+        for key in keys:
+            self._flights.pop(key, None)
+            self._waiters.pop(key, None)
+
+    def forget_all(self) -> None:
+        """Make later callers of every key start a new call."""
+        self._flights.clear()
+        self._waiters.clear()
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the group, its counters, and the waiters on its busiest running calls."""
+        busiest = sorted(self._waiters.items(), key=lambda item: item[1], reverse=True)[:INFO_MAX_KEYS]
+        return {"group": self.name, **self.stats.dict(), "in_flight": len(self._flights), "waiters": dict(busiest)}
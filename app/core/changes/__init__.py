@@ -0,0 +1,47 @@
+"""Item change feed exports."""
+from loguru import logger
+
+from app.config import changes_config, tortoise_config
+from app.config.changes import ChangeFeedSettings
+from app.config.db import TortoiseSettings
+from .broadcaster import (
+    Broadcaster,
+    MemoryBroadcaster,
+    NullBroadcaster,
+    PostgresBroadcaster,
+    Subscription,
+    SubscriptionClosed,
+    TooManySubscribersError,
+)
+from .events import CREATED, DELETED, OPS, RESET, UPDATED, ChangeEvent, ChangeFilter
+
+def create_broadcaster(settings: ChangeFeedSettings, tortoise_settings: TortoiseSettings) -> Broadcaster:
+    """
+    Create the change feed broadcaster selected by the settings.
+
+    Args:
+        settings: Change feed settings.
+        tortoise_settings: Database settings, used to tell whether the database is Postgres.
+    """
+    if not settings.enabled:
+        return NullBroadcaster()
+
+    sizes = dict(
+        history_size=settings.history_size,
+        queue_size=settings.queue_size,
+        max_subscribers=settings.max_subscribers,
+    )
+    is_postgres = tortoise_settings.db_url.startswith(("postgres://", "postgresql://", "asyncpg://"))
+    backend = settings.backend
+    if backend == "auto":
+        backend = "postgres" if is_postgres else "memory"
+
+    if backend == "postgres":
+        if is_postgres:
+            return PostgresBroadcaster(settings.channel, reconnect_seconds=settings.reconnect_seconds, **sizes)
+        logger.warning("Change feed postgres backend needs a Postgres database, using the in-process broadcaster")
+    elif backend != "memory":
+        logger.warning(f"Unknown change feed backend {settings.backend!r}, using the in-process broadcaster")
+    return MemoryBroadcaster(**sizes)
+
+change_feed = create_broadcaster(changes_config, tortoise_config)
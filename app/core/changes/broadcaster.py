@@ -0,0 +1,386 @@
+"""Change feed broadcasters: fan item changes out to subscribers, in-process or across workers."""
+import asyncio
+import json
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+from tortoise import connections
+
+from .events import RESET, ChangeEvent, ChangeFilter, EventIds
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_BYTES = 7900
+# asyncpg.connect arguments taken from the Tortoise client's extra settings for the listener
+LISTENER_CONNECT_ARGS = ("ssl", "timeout", "command_timeout")
+
+class TooManySubscribersError(RuntimeError):
+    """Raised when a worker already serves its maximum number of subscribers."""
+
+class SubscriptionClosed(Exception):
+    """Raised by ``Subscription.get`` once the subscription is closed and drained."""
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+class Subscription:
+    """
+    One subscriber's view of the feed: replayed events, then live ones.
+
+    Live events wait in a bounded buffer. A subscriber that falls more than
+    ``max_pending`` events behind is closed with reason ``overflow`` rather
+    than slowing down publishers or growing without bound; it can reconnect
+    from its last cursor and catch up from the history.
+    """
+    def __init__(self, change_filter: ChangeFilter, max_pending: int):
+        self.filter = change_filter
+        self.max_pending = max_pending
+        self.replay: List[ChangeEvent] = []
+        self.cursor_expired = False
+        self.closed_reason: Optional[str] = None
+        self._pending: Deque[ChangeEvent] = deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, event: ChangeEvent) -> bool:
+        """Queue an event if it matches the filter; returns False when the subscriber has overflowed."""
+        if self.closed_reason is not None or not self.filter.matches(event):
+            return True
+        if len(self._pending) >= self.max_pending:
+            self.close("overflow")
+            return False
+        self._pending.append(event)
+        self._ready.set()
+        return True
+
+    def close(self, reason: str) -> None:
+        """Stop receiving events; ``get`` raises once the queued ones are consumed."""
+        if self.closed_reason is None:
+            self.closed_reason = reason
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[ChangeEvent]:
+        """
+        Wait for the next event.
+
+        Returns None when nothing arrived within timeout (time for a
+        heartbeat), and raises SubscriptionClosed once closed and drained.
+        """
+        if not self._pending and self.closed_reason is None:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._pending:
+            event = self._pending.popleft()
+            if not self._pending and self.closed_reason is None:
+                self._ready.clear()
+            return event
+        raise SubscriptionClosed(self.closed_reason)
+
+class Broadcaster:
+    """
+    Interface for change feed fan-out.
+
+    Every event delivered to this worker is kept in a bounded history, in
+    delivery order, so a client reconnecting with the ID of the last event it
+    saw gets the events after it replayed. A cursor that is no longer in the
+    history gets a ``reset`` event instead, telling the client to resync.
+    """
+    name = "base"
+
+    def __init__(self, history_size: int, queue_size: int, max_subscribers: int):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.ids = EventIds()
+        self.subscriptions: Set[Subscription] = set()
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+        self.resets = 0
+        self._history: Deque[Tuple[int, ChangeEvent]] = deque()
+        self._positions: Dict[str, int] = {}
+        self._position = 0
+        self._listeners: List[Callable[[ChangeEvent], None]] = []
+
+    async def start(self) -> None:
+        """Start receiving events from other workers, if the backend shares them."""
+
+    async def stop(self) -> None:
+        """Close every subscription so open streams end."""
+        for subscription in list(self.subscriptions):
+            subscription.close("shutdown")
+        self.subscriptions.clear()
+
+    async def publish(self, op: str, changes: Iterable[Tuple[Any, Optional[Dict[str, Any]]]]) -> None:
+        """
+        Publish changes as (item ID, representation or None) pairs.
+
+        Called after the write has committed; a failure to publish is logged
+        and never fails the write.
+        """
+        events = [ChangeEvent(self.ids.next(), op, str(item_id), item) for item_id, item in changes]
+        if not events:
+            return
+        try:
+            await self._send(events)
+        except Exception as e:
+            logger.warning(f"Failed to publish {len(events)} item change event(s): {e}")
+            return
+        self.published += len(events)
+
+    async def _send(self, events: List[ChangeEvent]) -> None:
+        raise NotImplementedError
+
+    def subscribe(self, change_filter: ChangeFilter, cursor: Optional[str] = None) -> Subscription:
+        """
+        Register a subscriber, with the events after cursor queued for replay.
+
+        Raises:
+            TooManySubscribersError: When the worker is at max_subscribers.
+        """
+        if len(self.subscriptions) >= self.max_subscribers:
+            raise TooManySubscribersError(f"Change feed is at its limit of {self.max_subscribers} subscribers")
+        subscription = Subscription(change_filter, self.queue_size)
+        if cursor:
+            position = self._positions.get(cursor)
+            if position is None:
+                subscription.cursor_expired = True
+            else:
+                subscription.replay = [
+                    event for event_position, event in self._history
+                    if event_position > position and change_filter.matches(event)
+                ]
+        # No await since reading the history, so nothing falls between the replay and live events
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def add_listener(self, listener: Callable[[ChangeEvent], None]) -> None:
+        """
+        Call listener with every event delivered to this worker, resets included.
+
+        Listeners run synchronously in delivery order, so they must not block.
+        With a backend shared between workers they hear every worker's writes.
+        """
+        self._listeners.append(listener)
+
+    def _notify_listeners(self, event: ChangeEvent) -> None:
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Change feed listener {listener.__name__} failed: {e}")
+
+    def _deliver(self, event: ChangeEvent) -> None:
+        """Record an event in the history and offer it to every subscriber."""
+        self._position += 1
+        self._history.append((self._position, event))
+        self._positions[event.id] = self._position
+        while len(self._history) > self.history_size:
+            _, expired = self._history.popleft()
+            self._positions.pop(expired.id, None)
+        self.delivered += 1
+        self._notify_listeners(event)
+        self._offer(event)
+
+    def _offer(self, event: ChangeEvent) -> None:
+        for subscription in list(self.subscriptions):
+            if not subscription.offer(event):
+                self.overflows += 1
+                self.subscriptions.discard(subscription)
+
+    def reset(self, reason: str) -> None:
+        """Tell every subscriber events may have been missed, and forget the history they could resume from."""
+        self.resets += 1
+        self._history.clear()
+        self._positions.clear()
+        event = ChangeEvent.reset(reason)
+        self._notify_listeners(event)
+        self._offer(event)
+
+    async def announce_reset(self, reason: str) -> None:
+        """
+        Tell every subscriber, on every worker the backend reaches, to resync.
+
+        For writes too large to publish item by item, such as bulk imports.
+        """
+        self.reset(reason)
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the broadcaster and its counters."""
+        return {
+            "backend": self.name,
+            "subscribers": len(self.subscriptions),
+            "history": len(self._history),
+            "history_size": self.history_size,
+            "queue_size": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "resets": self.resets,
+        }
+
+class NullBroadcaster(Broadcaster):
+    """Broadcaster for a disabled change feed: publishing does nothing."""
+    name = "none"
+
+    def __init__(self):
+        super().__init__(history_size=0, queue_size=0, max_subscribers=0)
+
+    async def publish(self, op: str, changes: Iterable[Tuple[Any, Optional[Dict[str, Any]]]]) -> None:
+        return
+
+    async def announce_reset(self, reason: str) -> None:
+        return
+
+class MemoryBroadcaster(Broadcaster):
+    """Broadcaster delivering events to this worker's subscribers only, for SQLite and tests."""
+    name = "memory"
+
+    async def _send(self, events: List[ChangeEvent]) -> None:
+        for event in events:
+            self._deliver(event)
+
+class PostgresBroadcaster(Broadcaster):
+    """
+    Broadcaster sharing events between workers with Postgres LISTEN/NOTIFY.
+
+    Publishing sends NOTIFY on the pool connection, packing events into as
+    few payloads as fit. Each worker listens on a dedicated connection and
+    delivers what it hears, its own events included, so every worker's history
+    has the same events in the same order. Postgres delivers notifications in
+    commit order. Losing the listener connection may lose events, so
+    subscribers get a ``reset`` after it reconnects.
+    """
+    name = "postgres"
+
+    def __init__(
+        self,
+        channel: str,
+        history_size: int,
+        queue_size: int,
+        max_subscribers: int,
+        connection_name: str = "default",
+        reconnect_seconds: float = 1.0,
+        keepalive_seconds: float = 30.0,
+    ):
+        super().__init__(history_size, queue_size, max_subscribers)
+        self.channel = channel
+        self.connection_name = connection_name
+        self.reconnect_seconds = reconnect_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.listening = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await super().stop()
+
+    def _packets(self, events: List[ChangeEvent]) -> Iterable[str]:
+        """Pack events into JSON arrays under the NOTIFY payload limit."""
+        packet: List[bytes] = []
+        size = 2
+        for event in events:
+            data = event.json()
+            if len(data) + 2 > MAX_NOTIFY_BYTES:
+                # Too large to notify whole: send it without the representation, subscribers fetch the item
+                data = ChangeEvent(event.id, event.op, event.item_id, None, event.at).json()
+            if packet and size + len(data) + 1 > MAX_NOTIFY_BYTES:
+                yield "[" + b",".join(packet).decode() + "]"
+                packet, size = [], 2
+            packet.append(data)
+            size += len(data) + 1
+        if packet:
+            yield "[" + b",".join(packet).decode() + "]"
+
+    async def _send(self, events: List[ChangeEvent]) -> None:
+        client = connections.get(self.connection_name)
+        # One round trip however many packets; NOTIFY payloads go out when the statement commits
+        await client.execute_query(
+            "SELECT pg_notify($1, payload) FROM unnest($2::text[]) AS payload",
+            [self.channel, list(self._packets(events))],
+        )
+
+    async def announce_reset(self, reason: str) -> None:
+        # Delivered like events, so every worker resets once, in order with the events around it
+        try:
+            await connections.get(self.connection_name).execute_query(
+                "SELECT pg_notify($1, $2)", [self.channel, ChangeEvent.reset(reason).json().join((b"[", b"]")).decode()],
+            )
+        except Exception as e:
+            logger.warning(f"Failed to announce a change feed reset: {e}")
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            events = [ChangeEvent.from_dict(data) for data in json.loads(payload)]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed change feed notification: {e}")
+            return
+        for event in events:
+            if event.op == RESET:
+                self.reset(event.reason)
+            else:
+                self._deliver(event)
+
+    async def _connect(self) -> Any:
+        import asyncpg
+
+        client = connections.get(self.connection_name)
+        return await asyncpg.connect(
+            host=client.host,
+            port=client.port,
+            user=client.user,
+            password=client.password,
+            database=client.database,
+            server_settings=client.server_settings,
+            **{key: value for key, value in client.extra.items() if key in LISTENER_CONNECT_ARGS},
+        )
+
+    async def _listen(self) -> None:
+        """Hold a LISTEN connection, reconnecting whenever it is lost."""
+        connected_before = False
+        while True:
+            try:
+                connection = await self._connect()
+            except Exception as e:
+                logger.warning(f"Change feed listener failed to connect: {e}")
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+            try:
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _, lost=lost: lost.set())
+                await connection.add_listener(self.channel, self._on_notify)
+                self.listening = True
+                if connected_before:
+                    self.reset("listener_reconnected")
+                connected_before = True
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), self.keepalive_seconds)
+                    except asyncio.TimeoutError:
+                        # A quiet connection is only found dead when used
+                        await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed listener lost its connection: {e}")
+            finally:
+                self.listening = False
+                if not connection.is_closed():
+                    await connection.close(timeout=5)
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), "channel": self.channel, "listening": self.listening}
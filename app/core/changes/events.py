@@ -0,0 +1,102 @@
+"""Change events and subscriber filters."""
+import itertools
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Iterable, Optional
+
+from app.utils.api.responses import dumps
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+OPS = (CREATED, UPDATED, DELETED)
+# Control event telling subscribers that events may have been missed and they should resync
+RESET = "reset"
+
+class EventIds:
+    """
+    Unique event IDs: publish time in milliseconds, a per-process origin and a sequence number.
+
+    IDs are opaque cursors. Resuming finds the cursor in the history rather
+    than comparing IDs, so clock skew between workers does not matter.
+    """
+    def __init__(self):
+        self.origin = secrets.token_hex(4)
+        self._sequence = itertools.count(1)
+
+    def next(self) -> str:
+        return f"{int(time.time() * 1000)}-{self.origin}-{next(self._sequence)}"
+
+    def issued(self, event_id: str) -> bool:
+        """Whether an event ID came from this process."""
+        return event_id.split("-")[1:2] == [self.origin]
+
+class ChangeEvent:
+    """One change to an item: created/updated with the new representation, or deleted."""
+    __slots__ = ("id", "op", "item_id", "item", "at", "reason", "_json")
+
+    def __init__(
+        self,
+        id: str,
+        op: str,
+        item_id: Optional[str] = None,
+        item: Optional[Dict[str, Any]] = None,
+        at: Optional[str] = None,
+        reason: Optional[str] = None,
+    ):
+        self.id = id
+        self.op = op
+        self.item_id = item_id
+        self.item = item
+        self.at = at or datetime.now(timezone.utc).isoformat()
+        self.reason = reason
+        self._json: Optional[bytes] = None
+
+    @classmethod
+    def reset(cls, reason: str) -> "ChangeEvent":
+        """Control event for subscribers that may have missed events."""
+        return cls(id="", op=RESET, reason=reason)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChangeEvent":
+        return cls(data.get("id", ""), data["op"], data.get("item_id"), data.get("item"), data.get("at"), data.get("reason"))
+
+    def dict(self) -> Dict[str, Any]:
+        """Convert the event to a dict; the item is None for deletions."""
+        if self.op == RESET:
+            return {"op": self.op, "reason": self.reason, "at": self.at}
+        return {"id": self.id, "op": self.op, "item_id": self.item_id, "item": self.item, "at": self.at}
+
+    def json(self) -> bytes:
+        """The event as JSON, encoded once however many subscribers receive it."""
+        if self._json is None:
+            self._json = dumps(self.dict())
+        return self._json
+
+class ChangeFilter:
+    """
+    Which events a subscriber receives: by operation, by item ID and by offer flag.
+
+    Deletions carry no representation, so ``is_offer`` does not filter them out.
+    """
+    def __init__(
+        self,
+        ops: Optional[Iterable[str]] = None,
+        item_ids: Optional[Iterable[str]] = None,
+        is_offer: Optional[bool] = None,
+    ):
+        self.ops: Optional[FrozenSet[str]] = frozenset(ops) if ops else None
+        self.item_ids: Optional[FrozenSet[str]] = frozenset(item_ids) if item_ids else None
+        self.is_offer = is_offer
+
+    def matches(self, event: ChangeEvent) -> bool:
+        if event.op == RESET:
+            return True
+        if self.ops is not None and event.op not in self.ops:
+            return False
+        if self.item_ids is not None and event.item_id not in self.item_ids:
+            return False
+        if self.is_offer is not None and event.item is not None and bool(event.item.get("is_offer")) != self.is_offer:
+            return False
+        return True
@@ -0,0 +1,3 @@
+"""Response compression exports."""
+from .encoders import Encoder, available_encoders, negotiate, parse_accept_encoding
+from .middleware import CompressionMiddleware
@@ -0,0 +1,113 @@
+"""Streaming content encoders for HTTP response compression.
+
+Each encoder compresses one response. ``compress`` flushes after every chunk
+so a client can decode a streamed body as it arrives; ``finish`` ends the
+stream. Brotli and zstd are only offered when their packages are installed.
+"""
+import zlib
+from typing import Callable, Dict, List
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class Encoder:
+    """Interface for one response's incremental compressor."""
+    name = "identity"
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it, so everything sent so far can be decoded."""
+        raise NotImplementedError
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress a final chunk and end the stream."""
+        raise NotImplementedError
+
+class GzipEncoder(Encoder):
+    """gzip through zlib, sync-flushed per chunk."""
+    name = "gzip"
+
+    def __init__(self, level: int):
+        # wbits 16 + MAX_WBITS writes the gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH)
+
+class BrotliEncoder(Encoder):
+    """Brotli, flushed per chunk."""
+    name = "br"
+
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+class ZstdEncoder(Encoder):
+    """Zstandard, with a block flush per chunk."""
+    name = "zstd"
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+def available_encoders() -> Dict[str, Callable[[int], Encoder]]:
+    """Encoder factories by content-coding name, for the codecs installed here."""
+    encoders: Dict[str, Callable[[int], Encoder]] = {"gzip": GzipEncoder}
+    if brotli is not None:
+        encoders["br"] = BrotliEncoder
+    if zstandard is not None:
+        encoders["zstd"] = ZstdEncoder
+    return encoders
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into content-coding names and their q-values."""
+    accepted = {}
+    for part in value.split(","):
+        name, *params = [token.strip() for token in part.split(";")]
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, number = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.lower()] = quality
+    return accepted
+
+def negotiate(accept_encoding: str, preference: List[str]) -> str:
+    """
+    Pick a content-coding for a request, or "identity" for none.
+
+    The client's highest q-value wins; ties go to the earlier entry in the
+    server's preference list. A ``*`` entry covers codings not listed by name.
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = "identity", 0.0
+    for name in preference:
+        quality = accepted.get(name, wildcard)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
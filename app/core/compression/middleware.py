@@ -0,0 +1,123 @@
+"""Response compression middleware."""
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .encoders import Encoder, negotiate
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing response bodies with the best codec the client accepts.
+
+    The body is held back only until ``min_size`` bytes have arrived: smaller
+    complete bodies go out untouched, larger or streamed ones are compressed
+    chunk by chunk as the application sends them, so an NDJSON stream is
+    never buffered whole. Responses that are already encoded, marked
+    ``no-transform``, or not of an allowed content type pass through.
+    """
+    def __init__(
+        self,
+        app: Any,
+        encoders: Dict[str, Callable[[int], Encoder]],
+        levels: Dict[str, int],
+        preference: Sequence[str],
+        content_types: Sequence[str],
+        min_size: int = 500,
+        metrics: Any = None,
+    ):
+        self.app = app
+        self.encoders = encoders
+        self.levels = levels
+        self.preference: List[str] = [name for name in preference if name in encoders]
+        self.content_types = tuple(content_types)
+        self.min_size = min_size
+        self.metrics = metrics
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and content_type.startswith(self.content_types)
+        )
+
+    def _record(self, encoding: str, bytes_in: int, bytes_out: int, cpu_seconds: float) -> None:
+        metrics = self.metrics
+        if metrics is None:
+            return
+        labels = (encoding,)
+        metrics.compression_responses_total.inc(labels)
+        if encoding != "identity":
+            metrics.compression_bytes_in_total.inc(labels, bytes_in)
+            metrics.compression_bytes_out_total.inc(labels, bytes_out)
+            metrics.compression_cpu_seconds_total.inc(labels, cpu_seconds)
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.preference)
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[dict] = None
+        buffered = b""
+        encoder: Optional[Encoder] = None
+        bytes_in = bytes_out = 0
+        cpu_seconds = 0.0
+
+        def encode(chunk: bytes, more_body: bool) -> bytes:
+            nonlocal bytes_in, bytes_out, cpu_seconds
+            # CPU time of this thread only, so waiting on other tasks is not counted
+            started = time.thread_time()
+            data = encoder.compress(chunk) if more_body else encoder.finish(chunk)
+            cpu_seconds += time.thread_time() - started
+            bytes_in += len(chunk)
+            bytes_out += len(data)
+            return data
+
+        async def send_compressed(message: dict) -> None:
+            nonlocal start, buffered, encoder
+            if message["type"] == "http.response.start":
+                if self._compressible(MutableHeaders(scope=message)):
+                    start = message
+                    return
+            elif message["type"] == "http.response.body" and start is not None:
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                if encoder is None:
+                    buffered += body
+                    if more_body and len(buffered) < self.min_size:
+                        return
+                    headers = MutableHeaders(scope=start)
+                    if len(buffered) < self.min_size:
+                        self._record("identity", 0, 0, 0.0)
+                        await send(start)
+                        await send({"type": "http.response.body", "body": buffered, "more_body": False})
+                        return
+                    encoder = self.encoders[encoding](self.levels[encoding])
+                    body, buffered = buffered, b""
+                    headers["content-encoding"] = encoding
+                    headers.add_vary_header("Accept-Encoding")
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        # The compressed bytes differ from the identity ones a strong ETag promises
+                        headers["etag"] = "W/" + etag
+                    if more_body:
+                        del headers["content-length"]
+                    data = encode(body, more_body)
+                    if not more_body:
+                        headers["content-length"] = str(len(data))
+                    await send(start)
+                else:
+                    data = encode(body, more_body)
+                if not more_body:
+                    self._record(encoding, bytes_in, bytes_out, cpu_seconds)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
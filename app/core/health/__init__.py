@@ -0,0 +1,31 @@
+"""Health check exports."""
+from functools import partial
+
+from app.config import health_config, tortoise_config
+from app.config.db import TortoiseSettings
+from app.config.health import HealthSettings
+from .checks import DEGRADED, FAILING, OK, CheckResult, check_connection, check_pool, check_schema
+from .monitor import HealthMonitor
+
+def create_health_monitor(settings: HealthSettings, tortoise_settings: TortoiseSettings) -> HealthMonitor:
+    """
+    Create a health monitor checking the primary database, its pool, the schema and any replicas.
+
+    Args:
+        settings: Health check settings.
+        tortoise_settings: Database settings, used to find the replica connections.
+    """
+    monitor = HealthMonitor(
+        interval=settings.interval,
+        timeout=settings.timeout,
+        stale_after=settings.interval * settings.stale_intervals,
+    )
+    monitor.add_check("database", partial(check_connection, "default", settings.db_latency_degraded))
+    monitor.add_check("pool", partial(check_pool, "default", settings.pool_saturation_degraded), critical=False)
+    monitor.add_check("schema", check_schema)
+    # A lost replica is reported but does not take the whole instance out of rotation
+    for name in tortoise_settings.replicas.connection_names:
+        monitor.add_check(name, partial(check_connection, name, settings.db_latency_degraded), critical=False)
+    return monitor
+
+health_monitor = create_health_monitor(health_config, tortoise_config)
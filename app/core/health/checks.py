@@ -0,0 +1,83 @@
+"""Dependency checks run in the background by the health monitor."""
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from tortoise import Tortoise, connections
+
+from app.utils.db.migrations import Migration, discover, schema_status
+from app.utils.db.pool import InstrumentedAsyncpgDBClient
+
+OK = "ok"
+DEGRADED = "degraded"
+FAILING = "failing"
+
+class CheckResult:
+    """Outcome of one dependency check."""
+    def __init__(self, status: str, latency_seconds: float = 0.0, detail: Optional[Dict[str, Any]] = None):
+        self.status = status
+        self.latency_seconds = latency_seconds
+        self.detail = detail or {}
+        self.checked_at = time.monotonic()
+
+    def age(self) -> float:
+        """Seconds since the check ran."""
+        return time.monotonic() - self.checked_at
+
+    def dict(self) -> dict:
+        """Convert the result to a dict for the health endpoints."""
+        return {
+            "status": self.status,
+            "latency_seconds": round(self.latency_seconds, 6),
+            "age_seconds": round(self.age(), 3),
+            **self.detail,
+        }
+
+async def check_connection(connection_name: str, degraded_latency: float) -> CheckResult:
+    """Ping a database connection with SELECT 1, reporting degraded when it is slow."""
+    client = connections.get(connection_name)
+    started = time.perf_counter()
+    await client.execute_query("SELECT 1")
+    latency = time.perf_counter() - started
+    return CheckResult(DEGRADED if latency > degraded_latency else OK, latency)
+
+async def check_pool(connection_name: str, degraded_saturation: float) -> CheckResult:
+    """Report the share of pool connections in use, degraded when nearly exhausted or callers wait."""
+    client = connections.get(connection_name)
+    if not isinstance(client, InstrumentedAsyncpgDBClient):
+        return CheckResult(OK, detail={"pooled": False})
+
+    info = client.pool_info()
+    saturation = info.get("in_use", 0) / info["max_size"] if info["max_size"] else 0.0
+    status = DEGRADED if saturation >= degraded_saturation or info["waiting"] else OK
+    return CheckResult(status, detail={
+        "saturation": round(saturation, 3),
+        "in_use": info.get("in_use", 0),
+        "max_size": info["max_size"],
+        "waiting": info["waiting"],
+    })
+
+@lru_cache(maxsize=1)
+def shipped_migrations() -> List[Migration]:
+    """Migrations in the code, loaded once rather than on every check."""
+    return discover()
+
+async def check_schema() -> CheckResult:
+    """
+    Check the database's schema version against the migrations in the code.
+
+    Failing while migrations are pending, since the models may query columns
+    that do not exist yet; degraded when the database is ahead of the code,
+    as during a rolling deploy after a newer release has migrated.
+    """
+    if not Tortoise.apps:
+        return CheckResult(FAILING, detail={"error": "ORM not initialised"})
+    started = time.perf_counter()
+    status = await schema_status(connections.get("default"), shipped_migrations())
+    latency = time.perf_counter() - started
+    detail = {"version": status.current, "latest": status.latest}
+    if not status.up_to_date:
+        return CheckResult(FAILING, latency, {**detail, "pending": status.pending})
+    if status.current is not None and status.current > status.latest:
+        return CheckResult(DEGRADED, latency, detail)
+    return CheckResult(OK, latency, detail)
@@ -0,0 +1,122 @@
+"""Background health monitor serving cached dependency check results."""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from loguru import logger
+
+from .checks import DEGRADED, FAILING, OK, CheckResult
+
+Check = Callable[[], Awaitable[CheckResult]]
+
+class HealthMonitor:
+    """
+    Run dependency checks on an interval and keep the latest results in memory.
+
+    Probes read the cached results, so they never touch a dependency on the
+    request path. Only critical checks decide readiness; the others are
+    reported but never take the instance out of rotation.
+    """
+    def __init__(self, interval: float = 5.0, timeout: float = 2.0, stale_after: float = 15.0):
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after
+        self.checks: Dict[str, Check] = {}
+        self.critical: Dict[str, bool] = {}
+        self.results: Dict[str, CheckResult] = {}
+        self.started = False
+        self.draining = False
+        self.init_error: Optional[str] = None
+        self.created_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+
+    def add_check(self, name: str, check: Check, critical: bool = True) -> None:
+        """Register a dependency check under a name."""
+        self.checks[name] = check
+        self.critical[name] = critical
+
+    def record_init_error(self, error: Exception) -> None:
+        """Keep the instance unready because application initialisation failed."""
+        self.init_error = f"{type(error).__name__}: {error}"
+
+    def clear_init_error(self, error: Exception) -> None:
+        """Become ready again once a failed initialisation step succeeded on retry, unless another failure was recorded since."""
+        if self.init_error == f"{type(error).__name__}: {error}":
+            self.init_error = None
+
+    async def _run_check(self, name: str, check: Check) -> None:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(check(), self.timeout)
+        except asyncio.TimeoutError:
+            result = CheckResult(FAILING, time.perf_counter() - started, {"error": f"timed out after {self.timeout}s"})
+        except Exception as e:
+            result = CheckResult(FAILING, time.perf_counter() - started, {"error": f"{type(e).__name__}: {e}"})
+
+        previous = self.results.get(name)
+        if previous is None or previous.status != result.status:
+            log = logger.info if result.status == OK else logger.warning
+            log(f"Health check {name} is {result.status}")
+        self.results[name] = result
+
+    async def run_checks(self) -> None:
+        """Run every check concurrently and store the results."""
+        await asyncio.gather(*(self._run_check(name, check) for name, check in self.checks.items()))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_checks()
+
+    async def start(self) -> None:
+        """Run the checks once, then keep refreshing them in the background."""
+        if self._task is None:
+            await self.run_checks()
+            self.started = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Report not ready and stop refreshing the checks."""
+        self.draining = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def liveness(self) -> dict:
+        """Describe whether the process is alive; only a wedged event loop would stop this answering."""
+        return {"status": "alive", "uptime_seconds": round(time.monotonic() - self.created_at, 3)}
+
+    def readiness(self) -> tuple:
+        """
+        Decide whether the instance should receive traffic.
+
+        Returns:
+            A (ready, report) tuple, where report holds per-dependency results.
+        """
+        checks = {}
+        ready = self.started and not self.draining and self.init_error is None
+        for name in self.checks:
+            result = self.results.get(name)
+            if result is None:
+                report = {"status": FAILING, "error": "not checked yet"}
+            elif result.age() > self.stale_after:
+                report = {**result.dict(), "status": FAILING, "error": "result is stale"}
+            else:
+                report = result.dict()
+            report["critical"] = self.critical[name]
+            checks[name] = report
+            if self.critical[name] and report["status"] not in (OK, DEGRADED):
+                ready = False
+
+        report = {"checks": checks}
+        if self.init_error:
+            report["error"] = self.init_error
+        elif not self.started:
+            report["error"] = "starting"
+        elif self.draining:
+            report["error"] = "shutting down"
+        return ready, report
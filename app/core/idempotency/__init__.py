@@ -0,0 +1,38 @@
+"""Idempotency key exports."""
+from loguru import logger
+
+from app.config import idempotency_config
+from app.config.idempotency import IdempotencySettings
+from .coordinator import (
+    IdempotencyCoordinator,
+    IdempotencyInProgressError,
+    IdempotencyKeyReusedError,
+    request_fingerprint,
+)
+from .stores import (
+    DatabaseIdempotencyStore,
+    IdempotencyStore,
+    MemoryIdempotencyStore,
+    NullIdempotencyStore,
+    StoredResponse,
+)
+
+def create_idempotency_store(settings: IdempotencySettings) -> IdempotencyStore:
+    """
+    Create the idempotency store selected by the settings.
+
+    Args:
+        settings: Idempotency settings.
+    """
+    if settings.backend == "none":
+        return NullIdempotencyStore()
+    if settings.backend == "database":
+        return DatabaseIdempotencyStore(
+            ttl_seconds=settings.ttl_seconds,
+            pending_timeout_seconds=settings.pending_timeout_seconds,
+        )
+    if settings.backend != "memory":
+        logger.warning(f"Unknown idempotency backend {settings.backend!r}, using the in-process store")
+    return MemoryIdempotencyStore(max_entries=settings.max_entries, ttl_seconds=settings.ttl_seconds)
+
+idempotency = IdempotencyCoordinator(create_idempotency_store(idempotency_config))
@@ -0,0 +1,80 @@
+"""Run a request at most once per idempotency key."""
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from .stores import IdempotencyStore, StoredResponse
+
+class IdempotencyKeyReusedError(ValueError):
+    """Raised when a key is sent again with a different request payload."""
+
+class IdempotencyInProgressError(RuntimeError):
+    """Raised when another worker is still running the first request with a key."""
+
+def request_fingerprint(payload: bytes) -> str:
+    """Digest identifying a request payload, to tell a retry from a reused key."""
+    return hashlib.sha256(payload).hexdigest()
+
+class IdempotencyCoordinator:
+    """
+    Run a handler once per key and replay its stored response afterwards.
+
+    Concurrent requests with the same key in one worker wait for the first
+    one rather than each claiming the key, so only one handler runs. Across
+    workers the store's claim decides, and the losers get
+    IdempotencyInProgressError until the response is stored. Only 2xx
+    responses are stored; a failed request releases its key for a retry.
+    """
+    def __init__(self, store: IdempotencyStore):
+        self.store = store
+        self._inflight: Dict[str, "asyncio.Future[Optional[StoredResponse]]"] = {}
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        handler: Callable[[], Awaitable[Tuple[int, bytes]]],
+    ) -> Tuple[StoredResponse, bool]:
+        """
+        Return the response for a key, running the handler only if no response is stored.
+
+        Returns:
+            A (response, replayed) tuple; replayed is True when the handler did not run.
+        """
+        while key in self._inflight:
+            result = await asyncio.shield(self._inflight[key])
+            if result is not None:
+                return self._replay(result, fingerprint), True
+            # The first request failed and released the key; run it again
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        result = None
+        try:
+            stored = await self.store.claim(key, fingerprint)
+            if stored is not None:
+                result = stored if not stored.pending else None
+                if stored.pending and stored.fingerprint == fingerprint:
+                    raise IdempotencyInProgressError(f"A request with idempotency key {key!r} is still in progress")
+                return self._replay(stored, fingerprint), True
+
+            try:
+                status_code, body = await handler()
+            except BaseException:
+                await self.store.release(key)
+                raise
+            if 200 <= status_code < 300:
+                result = StoredResponse(fingerprint, status_code, body)
+                await self.store.complete(key, fingerprint, status_code, body)
+            else:
+                await self.store.release(key)
+            return StoredResponse(fingerprint, status_code, body), False
+        finally:
+            del self._inflight[key]
+            future.set_result(result)
+
+    @staticmethod
+    def _replay(stored: StoredResponse, fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise IdempotencyKeyReusedError("Idempotency key was already used with a different request payload")
+        return stored
@@ -0,0 +1,148 @@
+"""Stores remembering the response of each Idempotency-Key."""
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+
+from app.core.models.tortoise import IdempotencyRecord
+
+class StoredResponse(NamedTuple):
+    """A key's request fingerprint and response; the response is None while the request runs."""
+    fingerprint: str
+    status_code: Optional[int] = None
+    body: Optional[bytes] = None
+
+    @property
+    def pending(self) -> bool:
+        """Whether the first request with the key has not finished yet."""
+        return self.status_code is None
+
+class IdempotencyStore:
+    """Interface for stores mapping idempotency keys to stored responses."""
+    name = "base"
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        Reserve a key for a request about to run.
+
+        Returns None when the caller now owns the key, otherwise the entry
+        already stored for it, which may still be pending.
+        """
+        raise NotImplementedError
+
+    async def complete(self, key: str, fingerprint: str, status_code: int, body: bytes) -> None:
+        """Store the response of a claimed key."""
+        raise NotImplementedError
+
+    async def release(self, key: str) -> None:
+        """Give up a claimed key without a response, so a retry runs the request again."""
+        raise NotImplementedError
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the store."""
+        return {"backend": self.name}
+
+class NullIdempotencyStore(IdempotencyStore):
+    """Store that remembers nothing, used when idempotency keys are disabled."""
+    name = "none"
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        return None
+
+    async def complete(self, key: str, fingerprint: str, status_code: int, body: bytes) -> None:
+        return None
+
+    async def release(self, key: str) -> None:
+        return None
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """
+    Bounded in-process LRU store with a per-entry time to live.
+
+    Keys are only deduplicated within one worker; use the database store when
+    several workers serve the same clients.
+    """
+    name = "memory"
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, StoredResponse]]" = OrderedDict()
+
+    def _set(self, key: str, entry: StoredResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] >= time.monotonic():
+            self._entries.move_to_end(key)
+            return entry[1]
+        self._set(key, StoredResponse(fingerprint))
+        return None
+
+    async def complete(self, key: str, fingerprint: str, status_code: int, body: bytes) -> None:
+        self._set(key, StoredResponse(fingerprint, status_code, body))
+
+    async def release(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), "size": len(self._entries), "max_entries": self.max_entries}
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """
+    Store backed by the ``idempotency_keys`` table, shared by every worker.
+
+    The key's primary key constraint makes claims atomic across workers.
+    Expired rows are deleted at most once per ``ttl_seconds / 100`` by
+    whichever worker claims a key next.
+    """
+    name = "database"
+
+    def __init__(self, ttl_seconds: float, pending_timeout_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self.pending_timeout_seconds = pending_timeout_seconds
+        self._next_purge = 0.0
+
+    async def _purge_expired(self) -> None:
+        if time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + self.ttl_seconds / 100
+        await IdempotencyRecord.filter(expires_at__lt=timezone.now()).delete()
+
+    async def claim(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        await self._purge_expired()
+        now = timezone.now()
+        expires_at = now + timedelta(seconds=self.ttl_seconds)
+        try:
+            await IdempotencyRecord.create(key=key, fingerprint=fingerprint, created_at=now, expires_at=expires_at)
+            return None
+        except IntegrityError:
+            pass
+
+        record = await IdempotencyRecord.filter(key=key).first()
+        if record is None:
+            # Released or purged since the insert failed; let the caller run the request
+            return await self.claim(key, fingerprint)
+        abandoned = record.status_code is None and record.created_at < now - timedelta(seconds=self.pending_timeout_seconds)
+        if record.expires_at < now or abandoned:
+            # Take the key over, unless another worker got there first
+            taken = await IdempotencyRecord.filter(key=key, created_at=record.created_at).update(
+                fingerprint=fingerprint, status_code=None, body=None, created_at=now, expires_at=expires_at,
+            )
+            if taken:
+                return None
+            record = await IdempotencyRecord.get(key=key)
+        return StoredResponse(record.fingerprint, record.status_code, record.body)
+
+    async def complete(self, key: str, fingerprint: str, status_code: int, body: bytes) -> None:
+        await IdempotencyRecord.filter(key=key).update(status_code=status_code, body=body)
+
+    async def release(self, key: str) -> None:
+        await IdempotencyRecord.filter(key=key, status_code=None).delete()
@@ -0,0 +1,55 @@
+"""Background job exports."""
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from app.config import jobs_config
+from app.config.jobs import JobSettings
+from app.core.logs import parse_route_rates
+from .runner import JobContext, JobFailed, JobRunner, JobType, JobTypes
+from .stores import (
+    CANCELLED,
+    FAILED,
+    FINISHED,
+    QUEUED,
+    RUNNING,
+    STATUSES,
+    SUCCEEDED,
+    DatabaseJobStore,
+    JobRecord,
+    JobStore,
+    MemoryJobStore,
+)
+
+def create_job_store(settings: JobSettings) -> JobStore:
+    """
+    Create the job store selected by the settings.
+
+    Args:
+        settings: Background job settings.
+    """
+    if settings.backend == "database":
+        return DatabaseJobStore()
+    if settings.backend != "memory":
+        logger.warning(f"Unknown job backend {settings.backend!r}, using the in-process store")
+    return MemoryJobStore()
+
+job_store = create_job_store(jobs_config)
+job_types = JobTypes(parse_route_rates(jobs_config.type_limits), max_attempts=jobs_config.max_attempts)
+job_runner = JobRunner(
+    job_store,
+    job_types,
+    concurrency=jobs_config.concurrency,
+    poll_interval=jobs_config.poll_interval,
+    lease_seconds=jobs_config.lease_seconds,
+    backoff_seconds=jobs_config.backoff_seconds,
+    backoff_max_seconds=jobs_config.backoff_max_seconds,
+    retention_days=jobs_config.retention_days,
+    files_dir=jobs_config.files_dir,
+)
+
+async def submit_job(job_type: str, payload: Dict[str, Any], total: Optional[int] = None) -> JobRecord:
+    """Queue a job of a registered type and wake this worker's runner to pick it up."""
+    job = await job_store.submit(JobRecord.new(job_type, payload, job_types[job_type].max_attempts, total))
+    job_runner.wake()
+    return job
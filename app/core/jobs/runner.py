@@ -0,0 +1,279 @@
+"""Job runner: claims due jobs and runs their handlers as asyncio tasks."""
+import asyncio
+import os
+import random
+import secrets
+import socket
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+import uuid
+
+from loguru import logger
+from tortoise import timezone
+
+from .stores import CANCELLED, FAILED, SUCCEEDED, JobRecord, JobStore
+
+# How often a running job's progress is saved and its lease renewed
+HEARTBEAT_SECONDS = 1.0
+# How often finished jobs past their retention are deleted
+PURGE_INTERVAL_SECONDS = 3600.0
+
+class JobFailed(Exception):
+    """Raised by a handler for a failure that retrying cannot fix; the job fails without further attempts."""
+
+class JobContext:
+    """What a handler gets: the job's payload and a way to report progress."""
+    def __init__(self, job: JobRecord, files_dir: Path):
+        self.job_id: uuid.UUID = job.id
+        self.payload: Dict[str, Any] = job.payload
+        self.attempt: int = job.attempts
+        self.files_dir = files_dir
+        self.done: int = job.progress or 0
+        self.total: Optional[int] = job.total
+
+    def progress(self, done: int, total: Optional[int] = None) -> None:
+        """Record progress; it is saved with the next heartbeat rather than on every call."""
+        self.done = done
+        if total is not None:
+            self.total = total
+
+Handler = Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+class JobType(NamedTuple):
+    """A registered kind of job and how many of it may run at once in one worker."""
+    name: str
+    handler: Handler
+    concurrency: Optional[int]
+    max_attempts: int
+
+class JobTypes:
+    """Registry of job handlers by type name."""
+    def __init__(self, limits: Dict[str, float], max_attempts: int):
+        self.limits = limits
+        self.max_attempts = max_attempts
+        self._types: Dict[str, JobType] = {}
+
+    def register(self, name: str, max_attempts: Optional[int] = None) -> Callable[[Handler], Handler]:
+        """
+        Decorator registering an async handler for a job type.
+
+        The handler returns the job's result as a JSON-serialisable dict, or
+        None. Any exception other than JobFailed is retried with backoff, so
+        handlers must be safe to run again from the start.
+        """
+        def decorator(handler: Handler) -> Handler:
+            limit = self.limits.get(name)
+            self._types[name] = JobType(
+                name, handler, int(limit) if limit else None, max_attempts or self.max_attempts,
+            )
+            return handler
+        return decorator
+
+    def __getitem__(self, name: str) -> JobType:
+        return self._types[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._types
+
+    def __iter__(self):
+        return iter(self._types.values())
+
+class JobRunner:
+    """
+    Runs jobs of the registered types from a store, up to ``concurrency`` at a time.
+
+    Each job runs as an asyncio task next to a heartbeat that renews its
+    lease and saves its progress every second, and cancels it when the job
+    is cancelled. Failed attempts are queued again after an exponential
+    backoff with jitter until the job's attempts run out. On shutdown,
+    running jobs are interrupted and queued again without using up an
+    attempt.
+    """
+    def __init__(
+        self,
+        store: JobStore,
+        types: JobTypes,
+        concurrency: int,
+        poll_interval: float,
+        lease_seconds: float,
+        backoff_seconds: float,
+        backoff_max_seconds: float,
+        retention_days: float,
+        files_dir: str,
+    ):
+        self.store = store
+        self.types = types
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.retention_days = retention_days
+        self.files_dir = Path(files_dir)
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{secrets.token_hex(3)}"[-64:]
+        self.started = 0
+        self.outcomes: Dict[Tuple[str, str], int] = {}
+        self._running: Dict[uuid.UUID, Tuple[str, asyncio.Task]] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._next_purge = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Job runner {self.worker_id} started for {', '.join(t.name for t in self.types) or 'no job types'}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        tasks = [task for _, task in self._running.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def wake(self) -> None:
+        """Look for due jobs now rather than at the next poll, after a job was submitted here."""
+        self._wake.set()
+
+    def _free_types(self) -> Iterable[str]:
+        """Job types with a free slot under their own limit."""
+        running: Dict[str, int] = {}
+        for job_type, _ in self._running.values():
+            running[job_type] = running.get(job_type, 0) + 1
+        return [t.name for t in self.types if t.concurrency is None or running.get(t.name, 0) < t.concurrency]
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                while len(self._running) < self.concurrency:
+                    types = self._free_types()
+                    job = await self.store.claim(types, self.worker_id, self.lease_seconds) if types else None
+                    if job is None:
+                        break
+                    self.started += 1
+                    task = asyncio.create_task(self._run(job))
+                    self._running[job.id] = (job.type, task)
+                    task.add_done_callback(lambda task, job_id=job.id: self._done(job_id, task))
+                if time.monotonic() >= self._next_purge:
+                    self._next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+                    await self._purge()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Job runner failed to poll for jobs: {e}")
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _done(self, job_id: uuid.UUID, task: asyncio.Task) -> None:
+        self._running.pop(job_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            # The outcome could not be saved; the job runs again once its lease expires
+            logger.warning(f"Job {job_id} outcome could not be recorded: {task.exception()}")
+
+    def _record(self, job: JobRecord, outcome: str) -> None:
+        key = (job.type, outcome)
+        self.outcomes[key] = self.outcomes.get(key, 0) + 1
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds before the next attempt: doubling per attempt up to the maximum, with jitter against retry storms."""
+        delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _run(self, job: JobRecord) -> None:
+        job_type = self.types[job.type]
+        context = JobContext(job, self.files_dir)
+        task = asyncio.create_task(job_type.handler(context))
+        cancelled = False
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=HEARTBEAT_SECONDS)
+                if task.done():
+                    break
+                try:
+                    keep = await self.store.heartbeat(job.id, self.worker_id, self.lease_seconds, context.done, context.total)
+                except Exception as e:
+                    logger.warning(f"Job {job.id} heartbeat failed: {e}")
+                    continue
+                if not keep:
+                    cancelled = True
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back for another worker or the next start
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await self.store.release(job.id, self.worker_id)
+            self._record(job, "released")
+            raise
+
+        try:
+            result = task.result()
+        except asyncio.CancelledError:
+            if cancelled:
+                # Cancelled, or the lease was lost and another worker owns the job, in which case this is a no-op
+                await self.store.finish(job.id, self.worker_id, CANCELLED, progress=context.done, total=context.total)
+                self._record(job, CANCELLED)
+            return
+        except JobFailed as e:
+            await self._fail(job, context, str(e))
+            return
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts < job.max_attempts:
+                delay = self.backoff(job.attempts)
+                logger.warning(f"Job {job.id} ({job.type}) attempt {job.attempts} failed, retrying in {delay:.1f}s: {error}")
+                await self.store.retry(job.id, self.worker_id, error, timezone.now() + timedelta(seconds=delay))
+                self._record(job, "retried")
+            else:
+                await self._fail(job, context, error)
+            return
+        await self.store.finish(job.id, self.worker_id, SUCCEEDED, result=result, progress=context.done, total=context.total)
+        self._record(job, SUCCEEDED)
+
+    async def _fail(self, job: JobRecord, context: JobContext, error: str) -> None:
+        logger.error(f"Job {job.id} ({job.type}) failed after {job.attempts} attempt(s): {error}")
+        await self.store.finish(job.id, self.worker_id, FAILED, error=error, progress=context.done, total=context.total)
+        self._record(job, FAILED)
+
+    async def _purge(self) -> None:
+        """Delete jobs finished longer ago than the retention, and files as old: exports and leftover uploads."""
+        before = timezone.now() - timedelta(days=self.retention_days)
+        purged = await self.store.purge(before)
+        removed = await asyncio.to_thread(self._remove_files, before.timestamp())
+        if purged or removed:
+            logger.info(f"Purged {purged} finished job(s) and {removed} file(s)")
+
+    def _remove_files(self, before: float) -> int:
+        removed = 0
+        for path in self.files_dir.iterdir():
+            if path.is_file() and path.stat().st_mtime < before:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the runner and its counters."""
+        running: Dict[str, int] = {}
+        for job_type, _ in self._running.values():
+            running[job_type] = running.get(job_type, 0) + 1
+        return {
+            "worker": self.worker_id,
+            "store": self.store.info(),
+            "active": self.running,
+            "concurrency": self.concurrency,
+            "types": {t.name: {"concurrency": t.concurrency, "max_attempts": t.max_attempts} for t in self.types},
+            "running": running,
+            "started": self.started,
+            "outcomes": [{"type": job_type, "outcome": outcome, "count": count} for (job_type, outcome), count in self.outcomes.items()],
+        }
@@ -0,0 +1,362 @@
+"""Job stores: where submitted jobs wait, and how workers claim them."""
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from tortoise import timezone
+from tortoise.expressions import Q
+from tortoise.functions import Count
+
+from app.core.models.tortoise import Job
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+STATUSES = (QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED)
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Due jobs looked at per claim; more than one in case other workers take the first
+CLAIM_CANDIDATES = 10
+
+class JobRecord:
+    """A job as stored, independent of the backend."""
+    __slots__ = (
+        "id", "type", "status", "payload", "result", "error", "progress", "total", "attempts", "max_attempts",
+        "cancel_requested", "run_at", "locked_by", "locked_until", "created_at", "started_at", "finished_at",
+    )
+
+    def __init__(self, **values: Any):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    @classmethod
+    def new(cls, job_type: str, payload: Dict[str, Any], max_attempts: int, total: Optional[int] = None) -> "JobRecord":
+        now = timezone.now()
+        return cls(
+            id=uuid.uuid4(), type=job_type, status=QUEUED, payload=payload, progress=0, total=total, attempts=0,
+            max_attempts=max_attempts, cancel_requested=False, run_at=now, created_at=now,
+        )
+
+    @classmethod
+    def from_model(cls, job: Job) -> "JobRecord":
+        return cls(**{name: getattr(job, name) for name in cls.__slots__})
+
+    def dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class JobStore:
+    """
+    Interface for job stores.
+
+    A worker claims a due job by taking a lease on it, renews the lease while
+    the job runs, and finishes, retries or releases it. A job whose lease
+    runs out was abandoned by a worker that died, and is claimed again.
+    Every state change after the claim is conditional on the worker still
+    holding the job, so a worker that lost its lease cannot overwrite the
+    outcome of the one that took over.
+    """
+    name = "base"
+
+    async def submit(self, job: JobRecord) -> JobRecord:
+        """Store a new queued job."""
+        raise NotImplementedError
+
+    async def get(self, job_id: uuid.UUID) -> Optional[JobRecord]:
+        raise NotImplementedError
+
+    async def list(self, job_type: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[JobRecord]:
+        """The most recently submitted jobs, newest first."""
+        raise NotImplementedError
+
+    async def claim(self, types: Iterable[str], worker: str, lease_seconds: float) -> Optional[JobRecord]:
+        """
+        Take the job of one of these types that has been due longest, or None.
+
+        Claiming starts a new attempt. A job abandoned on its last attempt is
+        failed instead, and one abandoned after a cancel request cancelled.
+        """
+        raise NotImplementedError
+
+    async def heartbeat(
+        self, job_id: uuid.UUID, worker: str, lease_seconds: float, progress: int, total: Optional[int],
+    ) -> bool:
+        """Renew the lease and record progress; False when the job was cancelled or the lease lost."""
+        raise NotImplementedError
+
+    async def finish(
+        self,
+        job_id: uuid.UUID,
+        worker: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        progress: Optional[int] = None,
+        total: Optional[int] = None,
+    ) -> bool:
+        """Record the outcome of a claimed job; False when the worker no longer held it."""
+        raise NotImplementedError
+
+    async def retry(self, job_id: uuid.UUID, worker: str, error: str, run_at: datetime) -> bool:
+        """Queue a claimed job again for its next attempt at run_at."""
+        raise NotImplementedError
+
+    async def release(self, job_id: uuid.UUID, worker: str) -> bool:
+        """Queue a claimed job again straight away without using up an attempt, on shutdown."""
+        raise NotImplementedError
+
+    async def cancel(self, job_id: uuid.UUID) -> Optional[JobRecord]:
+        """Cancel a queued job, or ask the worker running it to stop; None if there is no such job."""
+        raise NotImplementedError
+
+    async def purge(self, before: datetime) -> int:
+        """Delete jobs finished before a time, returning how many were deleted."""
+        raise NotImplementedError
+
+    async def counts(self) -> Dict[Tuple[str, str], int]:
+        """Number of jobs by (type, status)."""
+        raise NotImplementedError
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the store."""
+        return {"backend": self.name}
+
+class MemoryJobStore(JobStore):
+    """
+    In-process job store.
+
+    Jobs are lost on restart and only run by the worker that submitted them;
+    use the database store in production.
+    """
+    name = "memory"
+
+    def __init__(self):
+        self._jobs: Dict[uuid.UUID, JobRecord] = {}
+
+    def _held(self, job_id: uuid.UUID, worker: str) -> Optional[JobRecord]:
+        job = self._jobs.get(job_id)
+        if job is None or job.status != RUNNING or job.locked_by != worker:
+            return None
+        return job
+
+    @staticmethod
+    def _unlock(job: JobRecord, status: str) -> None:
+        job.status = status
+        job.locked_by = job.locked_until = None
+        if status in FINISHED:
+            job.finished_at = timezone.now()
+
+    async def submit(self, job: JobRecord) -> JobRecord:
+        self._jobs[job.id] = job
+        return job
+
+    async def get(self, job_id: uuid.UUID) -> Optional[JobRecord]:
+        return self._jobs.get(job_id)
+
+    async def list(self, job_type: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[JobRecord]:
+        jobs = [
+            job for job in reversed(self._jobs.values())
+            if (job_type is None or job.type == job_type) and (status is None or job.status == status)
+        ]
+        return jobs[:limit]
+
+    async def claim(self, types: Iterable[str], worker: str, lease_seconds: float) -> Optional[JobRecord]:
+        now = timezone.now()
+        types = set(types)
+        due = sorted(
+            (
+                job for job in self._jobs.values()
+                if job.type in types and (
+                    (job.status == QUEUED and job.run_at <= now)
+                    or (job.status == RUNNING and job.locked_until < now)
+                )
+            ),
+            key=lambda job: job.run_at,
+        )
+        for job in due:
+            if job.status == RUNNING and (job.cancel_requested or job.attempts >= job.max_attempts):
+                job.error = job.error if job.cancel_requested else "Worker stopped renewing its lease"
+                self._unlock(job, CANCELLED if job.cancel_requested else FAILED)
+                continue
+            job.status = RUNNING
+            job.attempts += 1
+            job.locked_by = worker
+            job.locked_until = now + timedelta(seconds=lease_seconds)
+            job.started_at = now
+            return job
+        return None
+
+    async def heartbeat(
+        self, job_id: uuid.UUID, worker: str, lease_seconds: float, progress: int, total: Optional[int],
+    ) -> bool:
+        job = self._held(job_id, worker)
+        if job is None or job.cancel_requested:
+            return False
+        job.locked_until = timezone.now() + timedelta(seconds=lease_seconds)
+        job.progress, job.total = progress, total
+        return True
+
+    async def finish(
+        self,
+        job_id: uuid.UUID,
+        worker: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        progress: Optional[int] = None,
+        total: Optional[int] = None,
+    ) -> bool:
+        job = self._held(job_id, worker)
+        if job is None:
+            return False
+        job.result, job.error = result, error
+        if progress is not None:
+            job.progress, job.total = progress, total
+        self._unlock(job, status)
+        return True
+
+    async def retry(self, job_id: uuid.UUID, worker: str, error: str, run_at: datetime) -> bool:
+        job = self._held(job_id, worker)
+        if job is None:
+            return False
+        job.error, job.run_at = error, run_at
+        self._unlock(job, QUEUED)
+        return True
+
+    async def release(self, job_id: uuid.UUID, worker: str) -> bool:
+        job = self._held(job_id, worker)
+        if job is None:
+            return False
+        job.attempts -= 1
+        job.run_at = timezone.now()
+        self._unlock(job, QUEUED)
+        return True
+
+    async def cancel(self, job_id: uuid.UUID) -> Optional[JobRecord]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if job.status == QUEUED:
+            self._unlock(job, CANCELLED)
+        elif job.status == RUNNING:
+            job.cancel_requested = True
+        return job
+
+    async def purge(self, before: datetime) -> int:
+        purged = [job.id for job in self._jobs.values() if job.status in FINISHED and job.finished_at < before]
+        for job_id in purged:
+            del self._jobs[job_id]
+        return len(purged)
+
+    async def counts(self) -> Dict[Tuple[str, str], int]:
+        return dict(Counter((job.type, job.status) for job in self._jobs.values()))
+
+    def info(self) -> Dict[str, Any]:
+        return {**super().info(), "size": len(self._jobs)}
+
+class DatabaseJobStore(JobStore):
+    """
+    Store backed by the ``jobs`` table, shared by every worker and surviving restarts.
+
+    Claims are compare-and-swap updates on (id, status, attempts): of the
+    workers that pick the same due job, only the first update matches, and
+    the others move on to the next candidate. This works the same on every
+    dialect, and the (status, run_at) index keeps finding due jobs cheap.
+    """
+    name = "database"
+
+    async def submit(self, job: JobRecord) -> JobRecord:
+        await Job.create(**job.dict())
+        return job
+
+    async def get(self, job_id: uuid.UUID) -> Optional[JobRecord]:
+        job = await Job.filter(id=job_id).first()
+        return JobRecord.from_model(job) if job else None
+
+    async def list(self, job_type: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[JobRecord]:
+        queryset = Job.all()
+        if job_type is not None:
+            queryset = queryset.filter(type=job_type)
+        if status is not None:
+            queryset = queryset.filter(status=status)
+        return [JobRecord.from_model(job) for job in await queryset.order_by("-created_at").limit(limit)]
+
+    async def claim(self, types: Iterable[str], worker: str, lease_seconds: float) -> Optional[JobRecord]:
+        now = timezone.now()
+        candidates = await Job.filter(
+            Q(status=QUEUED, run_at__lte=now) | Q(status=RUNNING, locked_until__lt=now), type__in=list(types),
+        ).order_by("run_at").limit(CLAIM_CANDIDATES).values("id", "status", "attempts", "max_attempts", "cancel_requested")
+        for candidate in candidates:
+            current = Job.filter(id=candidate["id"], status=candidate["status"], attempts=candidate["attempts"])
+            if candidate["status"] == RUNNING and (candidate["cancel_requested"] or candidate["attempts"] >= candidate["max_attempts"]):
+                if candidate["cancel_requested"]:
+                    await current.update(status=CANCELLED, locked_by=None, locked_until=None, finished_at=now)
+                else:
+                    await current.update(
+                        status=FAILED, error="Worker stopped renewing its lease",
+                        locked_by=None, locked_until=None, finished_at=now,
+                    )
+                continue
+            taken = await current.update(
+                status=RUNNING,
+                attempts=candidate["attempts"] + 1,
+                locked_by=worker,
+                locked_until=now + timedelta(seconds=lease_seconds),
+                started_at=now,
+            )
+            if taken:
+                return await self.get(candidate["id"])
+        return None
+
+    async def heartbeat(
+        self, job_id: uuid.UUID, worker: str, lease_seconds: float, progress: int, total: Optional[int],
+    ) -> bool:
+        # One statement: a cancel request or a lost lease both leave no row to update
+        updated = await Job.filter(id=job_id, status=RUNNING, locked_by=worker, cancel_requested=False).update(
+            locked_until=timezone.now() + timedelta(seconds=lease_seconds), progress=progress, total=total,
+        )
+        return bool(updated)
+
+    async def finish(
+        self,
+        job_id: uuid.UUID,
+        worker: str,
+        status: str,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        progress: Optional[int] = None,
+        total: Optional[int] = None,
+    ) -> bool:
+        values = dict(status=status, result=result, error=error, locked_by=None, locked_until=None, finished_at=timezone.now())
+        if progress is not None:
+            values.update(progress=progress, total=total)
+        return bool(await Job.filter(id=job_id, status=RUNNING, locked_by=worker).update(**values))
+
+    async def retry(self, job_id: uuid.UUID, worker: str, error: str, run_at: datetime) -> bool:
+        return bool(await Job.filter(id=job_id, status=RUNNING, locked_by=worker).update(
+            status=QUEUED, error=error, run_at=run_at, locked_by=None, locked_until=None,
+        ))
+
+    async def release(self, job_id: uuid.UUID, worker: str) -> bool:
+        job = await Job.filter(id=job_id, status=RUNNING, locked_by=worker).first().values("attempts")
+        if not job:
+            return False
+        return bool(await Job.filter(id=job_id, status=RUNNING, locked_by=worker).update(
+            status=QUEUED, attempts=job["attempts"] - 1, run_at=timezone.now(), locked_by=None, locked_until=None,
+        ))
+
+    async def cancel(self, job_id: uuid.UUID) -> Optional[JobRecord]:
+        now = timezone.now()
+        if not await Job.filter(id=job_id, status=QUEUED).update(status=CANCELLED, finished_at=now):
+            # Running jobs stop at their worker's next heartbeat
+            await Job.filter(id=job_id, status=RUNNING).update(cancel_requested=True)
+        return await self.get(job_id)
+
+    async def purge(self, before: datetime) -> int:
+        return await Job.filter(status__in=FINISHED, finished_at__lt=before).delete()
+
+    async def counts(self) -> Dict[Tuple[str, str], int]:
+        rows = await Job.all().group_by("type", "status").annotate(count=Count("id")).values("type", "status", "count")
+        return {(row["type"], row["status"]): row["count"] for row in rows}
@@ -0,0 +1,3 @@
+"""Logging exports."""
+from .middleware import AccessLogMiddleware, parse_route_rates
+from .sinks import configure_logging
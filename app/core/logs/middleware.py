@@ -0,0 +1,62 @@
+"""Access log middleware."""
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+def parse_route_rates(value: str) -> Dict[str, float]:
+    """Parse comma-separated route=rate pairs into a mapping."""
+    rates = {}
+    for pair in value.split(","):
+        route, _, rate = pair.partition("=")
+        if route.strip() and rate.strip():
+            rates[route.strip()] = float(rate)
+    return rates
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI middleware writing one sampled access log line per request.
+
+    The sampling rate is looked up by route template, then by raw path, so
+    health checks can be silenced entirely with a rate of 0.
+    """
+    def __init__(self, app: Any, sample_rate: float = 1.0, route_rates: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.route_rates = route_rates or {}
+
+    def _rate(self, scope: dict) -> float:
+        route = scope.get("route")
+        if route is not None and route.path in self.route_rates:
+            return self.route_rates[route.path]
+        return self.route_rates.get(scope["path"], self.sample_rate)
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            rate = self._rate(scope)
+            if rate >= 1.0 or (rate > 0.0 and random.random() < rate):
+                duration_ms = round((time.perf_counter() - started) * 1000, 3)
+                client = scope.get("client")
+                logger.bind(
+                    method=scope["method"],
+                    path=scope["path"],
+                    status=status_code,
+                    duration_ms=duration_ms,
+                    client=client[0] if client else None,
+                ).info("{} {} {} {}ms", scope["method"], scope["path"], status_code, duration_ms)
@@ -0,0 +1,24 @@
+"""Loguru sink configuration."""
+import sys
+
+from loguru import logger
+
+from app.config.logging import LoggingSettings
+
+TEXT_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
+
+def configure_logging(settings: LoggingSettings) -> None:
+    """
+    Replace loguru's default handler with the configured stdout sink.
+
+    Args:
+        settings: Logging settings.
+    """
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        level=settings.level,
+        format=TEXT_FORMAT,
+        serialize=settings.json,
+        enqueue=settings.enqueue,
+    )
@@ -0,0 +1,180 @@
+"""Application metrics exports."""
+import os
+from typing import Iterable
+
+from app.config import metrics_config
+from app.core.admission import rate_limiter, route_limiters
+from app.core.cache import item_cache, item_flights, list_flights
+from app.core.changes import change_feed
+from app.core.jobs import job_runner
+from app.utils.db.pool import pool_metrics
+from .db import QueryStats, current_query_stats, install_query_hooks
+from .middleware import EventLoopLagMonitor, MetricsMiddleware
+from .multiprocess import SnapshotStore, SnapshotWriter
+from .registry import Counter, Gauge, Histogram, Metric, Registry
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+class AppMetrics:
+    """Metrics recorded by the application, registered on one registry."""
+    def __init__(self, registry: Registry):
+        self.registry = registry
+        self.http_requests_total = registry.register(Counter(
+            "http_requests_total", "HTTP requests by method, route and status code", ("method", "route", "status"),
+        ))
+        self.http_request_duration_seconds = registry.register(Histogram(
+            "http_request_duration_seconds", "HTTP request latency by method and route", ("method", "route"),
+        ))
+        self.http_requests_in_flight = registry.register(Gauge(
+            "http_requests_in_flight", "HTTP requests currently being handled",
+        ))
+        self.db_queries_total = registry.register(Counter(
+            "db_queries_total", "Database queries issued",
+        ))
+        self.db_query_duration_seconds = registry.register(Histogram(
+            "db_query_duration_seconds", "Database query latency",
+        ))
+        self.db_queries_per_request = registry.register(Histogram(
+            "db_queries_per_request", "Database queries issued per HTTP request", ("method", "route"),
+            buckets=QUERY_COUNT_BUCKETS,
+        ))
+        self.db_time_per_request_seconds = registry.register(Histogram(
+            "db_time_per_request_seconds", "Time spent in the database per HTTP request", ("method", "route"),
+        ))
+        self.event_loop_lag_seconds = registry.register(Gauge(
+            "event_loop_lag_seconds", "How late the event loop last woke up a sleeping task", aggregate="max",
+        ))
+        self.admission_rejections_total = registry.register(Counter(
+            "admission_rejections_total", "Requests shed by admission control, by route and reason", ("route", "reason"),
+        ))
+        self.admission_queue_wait_seconds = registry.register(Histogram(
+            "admission_queue_wait_seconds", "Time admitted requests waited for a concurrency slot", ("route",),
+        ))
+        self.compression_responses_total = registry.register(Counter(
+            "compression_responses_total", "Compressible responses by content-coding, identity when under the size threshold",
+            ("encoding",),
+        ))
+        self.compression_bytes_in_total = registry.register(Counter(
+            "compression_bytes_in_total", "Response bytes before compression", ("encoding",),
+        ))
+        self.compression_bytes_out_total = registry.register(Counter(
+            "compression_bytes_out_total", "Response bytes after compression", ("encoding",),
+        ))
+        self.compression_cpu_seconds_total = registry.register(Counter(
+            "compression_cpu_seconds_total", "CPU time spent compressing responses", ("encoding",),
+        ))
+        self.compression_level = registry.register(Gauge(
+            "compression_level", "Configured compression level by content-coding", ("encoding",), aggregate="max",
+        ))
+
+    def record_query(self, seconds: float) -> None:
+        """Record one database query, globally and against the current request."""
+        self.db_queries_total.inc()
+        self.db_query_duration_seconds.observe(seconds)
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+
+def collect_cache_metrics() -> Iterable[Metric]:
+    """Build item cache metrics from the cache's counters."""
+    info = item_cache.info()
+    labels = (info["backend"],)
+    for key in ("hits", "misses", "evictions"):
+        counter = Counter(f"item_cache_{key}_total", f"Item cache {key}", ("backend",))
+        counter.inc(labels, info[key])
+        yield counter
+    if "size" in info:
+        size = Gauge("item_cache_entries", "Entries held by the item cache", ("backend",))
+        size.set(info["size"], labels)
+        yield size
+
+def collect_flight_metrics() -> Iterable[Metric]:
+    """Build single-flight metrics showing how many item queries coalescing saved."""
+    calls = Counter("singleflight_calls_total", "Item reads that ran their own query", ("group",))
+    shared = Counter("singleflight_shared_total", "Item reads that joined a running query instead of issuing one", ("group",))
+    in_flight = Gauge("singleflight_in_flight", "Item queries currently running with callers attached", ("group",))
+    max_waiters = Gauge(
+        "singleflight_max_waiters", "Most callers that have joined a single running query", ("group",), aggregate="max",
+    )
+    for flights in (item_flights, list_flights):
+        info = flights.info()
+        labels = (info["group"],)
+        calls.inc(labels, info["calls"])
+        shared.inc(labels, info["shared"])
+        in_flight.set(info["in_flight"], labels)
+        max_waiters.set(info["max_waiters"], labels)
+    return calls, shared, in_flight, max_waiters
+
+def collect_admission_metrics() -> Iterable[Metric]:
+    """Build gauges of the load on each route's concurrency limiter, and the errors of a shared rate limiter."""
+    gauges = {
+        key: Gauge(f"admission_{key}", f"Requests {key.replace('_', ' ')} per route under admission control", ("route",))
+        for key in ("limit", "in_flight", "waiting")
+    }
+    for route, info in route_limiters.info().items():
+        for key, gauge in gauges.items():
+            gauge.set(info[key], (route,))
+    yield from gauges.values()
+    info = rate_limiter.info() if rate_limiter is not None else {}
+    if "errors" in info:
+        errors = Counter(
+            "admission_rate_limiter_errors_total", "Rate limiter calls that failed and let the request through", ("backend",),
+        )
+        errors.inc((info["backend"],), info["errors"])
+        yield errors
+
+def collect_change_feed_metrics() -> Iterable[Metric]:
+    """Build change feed metrics from the broadcaster's counters."""
+    info = change_feed.info()
+    labels = (info["backend"],)
+    subscribers = Gauge("changes_subscribers", "Change feed subscribers connected to this worker", ("backend",))
+    subscribers.set(info["subscribers"], labels)
+    yield subscribers
+    for key, help_text in (
+        ("published", "Item change events published by this worker"),
+        ("delivered", "Item change events delivered to this worker's subscribers"),
+        ("overflows", "Change feed subscribers disconnected for falling too far behind"),
+        ("resets", "Times change feed subscribers were told to resync after events may have been lost"),
+    ):
+        counter = Counter(f"changes_{key}_total", help_text, ("backend",))
+        counter.inc(labels, info[key])
+        yield counter
+
+def collect_job_metrics() -> Iterable[Metric]:
+    """Build background job metrics from this worker's runner."""
+    info = job_runner.info()
+    running = Gauge("jobs_running", "Background jobs running in this worker", ("type",))
+    for job_type in info["types"]:
+        running.set(info["running"].get(job_type, 0), (job_type,))
+    yield running
+    outcomes = Counter("jobs_finished_total", "Job attempts ended in this worker, by type and outcome", ("type", "outcome"))
+    for outcome in info["outcomes"]:
+        outcomes.inc((outcome["type"], outcome["outcome"]), outcome["count"])
+    yield outcomes
+
+def collect_pool_metrics() -> Iterable[Metric]:
+    """Build connection pool gauges from the pools' current state."""
+    gauges = {
+        key: Gauge(f"db_pool_{key}", f"Connection pool {key.replace('_', ' ')}", ("connection",))
+        for key in ("size", "in_use", "idle", "waiting")
+    }
+    for connection, info in pool_metrics().items():
+        for key, gauge in gauges.items():
+            if key in info:
+                gauge.set(info[key], (connection,))
+    return gauges.values()
+
+if metrics_config.multiprocess_dir:
+    # Whichever worker is scraped answers for all of the server's workers
+    registry = Registry(store=SnapshotStore(metrics_config.multiprocess_dir))
+else:
+    # Every worker answers /metrics with its own counters; the label keeps their series apart
+    registry = Registry({metrics_config.worker_label: str(os.getpid())} if metrics_config.worker_label else None)
+metrics = AppMetrics(registry)
+registry.add_collector(collect_cache_metrics)
+registry.add_collector(collect_flight_metrics)
+registry.add_collector(collect_admission_metrics)
+registry.add_collector(collect_change_feed_metrics)
+registry.add_collector(collect_job_metrics)
+registry.add_collector(collect_pool_metrics)
@@ -0,0 +1,66 @@
+"""Query timing hooks for Tortoise ORM database clients."""
+import functools
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+QUERY_METHODS = ("execute_query", "execute_query_dict", "execute_insert", "execute_many", "execute_script")
+
+class QueryStats:
+    """Number of queries and time spent in the database for one request."""
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+# Stats of the request currently being handled, set by the metrics middleware
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+def _all_subclasses(cls: type) -> list:
+    """Return every subclass of a class, recursively."""
+    subclasses = []
+    for subclass in cls.__subclasses__():
+        subclasses.append(subclass)
+        subclasses.extend(_all_subclasses(subclass))
+    return subclasses
+
+def install_query_hooks(record: Callable[[float], None]) -> None:
+    """
+    Time every query issued through Tortoise's database clients.
+
+    Wraps the execute methods of all loaded client and transaction classes,
+    so it covers executor queries as well as raw update/delete/count queries.
+
+    Args:
+        record: Called with the duration in seconds of each query.
+    """
+    # Load the dialects in use so their client classes are visible as subclasses
+    import tortoise.backends.sqlite.client  # noqa: F401
+    try:
+        import tortoise.backends.asyncpg.client  # noqa: F401
+    except ImportError:
+        pass
+
+    def timed(method: Callable) -> Callable:
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                record(time.perf_counter() - started)
+
+        wrapper.__query_timed__ = True
+        return wrapper
+
+    for cls in _all_subclasses(BaseDBAsyncClient):
+        for name in QUERY_METHODS:
+            method = cls.__dict__.get(name)
+            if method is None or getattr(method, "__query_timed__", False):
+                continue
+            if getattr(method, "__isabstractmethod__", False):
+                continue
+            setattr(cls, name, timed(method))
@@ -0,0 +1,80 @@
+"""ASGI middleware and background monitors feeding the metrics registry."""
+import asyncio
+import time
+from typing import Any, Callable, Optional
+
+from .db import QueryStats, current_query_stats
+
+UNMATCHED_ROUTE = "unmatched"
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route request metrics.
+
+    Labels are kept as tuples of raw values; nothing is formatted until scrape time.
+    """
+    def __init__(self, app: Any, metrics: Any):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        query_stats = QueryStats()
+        token = current_query_stats.set(query_stats)
+        metrics.http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.http_requests_in_flight.dec()
+            current_query_stats.reset(token)
+
+            # The router stores the matched route in the scope; use its template, not the raw path
+            route = scope.get("route")
+            path = route.path if route is not None else UNMATCHED_ROUTE
+            method = scope["method"]
+            metrics.http_requests_total.inc((method, path, status_code))
+            metrics.http_request_duration_seconds.observe(elapsed, (method, path))
+            metrics.db_queries_per_request.observe(query_stats.count, (method, path))
+            metrics.db_time_per_request_seconds.observe(query_stats.seconds, (method, path))
+
+class EventLoopLagMonitor:
+    """Background task measuring how late the event loop wakes up a sleeping task."""
+    def __init__(self, gauge: Any, interval: float = 0.5):
+        self.gauge = gauge
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.gauge.set(max(0.0, time.perf_counter() - started - self.interval))
+
+    async def start(self) -> None:
+        """Start measuring on the running loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
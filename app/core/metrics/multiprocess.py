@@ -0,0 +1,184 @@
+"""
+Metrics aggregated across the worker processes of one server.
+
+A scrape reaches one random worker, so each worker writes a snapshot of its
+metrics to a directory shared by the server's workers, and the worker that
+answers the scrape merges every snapshot. Counters and histograms of workers
+that exited are folded into an archive so their totals never go backwards;
+their gauges are dropped.
+"""
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from loguru import logger
+
+from .registry import Counter, Gauge, Histogram, Metric, ValueMetric
+
+try:
+    import fcntl
+except ImportError:  # Windows, where the production server runs a single worker
+    fcntl = None
+
+SNAPSHOT_PREFIX = "worker-"
+ARCHIVE_FILE = "archive.json"
+LOCK_FILE = "archive.lock"
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process with this PID is still running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def dump_metric(metric: Metric) -> Dict[str, Any]:
+    """Serialise a metric family and its samples."""
+    data = {
+        "name": metric.name,
+        "type": metric.type,
+        "documentation": metric.documentation,
+        "labelnames": list(metric.labelnames),
+        "values": [[[str(label) for label in labels], value] for labels, value in metric._values.items()],
+    }
+    if isinstance(metric, Histogram):
+        data["buckets"] = list(metric.buckets)
+    if isinstance(metric, Gauge):
+        data["aggregate"] = metric.aggregate
+    return data
+
+def merge_metrics(families: Iterable[Dict[str, Any]]) -> Dict[str, Metric]:
+    """Merge serialised metric families by name, combining samples with the same labels."""
+    merged: Dict[str, Metric] = {}
+    for data in families:
+        metric = merged.get(data["name"])
+        if metric is None:
+            if data["type"] == "histogram":
+                metric = Histogram(data["name"], data["documentation"], data["labelnames"], buckets=data["buckets"])
+            elif data["type"] == "gauge":
+                metric = Gauge(data["name"], data["documentation"], data["labelnames"], aggregate=data.get("aggregate", "sum"))
+            else:
+                metric = Counter(data["name"], data["documentation"], data["labelnames"])
+            merged[data["name"]] = metric
+        for labels, value in data["values"]:
+            labels = tuple(labels)
+            if isinstance(metric, ValueMetric):
+                if isinstance(metric, Gauge) and metric.aggregate == "max" and labels in metric._values:
+                    metric.set(max(metric._values[labels], value), labels)
+                else:
+                    metric.inc(labels, value)
+            else:
+                state = metric._values.get(labels)
+                metric._values[labels] = list(value) if state is None else [a + b for a, b in zip(state, value)]
+    return merged
+
+class SnapshotStore:
+    """Snapshot files of the workers sharing one directory."""
+    def __init__(self, directory: str, pid: int = 0):
+        self.directory = Path(directory)
+        self.pid = pid or os.getpid()
+        self.path = self.directory / f"{SNAPSHOT_PREFIX}{self.pid}.json"
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _read(self, path: Path) -> List[Dict[str, Any]]:
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return []
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable metrics snapshot {path}: {e}")
+            return []
+
+    def _write(self, path: Path, families: List[Dict[str, Any]]) -> None:
+        # Write then rename, so readers never see a partial file
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(families))
+        os.replace(temporary, path)
+
+    def _fold(self, paths: Iterable[Path]) -> None:
+        """Add the counters and histograms of exited workers to the archive and remove their snapshots; call under the lock."""
+        paths = [path for path in paths if path.exists()]
+        if not paths:
+            return
+        families = self._read(self.directory / ARCHIVE_FILE)
+        for path in paths:
+            families.extend(data for data in self._read(path) if data["type"] != "gauge")
+        archive = [dump_metric(metric) for metric in merge_metrics(families).values()]
+        self._write(self.directory / ARCHIVE_FILE, archive)
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def _locked(self):
+        """Open the lock file holding an exclusive lock, released when it is closed."""
+        lock = open(self.directory / LOCK_FILE, "a")
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def write(self, metrics: Iterable[Metric]) -> None:
+        """Store this worker's current metrics."""
+        self._write(self.path, [dump_metric(metric) for metric in metrics])
+
+    def collect(self) -> List[Metric]:
+        """Merge the snapshots of every worker with the archive of exited ones."""
+        # Under the lock, so a retiring worker is never counted both in its snapshot and in the archive
+        with self._locked():
+            live, exited = [], []
+            for path in self.directory.glob(f"{SNAPSHOT_PREFIX}*.json"):
+                try:
+                    pid = int(path.stem[len(SNAPSHOT_PREFIX):])
+                except ValueError:
+                    continue
+                (live if _pid_alive(pid) else exited).append(path)
+            # Workers killed before they could retire
+            self._fold(exited)
+
+            families = self._read(self.directory / ARCHIVE_FILE)
+            for path in live:
+                families.extend(self._read(path))
+        return list(merge_metrics(families).values())
+
+    def retire(self, metrics: Iterable[Metric]) -> None:
+        """Fold this worker's final counters into the archive as it exits."""
+        self.write(metrics)
+        with self._locked():
+            self._fold([self.path])
+
+class SnapshotWriter:
+    """Background task keeping this worker's snapshot current, so scrapes answered by other workers include it."""
+    def __init__(self, registry: Any, store: SnapshotStore, interval: float = 5.0):
+        self.registry = registry
+        self.store = store
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                self.store.write(self.registry.collect())
+            except OSError as e:
+                logger.warning(f"Failed to write metrics snapshot: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        """Start writing snapshots on the running loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop writing snapshots and fold this worker's counters into the archive."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            self.store.retire(self.registry.collect())
+        except OSError as e:
+            logger.warning(f"Failed to archive metrics snapshot: {e}")
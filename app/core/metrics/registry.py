@@ -0,0 +1,154 @@
+"""Minimal Prometheus-compatible metric types and text exposition."""
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+Labels = Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: object) -> str:
+    """Escape a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames: Sequence[str], labels: Labels, *extra: str) -> str:
+    """Render a label set, plus pre-rendered pairs; only called when scraping, never on the request path."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    pairs.extend(pair for pair in extra if pair)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    """Render a sample value, using integers where possible."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metric:
+    """Base class for a named metric family with optional labels."""
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def render_samples(self, const: str = "") -> List[str]:
+        """Render the metric's sample lines, adding the pre-rendered constant label pairs to each."""
+        raise NotImplementedError
+
+    def render(self, const: str = "") -> str:
+        """Render the metric family, including HELP and TYPE lines."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.render_samples(const))
+        return "\n".join(lines)
+
+class ValueMetric(Metric):
+    """Metric holding a single value per label set."""
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = defaultdict(float)
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] += amount
+
+    def render_samples(self, const: str = "") -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels, const)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+class Counter(ValueMetric):
+    """Monotonically increasing value per label set."""
+    type = "counter"
+
+class Gauge(ValueMetric):
+    """
+    Value per label set that can go up and down.
+
+    aggregate says how the values of several workers combine: sum, or max
+    for values such as a latency or a setting that do not add up.
+    """
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), aggregate: str = "sum"):
+        super().__init__(name, documentation, labelnames)
+        self.aggregate = aggregate
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self._values[labels] = value
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self._values[labels] -= amount
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets per label set."""
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: one count per bucket plus the +Inf bucket, then the sum
+        self._values: Dict[Labels, list] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def render_samples(self, const: str = "") -> List[str]:
+        lines = []
+        for labels, state in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, const, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels, const)} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels, const)} {cumulative}")
+        return lines
+
+class Registry:
+    """
+    Collection of metrics rendered together in the Prometheus text format.
+
+    const_labels are added to every sample, e.g. to tell apart the workers
+    of one server, each of which keeps its own registry. With a snapshot
+    store, the registry instead renders the metrics of all those workers
+    merged, whichever of them is scraped.
+    """
+    def __init__(self, const_labels: Optional[Dict[str, str]] = None, store: Optional[Any] = None):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+        self._const = ",".join(f'{name}="{_escape(value)}"' for name, value in (const_labels or {}).items())
+        self.store = store
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric that is updated in place."""
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        """Add a callable that builds metrics from current state at scrape time."""
+        self._collectors.append(collector)
+
+    def collect(self) -> List[Metric]:
+        """This process's metrics, with the collectors' built from current state."""
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            metrics.extend(collector())
+        return metrics
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        metrics = self.collect()
+        if self.store is not None:
+            self.store.write(metrics)
+            metrics = self.store.collect()
+        return "\n".join(metric.render(self._const) for metric in metrics) + "\n"
@@ -1,6 +1,7 @@
 """Pydantic models for request validation and response serialization."""
+from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Literal, Optional, List
 from uuid import UUID
 from tortoise.contrib.pydantic import pydantic_model_creator
 from app.core.models.tortoise import Item as ItemModel
@@ -10,12 +11,16 @@ class ItemBase(BaseModel):
     name: str
     price: float
     description: Optional[str] = None
-    is_offer: Optional[bool] = None
+    is_offer: Optional[bool] = False
 
 class ItemCreate(ItemBase):
     """Schema for creating a new item."""
     pass
 
+class ItemImport(ItemCreate):
+    """Schema for one row of an import file; rows with an ID replace that item, rows without get a new one."""
+    id: Optional[UUID] = None
+
 class ItemUpdate(BaseModel):
     """Schema for updating an existing item, all fields optional."""
     name: Optional[str] = None
@@ -23,6 +28,10 @@ class ItemUpdate(BaseModel):
     description: Optional[str] = None
     is_offer: Optional[bool] = None
 
+class ItemBulkUpdate(ItemUpdate):
+    """Schema for one element of a bulk update, identifying the item by ID."""
+    id: UUID
+
 # Generate Pydantic models from Tortoise models
 Item = pydantic_model_creator(
     ItemModel, 
@@ -34,3 +43,68 @@ ItemInDB = pydantic_model_creator(
     ItemModel,
     name="ItemInDB",
 )
+
+class ItemPage(BaseModel):
+    """Schema for a keyset-paginated page of items."""
+    items: List[Item]
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Opaque token for the next page, null when there are no more items",
+    )
+    total: Optional[int] = Field(
+        default=None,
+        description="Number of matching items across all pages, only when count was requested",
+    )
+    total_exact: Optional[bool] = Field(
+        default=None,
+        description="False when total is a planner estimate rather than an exact count",
+    )
+
+class ItemTombstone(BaseModel):
+    """Schema for a deleted item in a delta sync."""
+    id: UUID
+    deleted_at: datetime
+
+class ItemChanges(BaseModel):
+    """Schema for one page of a delta sync: items changed and items deleted since the token."""
+    items: List[Item] = Field(description="Items created or updated since the token, in change order")
+    deleted: List[ItemTombstone] = Field(description="Items deleted since the token")
+    next: str = Field(description="Token for the next call; keep it to sync again later")
+    has_more: bool = Field(description="True when more changes are waiting; call again with next straight away")
+
+class ItemStats(BaseModel):
+    """Schema for aggregate statistics over all items."""
+    count: int
+    offer_count: int
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    price_avg: Optional[float] = None
+    exact: bool = Field(description="False when counts are estimates and the average is sampled")
+
+class BulkItemResult(BaseModel):
+    """Outcome of a single element in a bulk request."""
+    index: int = Field(description="Position of the element in the request body")
+    id: Optional[UUID] = None
+    status: Literal["created", "updated", "deleted", "not_found"]
+    item: Optional[Item] = None
+
+class BulkResult(BaseModel):
+    """Schema for the per-item results of a bulk request."""
+    results: List[BulkItemResult]
+
+class JobStatus(BaseModel):
+    """Schema for the state of a background job; the payload is not included."""
+    id: UUID
+    type: str
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"]
+    progress: int = Field(description="Units of work done so far, e.g. rows imported")
+    total: Optional[int] = Field(default=None, description="Units of work in all, when known")
+    attempts: int = Field(description="Attempts started so far, including the running one")
+    max_attempts: int
+    cancel_requested: bool = Field(description="True while a running job is being cancelled")
+    result: Optional[Dict[str, Any]] = Field(default=None, description="What a succeeded job produced")
+    error: Optional[str] = Field(default=None, description="Why the last attempt failed")
+    run_at: datetime = Field(description="When a queued job may next run")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -2,6 +2,9 @@
 from tortoise import Model, fields
 import uuid
 
+from app.utils.db.indexes import BTreeIndex, PrefixIndex
+from app.utils.db.search import TextSearchIndex
+
 class Item(Model):
     """Item model for storing product or service data."""
     id = fields.UUIDField(pk=True, default=uuid.uuid4)
@@ -15,7 +18,72 @@ class Item(Model):
     class Meta:
         """Model metadata."""
         table = "items"
+        # Backing indexes for the list filters and sort orders in app/core/routers/items.py;
+        # every sort key is paired with id, the keyset tie-breaker
+        indexes = (
+            BTreeIndex(fields=("created_at", "id"), name="items_created_at_idx"),
+            BTreeIndex(fields=("price", "id"), name="items_price_idx"),
+            BTreeIndex(fields=("name", "id"), name="items_name_idx"),
+            BTreeIndex(fields=("created_at", "id"), name="items_offers_idx", condition={"is_offer": True}),
+            # Delta sync walks changes in (updated_at, id) order
+            BTreeIndex(fields=("updated_at", "id"), name="items_updated_at_idx"),
+            PrefixIndex(fields=("name",), name="items_name_prefix_idx"),
+            TextSearchIndex(fields=("name", "description"), name="items_search_idx"),
+        )
     
     def __str__(self) -> str:
         """String representation of the model."""
         return f"Item {self.name} (ID: {self.id})"
+
+class ItemDeletion(Model):
+    """Tombstone for a deleted item, so delta sync can report deletions."""
+    id = fields.UUIDField(pk=True)
+    deleted_at = fields.DatetimeField()
+
+    class Meta:
+        """Model metadata."""
+        table = "item_deletions"
+        indexes = (BTreeIndex(fields=("deleted_at", "id"), name="item_deletions_deleted_at_idx"),)
+
+class Job(Model):
+    """Background job, such as an item import, export or reindex, run outside the request that submitted it."""
+    id = fields.UUIDField(pk=True, default=uuid.uuid4)
+    type = fields.CharField(max_length=64)
+    # queued, running, succeeded, failed or cancelled
+    status = fields.CharField(max_length=16)
+    payload = fields.JSONField()
+    result = fields.JSONField(null=True)
+    error = fields.TextField(null=True)
+    progress = fields.IntField(default=0)
+    total = fields.IntField(null=True)
+    attempts = fields.IntField(default=0)
+    max_attempts = fields.IntField()
+    cancel_requested = fields.BooleanField(default=False)
+    # When a queued job may next run; pushed back between retries
+    run_at = fields.DatetimeField()
+    # Worker running the job and when its lease runs out; an expired lease means the worker died
+    locked_by = fields.CharField(max_length=64, null=True)
+    locked_until = fields.DatetimeField(null=True)
+    created_at = fields.DatetimeField()
+    started_at = fields.DatetimeField(null=True)
+    finished_at = fields.DatetimeField(null=True)
+
+    class Meta:
+        """Model metadata."""
+        table = "jobs"
+        # Workers claim the oldest due job by status and run_at
+        indexes = (BTreeIndex(fields=("status", "run_at"), name="jobs_status_run_at_idx"),)
+
+class IdempotencyRecord(Model):
+    """Response stored for an Idempotency-Key, replayed when a request is retried."""
+    key = fields.CharField(max_length=320, pk=True)
+    fingerprint = fields.CharField(max_length=64)
+    # Both null while the first request with the key is still running
+    status_code = fields.IntField(null=True)
+    body = fields.BinaryField(null=True)
+    created_at = fields.DatetimeField()
+    expires_at = fields.DatetimeField(index=True)
+
+    class Meta:
+        """Model metadata."""
+        table = "idempotency_keys"
@@ -1,5 +1,12 @@
 """Router exports for the application."""
 from app.utils.api.router import TypedAPIRouter
+from .changes import router as changes_router
 from .items import router as items_router
+from .jobs import router as jobs_router
+from .metrics import router as metrics_router
 
+# Routers are registered in name order, so /items/events is matched before /items/{item_id}
+changes = TypedAPIRouter(router=changes_router, prefix="/items", tags=["Items"])
 items = TypedAPIRouter(router=items_router, prefix="/items", tags=["Items"])
+jobs = TypedAPIRouter(router=jobs_router, prefix="/jobs", tags=["Jobs"])
+metrics = TypedAPIRouter(router=metrics_router, prefix="/metrics", tags=["Metrics"])
@@ -0,0 +1,152 @@
+"""Router for the item change feed over Server-Sent Events and WebSocket."""
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, WebSocketException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import AsyncIterator, Optional
+import uuid
+
+from app.config import changes_config
+from app.core.changes import (
+    OPS,
+    RESET,
+    ChangeEvent,
+    ChangeFilter,
+    Subscription,
+    SubscriptionClosed,
+    TooManySubscribersError,
+    change_feed,
+)
+from app.utils.api.responses import dumps
+
+router = APIRouter()
+
+# Item IDs one subscriber may filter on
+MAX_FILTER_IDS = 100
+
+ops_query = Query(None, description=f"Comma-separated operations to receive: {', '.join(OPS)} (default: all)")
+ids_query = Query(None, description=f"Comma-separated item IDs to receive changes for (at most {MAX_FILTER_IDS})")
+is_offer_query = Query(None, description="Only changes to items with this offer flag; deletions are always sent")
+cursor_query = Query(None, description="Resume after this event ID, replaying the events since")
+
+def parse_change_filter(ops: Optional[str], ids: Optional[str], is_offer: Optional[bool]) -> ChangeFilter:
+    """Build a change filter from query parameters, raising ValueError when they are invalid."""
+    op_list = [op.strip() for op in ops.split(",") if op.strip()] if ops else []
+    unknown = [op for op in op_list if op not in OPS]
+    if unknown:
+        raise ValueError(f"Unknown operations: {', '.join(unknown)}")
+    id_list = [part.strip() for part in ids.split(",") if part.strip()] if ids else []
+    if len(id_list) > MAX_FILTER_IDS:
+        raise ValueError(f"At most {MAX_FILTER_IDS} item IDs can be filtered on")
+    try:
+        id_list = [str(uuid.UUID(item_id)) for item_id in id_list]
+    except ValueError:
+        raise ValueError("Item IDs must be UUIDs")
+    return ChangeFilter(op_list, id_list, is_offer)
+
+def sse_frame(event: ChangeEvent) -> bytes:
+    """Encode an event as a Server-Sent Events frame; reset events carry no ID to resume from."""
+    head = f"event: {event.op}\n" if event.op == RESET else f"id: {event.id}\nevent: {event.op}\n"
+    return head.encode() + b"data: " + event.json() + b"\n\n"
+
+async def sse_stream(subscription: Subscription) -> AsyncIterator[bytes]:
+    """Yield replayed then live events, with heartbeat comments while the feed is quiet."""
+    try:
+        # Reconnection delay for EventSource clients, in milliseconds
+        yield f"retry: {int(changes_config.reconnect_seconds * 1000)}\n\n".encode()
+        if subscription.cursor_expired:
+            yield sse_frame(ChangeEvent.reset("cursor_expired"))
+        for event in subscription.replay:
+            yield sse_frame(event)
+        while True:
+            try:
+                event = await subscription.get(changes_config.heartbeat_seconds)
+            except SubscriptionClosed as e:
+                # The client reconnects with Last-Event-ID and catches up from the history
+                yield b"event: closed\ndata: " + dumps({"reason": e.reason}) + b"\n\n"
+                return
+            yield sse_frame(event) if event is not None else b": keepalive\n\n"
+    finally:
+        change_feed.unsubscribe(subscription)
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+    description="Stream item changes as Server-Sent Events",
+)
+async def stream_item_events(
+    ops: Optional[str] = ops_query,
+    ids: Optional[str] = ids_query,
+    is_offer: Optional[bool] = is_offer_query,
+    cursor: Optional[str] = cursor_query,
+    last_event_id: Optional[str] = Header(None, description="Resume after this event ID; sent by EventSource on reconnect"),
+):
+    """
+    Subscribe to created, updated and deleted item events.
+
+    Each event's ID is a cursor: reconnecting with it (Last-Event-ID, or the
+    cursor parameter) replays what was missed while it is still in the
+    worker's history, and sends a ``reset`` event when it is not, meaning the
+    client should resync with GET /items/changes.
+    """
+    if not changes_config.enabled:
+        raise HTTPException(status_code=404, detail="Change feed is disabled")
+    try:
+        change_filter = parse_change_filter(ops, ids, is_offer)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    try:
+        subscription = change_feed.subscribe(change_filter, last_event_id or cursor)
+    except TooManySubscribersError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    async def release() -> None:
+        # Also runs when the client disconnects before the stream has started
+        change_feed.unsubscribe(subscription)
+
+    return StreamingResponse(
+        sse_stream(subscription),
+        background=BackgroundTask(release),
+        media_type="text/event-stream",
+        # no-transform keeps the compression middleware from buffering events; proxies must not buffer either
+        headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/events/ws")
+async def websocket_item_events(
+    websocket: WebSocket,
+    ops: Optional[str] = ops_query,
+    ids: Optional[str] = ids_query,
+    is_offer: Optional[bool] = is_offer_query,
+    cursor: Optional[str] = cursor_query,
+):
+    """Stream item changes as JSON messages, with the same filters, cursors and reset events as the SSE feed."""
+    if not changes_config.enabled:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Change feed is disabled")
+    try:
+        change_filter = parse_change_filter(ops, ids, is_offer)
+    except ValueError as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=str(e))
+    try:
+        subscription = change_feed.subscribe(change_filter, cursor)
+    except TooManySubscribersError as e:
+        raise WebSocketException(code=status.WS_1013_TRY_AGAIN_LATER, reason=str(e))
+
+    try:
+        await websocket.accept()
+        if subscription.cursor_expired:
+            await websocket.send_text(ChangeEvent.reset("cursor_expired").json().decode())
+        for event in subscription.replay:
+            await websocket.send_text(event.json().decode())
+        while True:
+            try:
+                event = await subscription.get(changes_config.heartbeat_seconds)
+            except SubscriptionClosed as e:
+                # 1013 (try again later) for overflow and shutdown: reconnect with the last event ID as cursor
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=e.reason)
+                return
+            await websocket.send_text(event.json().decode() if event is not None else '{"op":"heartbeat"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        change_feed.unsubscribe(subscription)
@@ -0,0 +1,27 @@
+"""Router for liveness and readiness probes."""
+from fastapi import APIRouter, Response, status
+
+from app.core.health import health_monitor
+
+router = APIRouter()
+
+@router.get("", description="Get overall health; fails with 503 when the application is not ready")
+async def health_check(response: Response):
+    """Health check endpoint for monitoring, kept for existing probes and backed by readiness."""
+    ready, report = health_monitor.readiness()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "healthy" if ready else "unhealthy", **report}
+
+@router.get("/live", description="Liveness probe: whether the process is running")
+async def liveness():
+    """Answer without consulting any dependency, so only a stuck process fails it."""
+    return health_monitor.liveness()
+
+@router.get("/ready", description="Readiness probe: whether the instance should receive traffic")
+async def readiness(response: Response):
+    """Report cached per-dependency status and latency without touching the database."""
+    ready, report = health_monitor.readiness()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ready" if ready else "not_ready", **report}
@@ -1,58 +1,969 @@
 """Router for Item CRUD operations."""
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from tortoise import timezone
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import Q
+from tortoise.functions import Avg, Count, Max, Min
+from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
+from tortoise.utils import chunk
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Literal, Optional, Set, Tuple
+from datetime import datetime, timedelta
+from pathlib import Path
+import asyncio
+import hashlib
+import os
+import time
 import uuid
 
-from app.core.models.tortoise import Item as ItemModel
-from app.core.models.pydantic import Item, ItemCreate, ItemUpdate, ItemInDB
+from app.config import (
+    bulk_config,
+    changes_config,
+    jobs_config,
+    pagination_config,
+    response_config,
+    sync_config,
+    transfer_config,
+)
+from app.core.cache import item_cache, item_flights, item_generations, list_flights, stats_cache
+from app.core.changes import CREATED, DELETED, RESET, UPDATED, ChangeEvent, change_feed
+from app.core.idempotency import (
+    IdempotencyInProgressError,
+    IdempotencyKeyReusedError,
+    idempotency,
+    request_fingerprint,
+)
+from app.core.jobs import JobContext, JobFailed, JobRecord, job_types, submit_job
+from app.core.models.tortoise import Item as ItemModel, ItemDeletion
+from app.core.transfer import (
+    FORMATS,
+    MEDIA_TYPES,
+    FormatError,
+    ImportRejected,
+    available_formats,
+    detect_format,
+    export_item_file,
+    import_item_file,
+)
+from app.core.models.pydantic import (
+    BulkItemResult,
+    BulkResult,
+    Item,
+    ItemBulkUpdate,
+    ItemChanges,
+    ItemCreate,
+    ItemInDB,
+    ItemPage,
+    ItemStats,
+    ItemTombstone,
+    ItemUpdate,
+    JobStatus,
+)
+from app.utils.api.bulk import bulk_body, bulk_openapi
+from app.utils.api.conditional import (
+    is_not_modified,
+    item_etag,
+    not_modified_response,
+    page_etag,
+    parse_etag,
+    parse_if_match,
+    validator_headers,
+)
+from app.utils.api.responses import dumps
+from app.utils.api.sync import SyncPosition, changed_after, decode_sync_token, encode_sync_token, settled
+from app.utils.api.pagination import (
+    InvalidCursorError,
+    InvalidSortError,
+    Sort,
+    decode_cursor,
+    encode_cursor,
+    keyset_after,
+    parse_sort,
+)
+from app.utils.db.aggregates import count_rows, sampled_avg, table_estimate
+from app.utils.db.replicas import pinned_to_primary, read_connection, use_primary, use_read_replica
+from app.utils.db.search import TextSearchMatch, fts_table, prefix_filter
+from app.utils.db.update import update_returning
 
 router = APIRouter()
 
-@router.post("/", response_model=Item, status_code=status.HTTP_201_CREATED, description="Create a new item")
-async def create_item(item: ItemCreate):
-    """Create a new item in the database."""
-    item_obj = await ItemModel.create(
+read_dependencies = [Depends(use_read_replica)]
+write_dependencies = [Depends(use_primary)]
+
+batch_size_query = Query(bulk_config.batch_size, ge=1, description="Rows written per SQL statement")
+
+def new_item(item: ItemCreate) -> ItemModel:
+    """Build an unsaved Item model instance with a fresh ID."""
+    return ItemModel(
         id=uuid.uuid4(),
         name=item.name,
         price=item.price,
         description=item.description,
-        is_offer=item.is_offer
+        is_offer=bool(item.is_offer)
     )
-    return await Item.from_tortoise_orm(item_obj)
 
-@router.get("/", response_model=List[Item], description="Get all items")
-async def get_items():
-    """Get all items from the database."""
-    return await Item.from_queryset(ItemModel.all())
+if_none_match_header = Header(None, description="Return 304 if the resource still has one of these ETags")
+if_modified_since_header = Header(None, description="Return 304 if the resource has not changed since this HTTP-date")
 
-@router.get("/{item_id}", response_model=Item, description="Get an item by ID")
-async def get_item(item_id: uuid.UUID):
-    """Get a specific item by its ID."""
-    item = await ItemModel.filter(id=item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    return await Item.from_tortoise_orm(item)
+# Columns of the Item response model, in its field order; reads fetch these as raw rows
+ITEM_FIELDS = tuple(Item.model_fields)
+
+def item_json(row: dict) -> bytes:
+    """Encode an item row from ``values()`` as the JSON body of the Item response model."""
+    body = {field: row[field] for field in ITEM_FIELDS}
+    if response_config.fast_serialization:
+        return dumps(body)
+    return Item.model_validate(body).model_dump_json().encode()
+
+def item_cache_value(row: dict) -> bytes:
+    """Serialise an item row for the cache as its ETag, a space, then its JSON body."""
+    return f"{item_etag(row['updated_at'])} ".encode() + item_json(row)
+
+def flight_key(*parts: Any) -> str:
+    """Single-flight key for a read; reads from different connections never share a query."""
+    return ":".join((read_connection.get() or "primary", *map(str, parts)))
+
+def primary_flight_key(*parts: Any) -> str:
+    """Key for a shared read that goes to the primary whatever connection the request reads from."""
+    return ":".join(("primary", *map(str, parts)))
+
+async def invalidate_items(item_ids: Iterable[uuid.UUID]) -> None:
+    """Drop written items from the item cache and every cached aggregate, and stop sharing reads started before the write."""
+    keys = [str(item_id) for item_id in item_ids]
+    item_generations.bump(keys)
+    item_flights.forget([flight_key("version", key) for key in keys] + [primary_flight_key("item", key) for key in keys])
+    list_flights.forget_all()
+    await item_cache.delete_many(keys)
+    await stats_cache.clear()
+
+# Items written by other processes and not yet evicted from this worker's caches; None stands for all items
+pending_evictions: Set[Optional[str]] = set()
+eviction_task: Optional[asyncio.Task] = None
+
+async def evict_items() -> None:
+    """Drop this worker's cached reads of the items in pending_evictions, batching events that arrive meanwhile."""
+    while pending_evictions:
+        keys = set(pending_evictions)
+        pending_evictions.clear()
+        if None in keys:
+            item_generations.bump_all()
+        else:
+            item_generations.bump(keys)
+        # Flight keys carry the read connection, which an event does not tell
+        item_flights.forget_all()
+        list_flights.forget_all()
+        if not item_cache.shared:
+            await (item_cache.clear() if None in keys else item_cache.delete_many(keys))
+        await stats_cache.clear()
+
+def evict_changed_items(event: ChangeEvent) -> None:
+    """
+    Change feed listener invalidating reads of items other processes wrote.
+
+    Writes in this worker invalidate its caches themselves; with the Postgres
+    feed, other workers' and job workers' writes arrive here as events. A
+    reset, sent for bulk imports and after missed events, clears everything.
+    """
+    global eviction_task
+    if event.op != RESET and change_feed.ids.issued(event.id):
+        return
+    pending_evictions.add(None if event.op == RESET else event.item_id)
+    if eviction_task is None or eviction_task.done():
+        eviction_task = asyncio.get_running_loop().create_task(evict_items())
+
+change_feed.add_listener(evict_changed_items)
+
+async def publish_changes(op: str, items: Iterable[Item]) -> None:
+    """Publish committed creates or updates to the change feed, with the items' new representation."""
+    await change_feed.publish(op, ((item.id, item.model_dump(mode="json")) for item in items))
+
+async def publish_deletions(item_ids: Iterable[uuid.UUID]) -> None:
+    """Publish committed deletes to the change feed."""
+    await change_feed.publish(DELETED, ((item_id, None) for item_id in item_ids))
+
+# Monotonic time of the last purge of expired tombstones in this worker
+last_tombstone_purge = 0.0
+
+async def record_deletions(item_ids: List[uuid.UUID], connection: Any) -> None:
+    """Write tombstones for deleted items in the deleting transaction, purging expired ones now and then."""
+    global last_tombstone_purge
+    now = timezone.now()
+    # A concurrent delete of the same item may already have written its tombstone
+    await ItemDeletion.bulk_create(
+        [ItemDeletion(id=item_id, deleted_at=now) for item_id in item_ids], ignore_conflicts=True, using_db=connection,
+    )
+    if time.monotonic() - last_tombstone_purge >= sync_config.purge_interval_seconds:
+        last_tombstone_purge = time.monotonic()
+        expired = now - timedelta(days=sync_config.tombstone_retention_days)
+        await ItemDeletion.filter(deleted_at__lt=expired).using_db(connection).delete()
+
+idempotency_key_header = Header(
+    None,
+    max_length=255,
+    description="Client-chosen unique key; retrying with the same key replays the first response instead of creating again",
+)
+
+async def idempotent_response(
+    key: str,
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[Tuple[int, bytes]]],
+    response: Response,
+) -> Response:
+    """
+    Run a create handler once per idempotency key, replaying its stored JSON response on retries.
+
+    Headers the route's dependencies set on response, such as the replica
+    sticky cookie, are copied over, as FastAPI only adds them to responses it builds.
+    """
+    try:
+        stored, replayed = await idempotency.run(f"{scope}:{key}", request_fingerprint(dumps(payload)), handler)
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    result = Response(content=stored.body, status_code=stored.status_code, media_type="application/json", headers=headers)
+    result.headers.raw.extend(response.headers.raw)
+    return result
+
+async def insert_item(item: ItemCreate) -> Item:
+    """Insert one item and return it as the response model."""
+    item_obj = new_item(item)
+    await item_obj.save(force_create=True)
+    await invalidate_items([item_obj.id])
+    item_out = await Item.from_tortoise_orm(item_obj)
+    await publish_changes(CREATED, [item_out])
+    return item_out
+
+@router.post(
+    "/",
+    response_model=Item,
+    status_code=status.HTTP_201_CREATED,
+    description="Create a new item",
+    dependencies=write_dependencies,
+)
+async def create_item(item: ItemCreate, response: Response, idempotency_key: Optional[str] = idempotency_key_header):
+    """Create a new item in the database."""
+    if idempotency_key is None:
+        return await insert_item(item)
+
+    async def handler() -> Tuple[int, bytes]:
+        return status.HTTP_201_CREATED, (await insert_item(item)).model_dump_json().encode()
+
+    return await idempotent_response(idempotency_key, "items.create", item.model_dump(), handler, response)
+
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=bulk_openapi(ItemCreate),
+    description="Create many items from a JSON array or NDJSON body in one transaction",
+    dependencies=write_dependencies,
+)
+async def bulk_create_items(
+    response: Response,
+    items: List[ItemCreate] = Depends(bulk_body(ItemCreate, bulk_config.max_items)),
+    batch_size: int = batch_size_query,
+    idempotency_key: Optional[str] = idempotency_key_header,
+):
+    """Create items with multi-row INSERTs inside a single transaction."""
+    async def insert_items() -> BulkResult:
+        objects = [new_item(item) for item in items]
+        async with in_transaction() as connection:
+            await ItemModel.bulk_create(objects, batch_size=batch_size, using_db=connection)
+        await invalidate_items(obj.id for obj in objects)
+
+        created = [Item.model_validate(obj) for obj in objects]
+        await publish_changes(CREATED, created)
+        return BulkResult(results=[
+            BulkItemResult(index=index, id=item.id, status="created", item=item)
+            for index, item in enumerate(created)
+        ])
+
+    if idempotency_key is None:
+        return await insert_items()
+
+    async def handler() -> Tuple[int, bytes]:
+        return status.HTTP_201_CREATED, (await insert_items()).model_dump_json().encode()
+
+    # batch_size only changes how rows are written, not the result, so it is not part of the fingerprint
+    return await idempotent_response(
+        idempotency_key, "items.bulk_create", [item.model_dump() for item in items], handler, response,
+    )
+
+@router.patch(
+    "/bulk",
+    response_model=BulkResult,
+    openapi_extra=bulk_openapi(ItemBulkUpdate),
+    description="Update many items from a JSON array or NDJSON body in one transaction",
+    dependencies=write_dependencies,
+)
+async def bulk_update_items(
+    changes: List[ItemBulkUpdate] = Depends(bulk_body(ItemBulkUpdate, bulk_config.max_items)),
+    batch_size: int = batch_size_query,
+):
+    """Apply partial updates to many items with batched CASE updates inside a single transaction."""
+    async with in_transaction() as connection:
+        objects = {}
+        for ids in chunk(list({change.id for change in changes}), batch_size):
+            # Locked until commit, so a concurrent write to these items cannot be overwritten with stale values
+            locked = ItemModel.filter(id__in=ids).select_for_update().using_db(connection)
+            objects.update({obj.id: obj for obj in await locked})
+
+        # Later elements win when the same item appears more than once
+        changed_fields: Dict[uuid.UUID, set] = {}
+        for change in changes:
+            obj = objects.get(change.id)
+            if obj is None:
+                continue
+            update_data = change.model_dump(exclude_unset=True, exclude={"id"})
+            for field, value in update_data.items():
+                setattr(obj, field, value)
+            if update_data:
+                changed_fields.setdefault(obj.id, set()).update(update_data)
+
+        # Each item is written with only the fields its own elements set, one bulk update per set of fields
+        groups: Dict[frozenset, list] = {}
+        now = timezone.now()
+        for item_id, fields in changed_fields.items():
+            objects[item_id].updated_at = now
+            groups.setdefault(frozenset(fields), []).append(objects[item_id])
+        for fields, group in groups.items():
+            await ItemModel.bulk_update(group, fields=[*fields, "updated_at"], batch_size=batch_size, using_db=connection)
+    await invalidate_items(changed_fields)
+
+    updated = {item_id: Item.model_validate(obj) for item_id, obj in objects.items()}
+    await publish_changes(UPDATED, (updated[item_id] for item_id in changed_fields))
+    return BulkResult(results=[
+        BulkItemResult(index=index, id=change.id, status="updated", item=updated[change.id])
+        if change.id in updated
+        else BulkItemResult(index=index, id=change.id, status="not_found")
+        for index, change in enumerate(changes)
+    ])
+
+@router.delete(
+    "/bulk",
+    response_model=BulkResult,
+    openapi_extra=bulk_openapi(uuid.UUID),
+    description="Delete many items by ID from a JSON array or NDJSON body in one transaction",
+    dependencies=write_dependencies,
+)
+async def bulk_delete_items(
+    item_ids: List[uuid.UUID] = Depends(bulk_body(uuid.UUID, bulk_config.max_items)),
+    batch_size: int = batch_size_query,
+):
+    """Delete items with batched id IN (...) deletes inside a single transaction."""
+    deleted = set()
+    async with in_transaction() as connection:
+        for ids in chunk(list(set(item_ids)), batch_size):
+            existing = await ItemModel.filter(id__in=ids).using_db(connection).values_list("id", flat=True)
+            if existing:
+                await ItemModel.filter(id__in=existing).using_db(connection).delete()
+                await record_deletions(existing, connection)
+                deleted.update(existing)
+    await invalidate_items(deleted)
+    await publish_deletions(deleted)
+
+    return BulkResult(results=[
+        BulkItemResult(index=index, id=item_id, status="deleted" if item_id in deleted else "not_found")
+        for index, item_id in enumerate(item_ids)
+    ])
+
+# Columns the list can be sorted on; each has a (column, id) index on the Item model
+ITEM_SORT_FIELDS = ("created_at", "price", "name")
+ITEM_SEARCH_FIELDS = ("name", "description")
+
+def item_filters(
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+    is_offer: Optional[bool] = None,
+    name_prefix: Optional[str] = None,
+    q: Optional[str] = None,
+) -> QuerySet:
+    """Build the item queryset for the list filters, each served by an index declared on the Item model."""
+    queryset = ItemModel.all()
+    dialect = ItemModel._meta.db.capabilities.dialect
+    if price_min is not None:
+        queryset = queryset.filter(price__gte=price_min)
+    if price_max is not None:
+        queryset = queryset.filter(price__lte=price_max)
+    if is_offer is not None:
+        queryset = queryset.filter(is_offer=is_offer)
+    if name_prefix:
+        queryset = queryset.filter(prefix_filter("name", name_prefix, dialect))
+    if q and q.split():
+        match = TextSearchMatch(ItemModel, ITEM_SEARCH_FIELDS, q, dialect)
+        queryset = queryset.annotate(search_match=match).filter(search_match=True)
+    return queryset
+
+def filter_params(
+    price_min: Optional[float] = Query(None, description="Only items costing at least this much"),
+    price_max: Optional[float] = Query(None, description="Only items costing at most this much"),
+    is_offer: Optional[bool] = Query(None, description="Only offers (true) or only regular items (false)"),
+    name_prefix: Optional[str] = Query(None, min_length=1, description="Only items whose name starts with this (case-sensitive)"),
+    q: Optional[str] = Query(None, min_length=1, description="Full-text search over name and description; every word must match"),
+) -> Dict[str, Any]:
+    """The list filters given in the query string, as keyword arguments for item_filters."""
+    return dict(price_min=price_min, price_max=price_max, is_offer=is_offer, name_prefix=name_prefix, q=q)
+
+def filtered_items(filters: Dict[str, Any] = Depends(filter_params)) -> QuerySet:
+    """Dependency building the item queryset for the list filters in the query string."""
+    return item_filters(**filters)
+
+async def cached_count(queryset: QuerySet, exact: bool) -> tuple:
+    """Count the matching items, reusing a recent result for the same query."""
+    key = f"count:{int(exact)}:{hashlib.sha256(queryset.sql().encode()).hexdigest()}"
+    cached = await stats_cache.get(key)
+    if cached is not None:
+        total, is_exact = cached.split()
+        return int(total), is_exact == b"1"
+    total, is_exact = await count_rows(queryset, exact)
+    await stats_cache.set(key, f"{total} {int(is_exact)}".encode())
+    return total, is_exact
+
+async def stream_items(queryset: QuerySet, sort: Sort, cursor: Optional[tuple]) -> AsyncIterator[bytes]:
+    """Yield items as NDJSON lines, reading the table in keyset-ordered chunks."""
+    columns = dict.fromkeys((*ITEM_FIELDS, sort.field))
+    while True:
+        rows = await keyset_after(queryset, cursor, sort).limit(pagination_config.stream_chunk_size).values(*columns)
+        if not rows:
+            return
+        yield b"".join(item_json(row) + b"\n" for row in rows)
+        if len(rows) < pagination_config.stream_chunk_size:
+            return
+        cursor = (rows[-1][sort.field], rows[-1]["id"])
+
+@router.get(
+    "/",
+    response_model=ItemPage,
+    description="Get a filtered, sorted page of items, or stream all matching items as NDJSON",
+    dependencies=read_dependencies,
+)
+async def get_items(
+    limit: int = Query(pagination_config.default_limit, ge=1, le=pagination_config.max_limit),
+    cursor: Optional[str] = Query(None, description="Opaque token returned as next_cursor by the previous page"),
+    stream: bool = Query(False, description="Stream every item after the cursor as NDJSON instead of one page"),
+    sort: str = Query("created_at", description="created_at, price or name; prefix with - for descending order"),
+    count: Optional[Literal["exact", "estimated"]] = Query(
+        None, description="Include the number of matching items; estimated uses database statistics where available",
+    ),
+    queryset: QuerySet = Depends(filtered_items),
+    if_none_match: Optional[str] = if_none_match_header,
+    if_modified_since: Optional[str] = if_modified_since_header,
+):
+    """Get matching items in the requested order using keyset pagination."""
+    try:
+        order = parse_sort(sort, ITEM_SORT_FIELDS)
+        cursor_order, position = decode_cursor(cursor, ItemModel) if cursor else (order, None)
+    except (InvalidCursorError, InvalidSortError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if cursor_order != order:
+        raise HTTPException(status_code=400, detail=f"Cursor was issued for sort={cursor_order.token}")
+
+    if stream:
+        return StreamingResponse(stream_items(queryset, order, position), media_type="application/x-ndjson")
+
+    if count:
+        total, total_exact = await list_flights.do(
+            flight_key("count", count, queryset.sql()), lambda: cached_count(queryset, count == "exact"),
+        )
+    else:
+        total, total_exact = None, None
+    # The total is part of the body, so it is part of the page version too
+    etag_extra = f"total={total}" if count else ""
+
+    def next_page_cursor(rows: List[dict]) -> Optional[str]:
+        # The extra row only tells that another page exists; the cursor points after the page's last row
+        return encode_cursor(rows[limit - 1][order.field], rows[limit - 1]["id"], order) if len(rows) > limit else None
+
+    def page_version(rows: List[dict], next_cursor: Optional[str]) -> str:
+        # next_cursor is in the body, and changes when rows after the page come or go
+        return page_etag(((row["id"], row["updated_at"]) for row in rows[:limit]), f"{etag_extra};next={next_cursor or ''}")
+
+    # Fetch one extra row to find out whether another page exists
+    page = keyset_after(queryset, position, order).limit(limit + 1)
+    if if_none_match or if_modified_since:
+        # Validate against row versions alone before loading and serialising full rows
+        versions = await list_flights.do(
+            flight_key("versions", page.sql()), lambda: page.values(*dict.fromkeys(("id", "updated_at", order.field))),
+        )
+        etag = page_version(versions, next_page_cursor(versions))
+        last_modified = max((row["updated_at"] for row in versions[:limit]), default=None)
+        if is_not_modified(if_none_match, if_modified_since, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+
+    async def render_page() -> Tuple[bytes, dict]:
+        rows = await page.values(*dict.fromkeys((*ITEM_FIELDS, order.field, "updated_at")))
+        next_cursor = next_page_cursor(rows)
+        etag = page_version(rows, next_cursor)
+        rows = rows[:limit]
+        last_modified = max((row["updated_at"] for row in rows), default=None)
+        items = [{field: row[field] for field in ITEM_FIELDS} for row in rows]
+
+        if response_config.fast_serialization:
+            # Rows already have the ItemPage shape, so encode them without building models
+            body = dumps({"items": items, "next_cursor": next_cursor, "total": total, "total_exact": total_exact})
+        else:
+            body = ItemPage(
+                items=[Item.model_validate(item) for item in items],
+                next_cursor=next_cursor,
+                total=total,
+                total_exact=total_exact,
+            ).model_dump_json().encode()
+        return body, validator_headers(etag, last_modified)
+
+    # Concurrent requests for the same page share one query and one serialised body
+    body, headers = await list_flights.do(flight_key("page", etag_extra, page.sql()), render_page)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def compute_item_stats(exact: bool) -> ItemStats:
+    """
+    Aggregate item statistics in SQL.
+
+    Unless exact figures are requested, Postgres answers from planner
+    statistics, the price indexes and a block sample instead of a full scan.
+    Other dialects always run the exact single-pass aggregate.
+    """
+    estimate = None if exact else await table_estimate(ItemModel)
+    if estimate is not None:
+        offer_count, _ = await count_rows(ItemModel.filter(is_offer=True))
+        price_min = await ItemModel.all().order_by("price").first().values_list("price", flat=True)
+        price_max = await ItemModel.all().order_by("-price").first().values_list("price", flat=True)
+        price_avg = await sampled_avg(ItemModel, "price", estimate)
+        if price_avg is not None:
+            return ItemStats(
+                count=estimate,
+                offer_count=offer_count,
+                price_min=price_min,
+                price_max=price_max,
+                price_avg=price_avg,
+                exact=False,
+            )
+
+    rows = await ItemModel.all().annotate(
+        count=Count("id"),
+        offer_count=Count("id", _filter=Q(is_offer=True)),
+        price_min=Min("price"),
+        price_max=Max("price"),
+        price_avg=Avg("price"),
+    ).values("count", "offer_count", "price_min", "price_max", "price_avg")
+    return ItemStats(**rows[0], exact=True)
+
+async def cache_item_stats(key: str, exact: bool) -> bytes:
+    """Compute item statistics and cache their JSON body."""
+    body = (await compute_item_stats(exact)).model_dump_json().encode()
+    await stats_cache.set(key, body)
+    return body
+
+@router.get(
+    "/stats",
+    response_model=ItemStats,
+    description="Get the item count, offer count and price min/max/average",
+    dependencies=read_dependencies,
+)
+async def get_item_stats(
+    exact: bool = Query(False, description="Compute exact figures instead of using database statistics"),
+):
+    """Get aggregate item statistics, cached briefly and dropped on every write."""
+    key = f"stats:{int(exact)}"
+    cached = await stats_cache.get(key)
+    if cached is None:
+        cached = await list_flights.do(flight_key(key), lambda: cache_item_stats(key, exact))
+    return Response(content=cached, media_type="application/json")
+
+@router.get(
+    "/changes",
+    response_model=ItemChanges,
+    description="Get the items created, updated or deleted since a sync token",
+    dependencies=read_dependencies,
+)
+async def get_item_changes(
+    since: Optional[str] = Query(None, description="Token returned as next by the previous sync; omit for a full sync"),
+    limit: int = Query(pagination_config.default_limit, ge=1, le=pagination_config.max_limit),
+):
+    """
+    Delta sync: return only what changed since the token, not the whole table.
+
+    Items come in (updated_at, id) order and deletions as tombstones in
+    (deleted_at, id) order, each read from its own index. Keep calling with
+    next while has_more is true. Changes from the last few seconds may be
+    sent twice, so apply them as upserts. A token older than the tombstone
+    retention gets 410, and the client has to do a full sync.
+    """
+    now = timezone.now()
+    horizon = now - timedelta(seconds=sync_config.settle_seconds)
+    if since:
+        try:
+            position = decode_sync_token(since)
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if position.deleted[0] < now - timedelta(days=sync_config.tombstone_retention_days):
+            raise HTTPException(status_code=410, detail="Sync token is older than the tombstone retention, do a full sync")
+    else:
+        # A full sync reads every item; only deletions from now on matter
+        position = SyncPosition(updated=None, deleted=(horizon, None))
+
+    rows = await changed_after(ItemModel.all(), "updated_at", position.updated).limit(limit + 1).values(
+        *dict.fromkeys((*ITEM_FIELDS, "updated_at")),
+    )
+    tombstones = await changed_after(ItemDeletion.all(), "deleted_at", position.deleted).limit(limit + 1).values(
+        "id", "deleted_at",
+    )
+    items_more, deletions_more = len(rows) > limit, len(tombstones) > limit
+    rows, tombstones = rows[:limit], tombstones[:limit]
+    # A full page resumes after its last row; a stream read to its end resumes at the settle horizon
+    next_position = SyncPosition(
+        updated=(rows[-1]["updated_at"], rows[-1]["id"]) if items_more else settled(position.updated, horizon),
+        deleted=(tombstones[-1]["deleted_at"], tombstones[-1]["id"]) if deletions_more else settled(position.deleted, horizon),
+    )
+    items = [{field: row[field] for field in ITEM_FIELDS} for row in rows]
+    next_token = encode_sync_token(next_position)
+    has_more = items_more or deletions_more
+
+    if response_config.fast_serialization:
+        body = dumps({"items": items, "deleted": tombstones, "next": next_token, "has_more": has_more})
+    else:
+        body = ItemChanges(
+            items=[Item.model_validate(item) for item in items],
+            deleted=[ItemTombstone.model_validate(tombstone) for tombstone in tombstones],
+            next=next_token,
+            has_more=has_more,
+        ).model_dump_json().encode()
+    return Response(content=body, media_type="application/json")
+
+IMPORT_JOB = "items.import"
+EXPORT_JOB = "items.export"
+REINDEX_JOB = "items.reindex"
+
+def require_jobs() -> None:
+    """Dependency rejecting job submissions while background jobs are disabled."""
+    if not jobs_config.enabled:
+        raise HTTPException(status_code=404, detail="Background jobs are disabled")
+
+job_dependencies = [*write_dependencies, Depends(require_jobs)]
+
+def job_accepted(job: JobRecord, response: Response) -> JobStatus:
+    """202 body for a submitted job, with Location pointing at its status."""
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return JobStatus.model_validate(job.dict())
+
+def upload_format(file_format: Optional[str], content_type: Optional[str]) -> str:
+    """The format of an upload, given explicitly or by its Content-Type."""
+    file_format = file_format or detect_format(media_type=content_type)
+    if file_format is None:
+        raise HTTPException(
+            status_code=415, detail=f"Send format= or a Content-Type of {', '.join(MEDIA_TYPES.values())}",
+        )
+    check_format(file_format)
+    return file_format
+
+def check_format(file_format: str) -> None:
+    """Reject an unknown transfer format with 422, or one whose optional dependency is missing with 415."""
+    if file_format not in FORMATS:
+        raise HTTPException(status_code=422, detail=f"Unknown format {file_format!r}, expected one of {', '.join(FORMATS)}")
+    if file_format not in available_formats():
+        raise HTTPException(status_code=415, detail=f"{file_format} support needs the pyarrow package")
+
+async def spool_upload(request: Request, path: Path) -> int:
+    """Stream a request body to a file, without holding it in memory, and return its size."""
+    limit = transfer_config.max_upload_bytes
+    size = 0
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(path, "wb") as file:
+            async for data in request.stream():
+                size += len(data)
+                if limit and size > limit:
+                    raise HTTPException(status_code=413, detail=f"Upload is larger than {limit} bytes")
+                await asyncio.to_thread(file.write, data)
+        if not size:
+            raise HTTPException(status_code=400, detail="Upload is empty")
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return size
+
+@router.post(
+    "/import",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        media_type: {"schema": {"type": "string", "format": "binary"}} for media_type in MEDIA_TYPES.values()
+    }}},
+    description="Import items from a CSV, NDJSON or Parquet upload in a background job",
+    dependencies=job_dependencies,
+)
+async def import_items(
+    request: Request,
+    response: Response,
+    format: Optional[str] = Query(None, description=f"{', '.join(FORMATS)} (default: from the Content-Type)"),
+    mode: Literal["upsert", "insert"] = Query(
+        "upsert", description="upsert replaces items whose ID is in the file; insert fails the import on an existing ID",
+    ),
+    max_errors: int = Query(0, ge=0, description="Invalid rows to skip before rejecting the whole import"),
+    batch_size: int = Query(transfer_config.batch_size, ge=1, description="Rows validated and written at a time"),
+):
+    """
+    Spool the upload to disk, then load it in one transaction outside the request.
+
+    CSV needs a header row with name and price; id, description and
+    is_offer are optional, as they are in NDJSON objects and Parquet
+    columns. Rows are validated like POST /items. Follow progress, in rows
+    read, at the job's Location; the result counts rows written, unchanged
+    and invalid, with the first invalid rows and why.
+    """
+    file_format = upload_format(format, request.headers.get("content-type"))
+    name = f"{uuid.uuid4()}.upload.{file_format}"
+    path = Path(jobs_config.files_dir) / name
+    size = await spool_upload(request, path)
+    payload = {"file": name, "bytes": size, "format": file_format, "mode": mode, "max_errors": max_errors, "batch_size": batch_size}
+    try:
+        job = await submit_job(IMPORT_JOB, payload)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+    return job_accepted(job, response)
+
+async def publish_import(updated_at: datetime, written: int) -> None:
+    """Drop cached reads and publish the items an import wrote, found by the updated_at it gave them all."""
+    item_generations.bump_all()
+    item_flights.forget_all()
+    list_flights.forget_all()
+    await item_cache.clear()
+    await stats_cache.clear()
+    if not written:
+        return
+    if written > changes_config.history_size:
+        # More events than any worker keeps would only push everything else out of the history
+        await change_feed.announce_reset("bulk_import")
+        return
+    rows = await ItemModel.filter(updated_at=updated_at).values(*ITEM_FIELDS, "created_at")
+    created, updated = [], []
+    for row in rows:
+        (created if row.pop("created_at") == updated_at else updated).append(Item.model_validate(row))
+    await publish_changes(CREATED, created)
+    await publish_changes(UPDATED, updated)
+
+@job_types.register(IMPORT_JOB)
+async def run_import(context: JobContext) -> Dict[str, Any]:
+    """Import job: load the uploaded file, then delete it and publish the written items; bad files fail without retries."""
+    payload = context.payload
+    path = context.files_dir / payload["file"]
+    if not path.is_file():
+        raise JobFailed("Uploaded file is no longer available")
+    try:
+        result = await import_item_file(
+            str(path), payload["format"], payload["mode"], payload["batch_size"], payload["max_errors"], context.progress,
+        )
+    except (FormatError, ImportRejected, IntegrityError) as e:
+        # Retrying cannot fix the file; other errors keep it for the next attempt
+        path.unlink(missing_ok=True)
+        if isinstance(e, ImportRejected):
+            raise JobFailed(f"{e}: " + "; ".join(f"row {error['row']}: {error['error']}" for error in e.errors[:10]))
+        if isinstance(e, IntegrityError):
+            raise JobFailed(f"An item in the file already exists, import it with mode=upsert: {e}")
+        raise JobFailed(str(e))
+    path.unlink(missing_ok=True)
+    context.progress(result["rows"], result["rows"])
+    await publish_import(datetime.fromisoformat(result["updated_at"]), result["written"])
+    return result
+
+@router.post(
+    "/export",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    description="Export the items matching the list filters to a CSV, NDJSON or Parquet file in a background job",
+    dependencies=job_dependencies,
+)
+async def export_items(
+    response: Response,
+    format: str = Query("ndjson", description=", ".join(FORMATS)),
+    filters: Dict[str, Any] = Depends(filter_params),
+):
+    """Write matching items to a file in created_at order; download it from /jobs/{id}/file once the job has succeeded."""
+    check_format(format)
+    job = await submit_job(EXPORT_JOB, {"filters": filters, "format": format})
+    return job_accepted(job, response)
+
+@job_types.register(EXPORT_JOB)
+async def run_export(context: JobContext) -> Dict[str, Any]:
+    """Export job: write the filtered items to a file in the jobs directory, served by /jobs/{id}/file."""
+    file_format = context.payload["format"]
+    queryset = item_filters(**context.payload["filters"])
+    total, _ = await count_rows(queryset)
+    context.progress(0, total)
+    name = f"{context.job_id}.{file_format}"
+    path = context.files_dir / name
+    # Written under a temporary name so a download never sees a partial file
+    partial = path.with_suffix(".part")
+    try:
+        rows = await export_item_file(
+            queryset, str(partial), file_format, transfer_config.batch_size, transfer_config.row_group_size, context.progress,
+        )
+        os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+    context.progress(rows, rows)
+    return {"file": name, "format": file_format, "rows": rows, "bytes": path.stat().st_size}
+
+@router.post(
+    "/reindex",
+    response_model=JobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    description="Rebuild the item indexes and refresh planner statistics in a background job",
+    dependencies=job_dependencies,
+)
+async def reindex_items(response: Response):
+    """Rebuild bloated indexes after large imports or deletes; Postgres keeps the table writable meanwhile."""
+    job = await submit_job(REINDEX_JOB, {}, total=2)
+    return job_accepted(job, response)
+
+@job_types.register(REINDEX_JOB)
+async def run_reindex(context: JobContext) -> Dict[str, Any]:
+    """Reindex job: rebuild the item table's indexes, and the SQLite full-text index, then refresh planner statistics."""
+    db = ItemModel._meta.db
+    table = ItemModel._meta.db_table
+    dialect = db.capabilities.dialect
+    if dialect == "postgres":
+        # CONCURRENTLY builds new indexes beside the old ones instead of locking out writes
+        await db.execute_script(f'REINDEX TABLE CONCURRENTLY "{table}"')
+    else:
+        await db.execute_script(f'REINDEX "{table}"')
+        if dialect == "sqlite":
+            fts = fts_table(ItemModel)
+            await db.execute_script(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    context.progress(1)
+    await db.execute_script(f'ANALYZE "{table}"')
+    context.progress(2)
+    return {"table": table, "dialect": dialect}
+
+async def load_item(item_id: uuid.UUID) -> Optional[bytes]:
+    """
+    Load an item row into the item cache and return the cached value, or None if there is no such item.
+
+    The row is always read from the primary, as a lagging replica would put
+    an old row in the cache that no invalidation removes. It is only cached
+    if no write invalidated the item while it was read; otherwise the caller
+    still gets it, but the cache keeps no old copy.
+    """
+    # Loads run in their own flight task, so this does not move the caller's other reads
+    read_connection.set(None)
+    key = str(item_id)
+    generation = item_generations.begin(key)
+    try:
+        row = await ItemModel.filter(id=item_id).first().values(*ITEM_FIELDS, "updated_at")
+        if not row:
+            return None
+        cached = item_cache_value(row)
+        if item_generations.current(key, generation):
+            await item_cache.set(key, cached)
+            # An invalidation that ran while the value was being stored missed it
+            if not item_generations.current(key, generation):
+                await item_cache.delete(key)
+        return cached
+    finally:
+        item_generations.end(key)
+
+@router.get(
+    "/{item_id}",
+    response_model=Item,
+    description="Get an item by ID",
+    dependencies=read_dependencies,
+)
+async def get_item(
+    item_id: uuid.UUID,
+    if_none_match: Optional[str] = if_none_match_header,
+    if_modified_since: Optional[str] = if_modified_since_header,
+):
+    """
+    Get a specific item by its ID, serving repeat reads from the item cache.
+
+    Clients pinned to the primary after a write skip the cache, which may
+    still hold the row from before that write in another worker.
+    """
+    is_conditional = bool(if_none_match or if_modified_since)
+    cached = None if pinned_to_primary() else await item_cache.get(str(item_id))
+    if cached is None and is_conditional:
+        # Validate against the row version alone before loading and serialising the full row
+        updated_at = await item_flights.do(
+            flight_key("version", item_id),
+            lambda: ItemModel.filter(id=item_id).first().values_list("updated_at", flat=True),
+        )
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        if is_not_modified(if_none_match, if_modified_since, item_etag(updated_at), updated_at):
+            return not_modified_response(item_etag(updated_at), updated_at)
+
+    if cached is None:
+        # Concurrent misses for the same item share one primary query and one serialised body
+        cached = await item_flights.do(primary_flight_key("item", item_id), lambda: load_item(item_id))
+        if cached is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+
+    etag, body = cached.split(b" ", 1)
+    etag = etag.decode()
+    last_modified = parse_etag(etag)
+    if is_conditional and is_not_modified(if_none_match, if_modified_since, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    return Response(content=body, media_type="application/json", headers=validator_headers(etag, last_modified))
+
+@router.put(
+    "/{item_id}",
+    response_model=Item,
+    description="Update an item",
+    dependencies=write_dependencies,
+)
+async def update_item(
+    item_id: uuid.UUID,
+    item_data: ItemUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None, description="Only update if the item still has one of these ETags"),
+):
+    """Update the provided fields of an existing item with a single UPDATE statement."""
+    condition = None
+    if if_match:
+        versions = parse_if_match(if_match)
+        if versions == []:
+            raise HTTPException(status_code=412, detail="Item has been modified")
+        if versions:
+            condition = Q(*[Q(updated_at=version) for version in versions], join_type=Q.OR)
 
-@router.put("/{item_id}", response_model=Item, description="Update an item")
-async def update_item(item_id: uuid.UUID, item_data: ItemUpdate):
-    """Update an existing item by its ID."""
-    item = await ItemModel.filter(id=item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
     # Update only the fields that are provided
     update_data = item_data.dict(exclude_unset=True)
     if update_data:
-        for field, value in update_data.items():
-            setattr(item, field, value)
-        await item.save()
-    
-    return await Item.from_tortoise_orm(item)
+        item = await update_returning(ItemModel, item_id, {**update_data, "updated_at": timezone.now()}, condition)
+    else:
+        item = await ItemModel.filter(condition or Q(), id=item_id).first()
+
+    if not item:
+        # Only a failed conditional update needs the extra query to tell 412 from 404
+        if condition and await ItemModel.exists(id=item_id):
+            raise HTTPException(status_code=412, detail="Item has been modified")
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    await invalidate_items([item_id])
+    item_out = Item.model_validate(item)
+    if update_data:
+        await publish_changes(UPDATED, [item_out])
+    response.headers.update(validator_headers(item_etag(item.updated_at), item.updated_at))
+    return item_out
 
-@router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT, description="Delete an item")
+@router.delete(
+    "/{item_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    description="Delete an item",
+    dependencies=write_dependencies,
+)
 async def delete_item(item_id: uuid.UUID):
     """Delete an item by its ID."""
-    deleted_count = await ItemModel.filter(id=item_id).delete()
+    async with in_transaction() as connection:
+        deleted_count = await ItemModel.filter(id=item_id).using_db(connection).delete()
+        if deleted_count:
+            await record_deletions([item_id], connection)
+    await invalidate_items([item_id])
     if not deleted_count:
         raise HTTPException(status_code=404, detail="Item not found")
-    return None 
\ No newline at end of file
+    await publish_deletions([item_id])
+    return None
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""Router for background job status, cancellation and results."""
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+from typing import List, Optional
+import uuid
+
+from app.config import jobs_config
+from app.core.jobs import STATUSES, SUCCEEDED, JobRecord, job_runner, job_store
+from app.core.models.pydantic import JobStatus
+from app.core.transfer import MEDIA_TYPES
+
+router = APIRouter()
+
+def job_status(job: JobRecord) -> JobStatus:
+    return JobStatus.model_validate(job.dict())
+
+async def get_job_or_404(job_id: uuid.UUID) -> JobRecord:
+    if not jobs_config.enabled:
+        raise HTTPException(status_code=404, detail="Background jobs are disabled")
+    job = await job_store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("", response_model=List[JobStatus], description="List recent jobs, newest first")
+async def list_jobs(
+    type: Optional[str] = Query(None, description="Only jobs of this type, e.g. items.import"),
+    status: Optional[str] = Query(None, description=f"Only jobs in this state: {', '.join(STATUSES)}"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """List jobs submitted recently, kept for the configured retention after they finish."""
+    if not jobs_config.enabled:
+        raise HTTPException(status_code=404, detail="Background jobs are disabled")
+    if status is not None and status not in STATUSES:
+        raise HTTPException(status_code=422, detail=f"Unknown job status: {status}")
+    return [job_status(job) for job in await job_store.list(type, status, limit)]
+
+@router.get("/{job_id}", response_model=JobStatus, description="Get a job's status and progress")
+async def get_job(job_id: uuid.UUID):
+    """Get a job's state, progress and, once it has finished, its result or error."""
+    return job_status(await get_job_or_404(job_id))
+
+@router.post("/{job_id}/cancel", response_model=JobStatus, description="Cancel a job")
+async def cancel_job(job_id: uuid.UUID):
+    """
+    Cancel a queued job, or stop a running one.
+
+    A running job stops at its worker's next heartbeat, within about a
+    second; until then its status stays running with cancel_requested set.
+    Cancelling a finished job changes nothing.
+    """
+    await get_job_or_404(job_id)
+    job = await job_store.cancel(job_id)
+    job_runner.wake()
+    return job_status(job)
+
+@router.get(
+    "/{job_id}/file",
+    response_class=FileResponse,
+    responses={200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}},
+    description="Download the file an export job produced",
+)
+async def get_job_file(job_id: uuid.UUID):
+    """Download an export job's file; 409 until the job has succeeded, 410 once the file has been purged."""
+    job = await get_job_or_404(job_id)
+    name = (job.result or {}).get("file")
+    if job.status != SUCCEEDED or not name:
+        raise HTTPException(status_code=409, detail=f"Job has no file to download (status: {job.status})")
+    path = job_runner.files_dir / name
+    if not path.is_file():
+        raise HTTPException(status_code=410, detail="Job file is no longer available")
+    file_format = job.result.get("format", "ndjson")
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES.get(file_format, "application/octet-stream"),
+        filename=f"{job.type.replace('.', '-')}-{job.id}.{file_format}",
+    )
@@ -0,0 +1,60 @@
+"""Router for operational metrics."""
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.admission import rate_limiter, route_limiters
+from app.core.cache import item_cache, item_flights, list_flights
+from app.core.changes import change_feed
+from app.core.jobs import job_runner, job_store
+from app.core.metrics import registry
+from app.utils.db.pool import pool_metrics
+from app.utils.db.replicas import replica_selector
+
+router = APIRouter()
+
+@router.get("", response_class=PlainTextResponse, description="Get all metrics in Prometheus text format")
+async def get_metrics():
+    """Get request, database, cache and pool metrics for Prometheus to scrape."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@router.get("/cache", description="Get item cache counters")
+async def get_cache_metrics():
+    """Get hit, miss and eviction counters of the item cache."""
+    return item_cache.info()
+
+@router.get("/flights", description="Get request coalescing counters")
+async def get_flight_metrics():
+    """Get queries run and shared per single-flight group, with waiters on the busiest running queries."""
+    return [item_flights.info(), list_flights.info()]
+
+@router.get("/admission", description="Get admission control state")
+async def get_admission_metrics():
+    """Get in-flight and queued requests per limited route, and the rate limiter settings."""
+    return {
+        "routes": route_limiters.info(),
+        "rate_limiter": rate_limiter.info() if rate_limiter is not None else None,
+    }
+
+@router.get("/changes", description="Get change feed state")
+async def get_change_feed_metrics():
+    """Get subscribers, history and event counters of the item change feed."""
+    return change_feed.info()
+
+@router.get("/jobs", description="Get background job state")
+async def get_job_metrics():
+    """Get job counts by type and status across all workers, and this worker's runner counters."""
+    counts = await job_store.counts()
+    return {
+        "jobs": [{"type": job_type, "status": status, "count": count} for (job_type, status), count in sorted(counts.items())],
+        "runner": job_runner.info(),
+    }
+
+@router.get("/db", description="Get database connection pool utilisation")
+async def get_db_metrics():
+    """Get in-use, idle and waiting connections plus acquire latency per database connection."""
+    return pool_metrics()
+
+@router.get("/replicas", description="Get read-replica routing state")
+async def get_replica_metrics():
+    """Get the configured read replicas and their observed latency."""
+    return replica_selector.info()
@@ -0,0 +1,14 @@
+"""Bulk item import and export exports."""
+from .formats import (
+    COLUMNS,
+    CSV,
+    FORMATS,
+    MEDIA_TYPES,
+    NDJSON,
+    PARQUET,
+    FormatError,
+    available_formats,
+    detect_format,
+    read_batches,
+)
+from .loader import INSERT, MODES, UPSERT, ImportRejected, export_item_file, import_item_file, validate_batch
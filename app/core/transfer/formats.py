@@ -0,0 +1,196 @@
+"""Item file formats for bulk import and export.
+
+Readers yield rows in batches and writers take them in batches, so a file of
+any size passes through in constant memory. Both are synchronous; callers run
+them in a thread. CSV and NDJSON are always available, Parquet only when the
+pyarrow package is installed.
+"""
+import csv
+import io
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+CSV = "csv"
+NDJSON = "ndjson"
+PARQUET = "parquet"
+FORMATS = (CSV, NDJSON, PARQUET)
+MEDIA_TYPES = {
+    CSV: "text/csv",
+    NDJSON: "application/x-ndjson",
+    PARQUET: "application/vnd.apache.parquet",
+}
+# Other media types clients send for these formats
+MEDIA_TYPE_ALIASES = {"application/csv": CSV, "application/x-parquet": PARQUET}
+
+# Columns exports write and imports read, in file order; id is optional on import
+COLUMNS = ("id", "name", "price", "description", "is_offer")
+REQUIRED_COLUMNS = ("name", "price")
+
+class FormatError(ValueError):
+    """Raised when a file cannot be read as its format at all, as opposed to a single bad row."""
+
+class MalformedRow:
+    """Stands in for a row that could not be parsed, so validation reports it with its row number."""
+    def __init__(self, error: str):
+        self.error = error
+
+# A data row's 1-based number in the file and its raw values
+Row = Tuple[int, Any]
+
+def available_formats() -> List[str]:
+    """Formats this installation can read and write."""
+    return [name for name in FORMATS if name != PARQUET or pyarrow is not None]
+
+def detect_format(media_type: Optional[str] = None, filename: Optional[str] = None) -> Optional[str]:
+    """Guess a format from a Content-Type header or a file extension."""
+    if media_type:
+        media_type = media_type.split(";")[0].strip().lower()
+        for name, known in MEDIA_TYPES.items():
+            if media_type == known:
+                return name
+        if media_type in MEDIA_TYPE_ALIASES:
+            return MEDIA_TYPE_ALIASES[media_type]
+    if filename:
+        extension = filename.rsplit(".", 1)[-1].lower()
+        if extension in FORMATS:
+            return extension
+        if extension == "jsonl":
+            return NDJSON
+    return None
+
+def _read_csv(file: BinaryIO, batch_size: int) -> Iterator[List[Row]]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or ())]
+    if missing:
+        raise FormatError(f"CSV header is missing columns: {', '.join(missing)}")
+    batch: List[Row] = []
+    for number, record in enumerate(reader, 1):
+        # CSV has no null: empty fields are missing values
+        batch.append((number, {key: value for key, value in record.items() if key in COLUMNS and value != ""}))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _read_ndjson(file: BinaryIO, batch_size: int) -> Iterator[List[Row]]:
+    batch: List[Row] = []
+    number = 0
+    for line in file:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            batch.append((number, orjson.loads(line)))
+        except orjson.JSONDecodeError as e:
+            batch.append((number, MalformedRow(f"Malformed JSON: {e}")))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _read_parquet(file: BinaryIO, batch_size: int) -> Iterator[List[Row]]:
+    try:
+        parquet = pyarrow.parquet.ParquetFile(file)
+    except pyarrow.ArrowInvalid as e:
+        raise FormatError(f"Not a Parquet file: {e}") from e
+    names = parquet.schema_arrow.names
+    missing = [column for column in REQUIRED_COLUMNS if column not in names]
+    if missing:
+        raise FormatError(f"Parquet schema is missing columns: {', '.join(missing)}")
+    number = 0
+    for record_batch in parquet.iter_batches(batch_size=batch_size, columns=[c for c in COLUMNS if c in names]):
+        rows = record_batch.to_pylist()
+        yield [(number + index, row) for index, row in enumerate(rows, 1)]
+        number += len(rows)
+
+def read_batches(path: str, file_format: str, batch_size: int) -> Iterator[List[Row]]:
+    """
+    Read a file as batches of (row number, raw row) pairs, holding one batch at a time.
+
+    Raises:
+        FormatError: When the file is not in the format, or lacks required columns.
+    """
+    readers = {CSV: _read_csv, NDJSON: _read_ndjson, PARQUET: _read_parquet}
+    with open(path, "rb") as file:
+        yield from readers[file_format](file, batch_size)
+
+class Writer:
+    """Interface for writing item rows, as returned by ``values(*COLUMNS)``, to a file."""
+    def __init__(self, file: BinaryIO):
+        self.file = file
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Write anything still buffered."""
+
+class CsvWriter(Writer):
+    """CSV with a header row; missing descriptions are empty fields and flags are true or false."""
+    def __init__(self, file: BinaryIO):
+        super().__init__(file)
+        self._text = io.TextIOWrapper(file, encoding="utf-8", newline="", write_through=True)
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._writer.writerows(
+            (str(row["id"]), row["name"], row["price"], row["description"] or "", "true" if row["is_offer"] else "false")
+            for row in rows
+        )
+
+    def close(self) -> None:
+        # Leave closing the file to its owner
+        self._text.detach()
+
+class NdjsonWriter(Writer):
+    """One JSON object per line, in the shape of the Item response model."""
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self.file.write(b"".join(orjson.dumps({column: row[column] for column in COLUMNS}) + b"\n" for row in rows))
+
+class ParquetWriter(Writer):
+    """Parquet, buffering rows into row groups of ``row_group_size``."""
+    def __init__(self, file: BinaryIO, row_group_size: int):
+        super().__init__(file)
+        self.row_group_size = row_group_size
+        self._schema = pyarrow.schema([
+            ("id", pyarrow.string()),
+            ("name", pyarrow.string()),
+            ("price", pyarrow.float64()),
+            ("description", pyarrow.string()),
+            ("is_offer", pyarrow.bool_()),
+        ])
+        self._writer = pyarrow.parquet.ParquetWriter(file, self._schema, compression="zstd")
+        self._buffer: List[Dict[str, Any]] = []
+
+    def _flush(self) -> None:
+        if self._buffer:
+            self._writer.write_table(pyarrow.Table.from_pylist(self._buffer, schema=self._schema))
+            self._buffer = []
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        self._buffer.extend({**{column: row[column] for column in COLUMNS}, "id": str(row["id"])} for row in rows)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+def open_writer(file: BinaryIO, file_format: str, row_group_size: int) -> Writer:
+    """Create the writer for a format around an open binary file."""
+    if file_format == CSV:
+        return CsvWriter(file)
+    if file_format == PARQUET:
+        return ParquetWriter(file, row_group_size)
+    return NdjsonWriter(file)
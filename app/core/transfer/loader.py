@@ -0,0 +1,281 @@
+"""Bulk item import and export: COPY on Postgres, chunked executemany elsewhere."""
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from tortoise import timezone
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.exceptions import IntegrityError
+from tortoise.queryset import QuerySet
+from tortoise.transactions import in_transaction
+
+from app.core.models.pydantic import ItemImport
+from app.core.models.tortoise import Item as ItemModel
+from app.utils.api.pagination import Sort, keyset_after
+from .formats import COLUMNS, MalformedRow, Row, open_writer, read_batches
+
+INSERT = "insert"
+UPSERT = "upsert"
+MODES = (INSERT, UPSERT)
+# Invalid rows listed in an import's result; the count covers all of them
+MAX_REPORTED_ERRORS = 100
+# Columns written for each imported row, after the file's columns
+WRITE_COLUMNS = (*COLUMNS, "created_at", "updated_at")
+# Columns an upsert overwrites; created_at keeps the original creation time
+UPDATE_COLUMNS = ("name", "price", "description", "is_offer", "updated_at")
+
+Progress = Callable[[int, Optional[int]], None]
+
+class ImportRejected(Exception):
+    """Raised when an import has more invalid rows than allowed; nothing from it is kept."""
+    def __init__(self, message: str, errors: List[Dict[str, Any]]):
+        super().__init__(message)
+        self.errors = errors
+
+row_adapter = TypeAdapter(List[ItemImport])
+item_adapter = TypeAdapter(ItemImport)
+
+def validate_batch(batch: List[Row]) -> Tuple[List[ItemImport], List[Dict[str, Any]]]:
+    """Validate a batch of raw rows at once, falling back to row by row to report which rows are invalid."""
+    if not any(isinstance(raw, MalformedRow) for _, raw in batch):
+        try:
+            return row_adapter.validate_python([raw for _, raw in batch]), []
+        except ValidationError:
+            pass
+    items, errors = [], []
+    for number, raw in batch:
+        if isinstance(raw, MalformedRow):
+            errors.append({"row": number, "error": raw.error})
+            continue
+        try:
+            items.append(item_adapter.validate_python(raw))
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors())
+            errors.append({"row": number, "error": error})
+    return items, errors
+
+def quote(name: str) -> str:
+    return f'"{name}"'
+
+class ItemSink:
+    """Writes validated rows into the items table inside the import's transaction."""
+    def __init__(self, connection: BaseDBAsyncClient, mode: str, stamp: datetime):
+        self.connection = connection
+        self.mode = mode
+        self.stamp = stamp
+        self.table = ItemModel._meta.db_table
+
+    async def start(self) -> None:
+        """Prepare for the first batch."""
+
+    async def write(self, items: List[ItemImport]) -> None:
+        raise NotImplementedError
+
+    async def finish(self) -> int:
+        """Apply what was written and return the number of rows created or changed."""
+        raise NotImplementedError
+
+    def values(self, item: ItemImport) -> Tuple[Any, ...]:
+        return (
+            item.id or uuid.uuid4(), item.name, item.price, item.description, bool(item.is_offer), self.stamp, self.stamp,
+        )
+
+class PostgresItemSink(ItemSink):
+    """
+    Streams rows in with COPY FROM STDIN in binary format.
+
+    Inserts go straight into the items table. Upserts go into a temporary
+    staging table first, then into items with one INSERT ... ON CONFLICT,
+    which skips rows that would not change so their updated_at, and with it
+    delta sync, stays put.
+    """
+    staging = "items_import"
+
+    async def start(self) -> None:
+        self.copied = 0
+        if self.mode == UPSERT:
+            await self.connection.execute_script(
+                f"CREATE TEMPORARY TABLE {quote(self.staging)} ("
+                '"seq" BIGSERIAL, "id" UUID NOT NULL, "name" VARCHAR(255) NOT NULL, "price" DOUBLE PRECISION NOT NULL, '
+                '"description" TEXT, "is_offer" BOOL NOT NULL) ON COMMIT DROP'
+            )
+
+    async def write(self, items: List[ItemImport]) -> None:
+        import asyncpg
+
+        records = [self.values(item) for item in items]
+        async with self.connection.acquire_connection() as connection:
+            try:
+                if self.mode == INSERT:
+                    await connection.copy_records_to_table(self.table, records=records, columns=WRITE_COLUMNS)
+                else:
+                    await connection.copy_records_to_table(
+                        self.staging, records=[record[:len(COLUMNS)] for record in records], columns=COLUMNS,
+                    )
+            except asyncpg.IntegrityConstraintViolationError as e:
+                # Raw connections skip Tortoise's exception translation
+                raise IntegrityError(e) from e
+        self.copied += len(records)
+
+    async def finish(self) -> int:
+        if self.mode == INSERT:
+            return self.copied
+        columns = ", ".join(map(quote, COLUMNS))
+        updates = ", ".join(f"{quote(column)} = EXCLUDED.{quote(column)}" for column in UPDATE_COLUMNS)
+        current = ", ".join(f"{quote(self.table)}.{quote(column)}" for column in UPDATE_COLUMNS[:-1])
+        incoming = ", ".join(f"EXCLUDED.{quote(column)}" for column in UPDATE_COLUMNS[:-1])
+        # The last row for an ID in the file wins; ON CONFLICT cannot touch a row twice in one statement
+        _, rows = await self.connection.execute_query(
+            f"WITH written AS ("
+            f"INSERT INTO {quote(self.table)} ({', '.join(map(quote, WRITE_COLUMNS))}) "
+            f"SELECT DISTINCT ON (\"id\") {columns}, $1::timestamptz, $1::timestamptz "
+            f"FROM {quote(self.staging)} ORDER BY \"id\", \"seq\" DESC "
+            f"ON CONFLICT (\"id\") DO UPDATE SET {updates} "
+            f"WHERE ({current}) IS DISTINCT FROM ({incoming}) RETURNING 1"
+            f") SELECT count(*) AS written FROM written",
+            [self.stamp],
+        )
+        return rows[0]["written"]
+
+class ExecuteManyItemSink(ItemSink):
+    """
+    Writes each batch with one prepared INSERT run through executemany (SQLite).
+
+    Upserts use INSERT ... ON CONFLICT DO UPDATE, skipping rows that would
+    not change, like the Postgres sink. Rows written are counted by their
+    updated_at stamp, which trigger-maintained search tables do not inflate.
+    """
+    async def start(self) -> None:
+        executor = self.connection.executor_class(model=ItemModel, db=self.connection)
+        # Converters to the dialect's column types; passing the class skips auto_now handling
+        self.converters = [executor.column_map[column] for column in WRITE_COLUMNS]
+        placeholders = ", ".join("?" for _ in WRITE_COLUMNS)
+        self.sql = f"INSERT INTO {quote(self.table)} ({', '.join(map(quote, WRITE_COLUMNS))}) VALUES ({placeholders})"
+        if self.mode == UPSERT:
+            updates = ", ".join(f"{quote(column)} = excluded.{quote(column)}" for column in UPDATE_COLUMNS)
+            changed = " OR ".join(
+                f"{quote(self.table)}.{quote(column)} IS NOT excluded.{quote(column)}" for column in UPDATE_COLUMNS[:-1]
+            )
+            self.sql += f' ON CONFLICT ("id") DO UPDATE SET {updates} WHERE {changed}'
+
+    async def write(self, items: List[ItemImport]) -> None:
+        await self.connection.execute_many(self.sql, [
+            [convert(value, ItemModel) for convert, value in zip(self.converters, self.values(item))]
+            for item in items
+        ])
+
+    async def finish(self) -> int:
+        return await ItemModel.filter(updated_at=self.stamp).using_db(self.connection).count()
+
+async def import_item_file(
+    path: str,
+    file_format: str,
+    mode: str,
+    batch_size: int,
+    max_errors: int,
+    progress: Progress,
+) -> Dict[str, Any]:
+    """
+    Load an item file in one transaction, validating it batch by batch against ItemImport.
+
+    Invalid rows are skipped and listed in the result, up to max_errors of
+    them; one more rolls the whole import back. Every row written gets the
+    same created_at/updated_at, returned as ``updated_at`` so callers can find
+    the rows the import changed.
+
+    Raises:
+        FormatError: When the file cannot be read as its format.
+        ImportRejected: When more than max_errors rows are invalid.
+        IntegrityError: When an insert-mode import contains an existing ID.
+    """
+    stamp = timezone.now()
+    reader = read_batches(path, file_format, batch_size)
+    rows, invalid, errors = 0, 0, []
+    try:
+        async with in_transaction() as connection:
+            dialect = connection.capabilities.dialect
+            sink_class = PostgresItemSink if dialect == "postgres" else ExecuteManyItemSink
+            sink = sink_class(connection, mode, stamp)
+            await sink.start()
+            while True:
+                batch = await asyncio.to_thread(next, reader, None)
+                if batch is None:
+                    break
+                items, batch_errors = validate_batch(batch)
+                rows += len(batch)
+                invalid += len(batch_errors)
+                errors.extend(batch_errors[:MAX_REPORTED_ERRORS - len(errors)])
+                if invalid > max_errors:
+                    raise ImportRejected(f"{invalid} invalid row(s) by row {rows}, more than the {max_errors} allowed", errors)
+                if items:
+                    await sink.write(items)
+                progress(rows, None)
+            written = await sink.finish()
+    finally:
+        reader.close()
+    return {
+        "rows": rows,
+        "invalid": invalid,
+        "written": written,
+        "unchanged": rows - invalid - written,
+        "mode": mode,
+        "format": file_format,
+        "updated_at": stamp.isoformat(),
+        "errors": errors,
+    }
+
+async def copy_csv(queryset: QuerySet, path: str) -> int:
+    """Export a queryset to CSV with COPY TO STDOUT (Postgres), in the same layout as the CSV writer."""
+    columns = ", ".join(
+        '"is_offer"::text AS "is_offer"' if column == "is_offer" else quote(column) for column in COLUMNS
+    )
+    query = queryset.order_by(*Sort("created_at").ordering).values(*COLUMNS).sql()
+    connection = queryset._choose_db()
+    with open(path, "wb") as file:
+        async def write(data: bytes) -> None:
+            await asyncio.to_thread(file.write, data)
+
+        async with connection.acquire_connection() as raw:
+            status = await raw.copy_from_query(
+                f"SELECT {columns} FROM ({query}) AS export", output=write, format="csv", header=True,
+            )
+    # The command tag is "COPY <rows>"
+    return int(status.split()[-1])
+
+async def export_item_file(
+    queryset: QuerySet,
+    path: str,
+    file_format: str,
+    chunk_size: int,
+    row_group_size: int,
+    progress: Progress,
+) -> int:
+    """
+    Write the items of a queryset to a file in created_at order, returning the number of rows.
+
+    CSV on Postgres streams straight out of COPY. Otherwise rows are read in
+    keyset-ordered chunks of chunk_size and written by the format's writer in
+    a thread, so neither side holds more than a chunk.
+    """
+    if file_format == "csv" and queryset._choose_db().capabilities.dialect == "postgres":
+        rows = await copy_csv(queryset, path)
+        progress(rows, rows)
+        return rows
+
+    sort = Sort("created_at")
+    rows, cursor = 0, None
+    with open(path, "wb") as file:
+        writer = open_writer(file, file_format, row_group_size)
+        while True:
+            chunk = await keyset_after(queryset, cursor, sort).limit(chunk_size).values(*COLUMNS, sort.field)
+            if chunk:
+                await asyncio.to_thread(writer.write, chunk)
+                rows += len(chunk)
+                progress(rows, None)
+            if len(chunk) < chunk_size:
+                break
+            cursor = (chunk[-1][sort.field], chunk[-1]["id"])
+        await asyncio.to_thread(writer.close)
+    return rows
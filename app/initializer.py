@@ -1,14 +1,20 @@
 """Application initialization module."""
+import asyncio
 from inspect import getmembers
+from typing import Optional
 
 from fastapi import FastAPI
-from tortoise.contrib.fastapi import register_tortoise
+from tortoise import Tortoise, connections
 from tortoise.exceptions import DoesNotExist, IntegrityError, DBConnectionError
 from loguru import logger
 
-from app.config import tortoise_config
+from app.config import admission_config, compression_config, jobs_config, logging_config, metrics_config, tortoise_config
 from app.utils.api.router import TypedAPIRouter
 
+# Backoff between attempts to reach a database that was down at startup
+DB_RETRY_SECONDS = 1.0
+DB_RETRY_MAX_SECONDS = 30.0
+
 def init(app: FastAPI) -> None:
     """
     Initialize application components.
@@ -20,9 +26,30 @@ def init(app: FastAPI) -> None:
         logger.info("Initializing exception handlers...")
         init_exceptions_handlers(app)
         
+        logger.info("Initializing response compression...")
+        init_compression(app)
+
+        logger.info("Initializing admission control...")
+        init_admission(app)
+
+        logger.info("Initializing access log...")
+        init_access_log(app)
+
+        logger.info("Initializing metrics...")
+        init_metrics(app)
+
         logger.info("Initializing database...")
         init_db(app)
         
+        logger.info("Initializing background jobs...")
+        init_jobs(app)
+
+        logger.info("Initializing change feed...")
+        init_changes(app)
+
+        logger.info("Initializing health checks...")
+        init_health(app)
+
         logger.info("Initializing routers...")
         init_routers(app)
         
@@ -44,25 +71,267 @@ def init_exceptions_handlers(app: FastAPI) -> None:
     app.add_exception_handler(IntegrityError, tortoise_exception_handler)
     app.add_exception_handler(DBConnectionError, tortoise_exception_handler)
 
+def init_compression(app: FastAPI) -> None:
+    """
+    Initialize response compression.
+
+    Added before the access log and metrics middleware so that it runs inside
+    them, and they see the compressed responses.
+    
+    Args:
+        app: The FastAPI application instance.
+    """
+    from app.core.compression import CompressionMiddleware, available_encoders
+    from app.core.metrics import metrics
+
+    if not compression_config.enabled:
+        logger.info("Response compression disabled")
+        return
+
+    encoders = available_encoders()
+    preference = [name.strip() for name in compression_config.algorithms.split(",") if name.strip()]
+    missing = [name for name in preference if name not in encoders]
+    if missing:
+        logger.warning(f"Compression codecs not installed, not offered: {', '.join(missing)}")
+    levels = {
+        "gzip": compression_config.gzip_level,
+        "br": compression_config.brotli_quality,
+        "zstd": compression_config.zstd_level,
+    }
+    if metrics_config.enabled:
+        for name in preference:
+            if name in encoders:
+                metrics.compression_level.set(levels[name], (name,))
+
+    app.add_middleware(
+        CompressionMiddleware,
+        encoders=encoders,
+        levels=levels,
+        preference=preference,
+        content_types=[value.strip() for value in compression_config.content_types.split(",") if value.strip()],
+        min_size=compression_config.min_size,
+        metrics=metrics if metrics_config.enabled else None,
+    )
+
+def init_admission(app: FastAPI) -> None:
+    """
+    Initialize rate limiting and per-route concurrency caps.
+
+    Added after compression and before the access log and metrics middleware,
+    so shed requests never reach the routes but are still logged and counted.
+    
+    Args:
+        app: The FastAPI application instance.
+    """
+    from app.core.admission import AdmissionMiddleware, rate_limiter, route_limiters
+    from app.core.metrics import metrics
+
+    if not admission_config.enabled:
+        logger.info("Admission control disabled")
+        return
+
+    app.add_middleware(
+        AdmissionMiddleware,
+        router=app.router,
+        paths=[path.strip() for path in admission_config.paths.split(",") if path.strip()],
+        exclude_paths=[path.strip() for path in admission_config.exclude_paths.split(",") if path.strip()],
+        limiters=route_limiters,
+        rate_limiter=rate_limiter,
+        key_header=admission_config.key_header,
+        trust_forwarded=admission_config.trust_forwarded,
+        metrics=metrics if metrics_config.enabled else None,
+    )
+
+def init_access_log(app: FastAPI) -> None:
+    """
+    Initialize the access log middleware.
+    
+    Args:
+        app: The FastAPI application instance.
+    """
+    from app.core.logs import AccessLogMiddleware, parse_route_rates
+
+    if not logging_config.access_log:
+        logger.info("Access log disabled")
+        return
+
+    app.add_middleware(
+        AccessLogMiddleware,
+        sample_rate=logging_config.access_log_sample_rate,
+        route_rates=parse_route_rates(logging_config.access_log_route_rates),
+    )
+
+def init_metrics(app: FastAPI) -> None:
+    """
+    Initialize request, database and event loop metrics.
+    
+    Args:
+        app: The FastAPI application instance.
+    """
+    from app.core.metrics import EventLoopLagMonitor, MetricsMiddleware, SnapshotWriter, install_query_hooks, metrics, registry
+
+    if not metrics_config.enabled:
+        logger.info("Metrics disabled")
+        return
+
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    install_query_hooks(metrics.record_query)
+
+    monitor = EventLoopLagMonitor(metrics.event_loop_lag_seconds, interval=metrics_config.loop_lag_interval)
+    app.add_event_handler("startup", monitor.start)
+    app.add_event_handler("shutdown", monitor.stop)
+
+    if registry.store is not None:
+        writer = SnapshotWriter(registry, registry.store, interval=metrics_config.snapshot_interval)
+        app.add_event_handler("startup", writer.start)
+        app.add_event_handler("shutdown", writer.stop)
+        logger.info(f"Metrics of all workers merged through {metrics_config.multiprocess_dir}")
+
 def init_db(app: FastAPI) -> None:
     """
     Initialize database connection with Tortoise ORM.
+
+    The connection is opened on startup, after the Postgres host has been
+    resolved, so importing the application never touches the network. The
+    schema is not generated here: migrations are applied once per deploy by
+    ``python migrate.py upgrade`` (or on startup with DB_MIGRATE_ON_STARTUP),
+    and every worker only checks the schema version. If the database cannot
+    be reached, the worker starts anyway, unready, and keeps retrying.
     
     Args:
         app: The FastAPI application instance.
     """
-    try:
+    from app.core.health import health_monitor
+    from app.utils.db.migrations import migrate, schema_status
+
+    async def check_migrations() -> None:
+        db = connections.get("default")
+        if tortoise_config.migrate_on_startup:
+            applied = await migrate(db)
+            for migration in applied:
+                logger.info(f"Applied migration {migration.version:04d}_{migration.name}")
+            return
+        status = await schema_status(db)
+        if not status.up_to_date:
+            logger.warning(
+                f"Database schema is at version {status.current}, pending migrations: {status.pending}; "
+                "run `python migrate.py upgrade`"
+            )
+
+    retry_task: Optional[asyncio.Task] = None
+
+    async def connect() -> None:
+        await tortoise_config.resolve_host()
         logger.info(f"Registering Tortoise ORM with URL: {tortoise_config.db_url.replace(tortoise_config.db_url.split('@')[0].split('://')[-1], '******')}")
-        register_tortoise(
-            app,
-            db_url=tortoise_config.db_url,
-            generate_schemas=tortoise_config.generate_schemas,
-            modules=tortoise_config.modules,
-        )
+        await Tortoise.init(config=tortoise_config.to_config())
+        await check_migrations()
         logger.success("Database initialized successfully!")
-    except Exception as e:
-        logger.error(f"Failed to initialize database: {e}")
-        raise
+
+    async def discard_connections() -> None:
+        # One by one, since closing a client that never connected raises
+        for name in tortoise_config.to_config()["connections"]:
+            client = connections.discard(name)
+            if client is not None:
+                try:
+                    await client.close()
+                except Exception as e:
+                    logger.debug(f"Ignoring error closing database connection {name}: {e}")
+
+    async def retry_orm(error: Exception) -> None:
+        delay = DB_RETRY_SECONDS
+        while True:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, DB_RETRY_MAX_SECONDS)
+            try:
+                # Drop whatever the failed attempt left open before starting over
+                await discard_connections()
+                await connect()
+            except Exception as e:
+                logger.warning(f"Database still unavailable, retrying in {delay:.0f}s: {e}")
+                health_monitor.record_init_error(e)
+                error = e
+                continue
+            health_monitor.clear_init_error(error)
+            return
+
+    async def init_orm() -> None:
+        nonlocal retry_task
+        try:
+            await connect()
+        except Exception as e:
+            # Keep the worker up: the probes report the database failing and readiness stays
+            # false until a retry connects, rather than gunicorn restarting the worker in a loop
+            logger.error(f"Failed to initialize database: {e}")
+            health_monitor.record_init_error(e)
+            retry_task = asyncio.create_task(retry_orm(e))
+
+    async def close_orm() -> None:
+        if retry_task is not None and not retry_task.done():
+            retry_task.cancel()
+            await asyncio.gather(retry_task, return_exceptions=True)
+            await discard_connections()
+            return
+        await connections.close_all()
+
+    app.add_event_handler("startup", init_orm)
+    app.add_event_handler("shutdown", close_orm)
+
+def init_jobs(app: FastAPI) -> None:
+    """
+    Initialize the background job runner.
+
+    Registered after the database so jobs are only claimed once the ORM is
+    up. With JOBS_RUN_IN_APP=false the application only submits jobs, and
+    ``python worker.py`` runs them in separate processes.
+    
+    Args:
+        app: The FastAPI application instance.
+    """
+    from app.core.jobs import job_runner
+
+    if not jobs_config.enabled:
+        logger.info("Background jobs disabled")
+        return
+    if not jobs_config.run_in_app:
+        if jobs_config.backend == "memory":
+            logger.warning("Jobs use the in-process store but JOBS_RUN_IN_APP is false: submitted jobs will never run")
+        return
+
+    app.add_event_handler("startup", job_runner.start)
+    app.add_event_handler("shutdown", job_runner.stop)
+
+def init_changes(app: FastAPI) -> None:
+    """
+    Initialize the item change feed broadcaster.
+
+    Registered after the database, since the Postgres broadcaster opens its
+    LISTEN connection with the primary's credentials. Workers also evict
+    their in-process item cache entries from the events they hear, so only
+    the Postgres feed keeps several workers' caches consistent; start.py
+    warns when several workers run without it.
+    
+    Args:
+        app: The FastAPI application instance.
+    """
+    from app.core.changes import change_feed
+
+    app.add_event_handler("startup", change_feed.start)
+    app.add_event_handler("shutdown", change_feed.stop)
+
+def init_health(app: FastAPI) -> None:
+    """
+    Initialize the background dependency checks behind the health endpoints.
+
+    Registered after the database so the first checks run against an
+    initialised ORM; readiness stays false until they have completed.
+    
+    Args:
+        app: The FastAPI application instance.
+    """
+    from app.core.health import health_monitor
+
+    app.add_event_handler("startup", health_monitor.start)
+    app.add_event_handler("shutdown", health_monitor.stop)
 
 def init_routers(app: FastAPI) -> None:
     """
@@ -2,18 +2,19 @@
 Main application entry point for the FastAPI REST API with Tortoise ORM.
 """
 import os
-import sys
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from contextlib import asynccontextmanager
 
-from app.config import openapi_config
+from app.config import logging_config, openapi_config
+from app.core.health import health_monitor
+from app.core.logs import configure_logging
+from app.core.routers.health import router as health_router
 from app.initializer import init
 
 # Configure logger for better output
-logger.remove()
-logger.add(sys.stdout, level="INFO", format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}")
+configure_logging(logging_config)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -27,6 +28,10 @@ async def lifespan(app: FastAPI):
         logger.info(f"Working directory: {os.getcwd()}")
         logger.info(f"Environment variables: PORT={os.environ.get('PORT', 'not set')}")
         logger.info(f"Database: POSTGRES_HOST={os.environ.get('POSTGRES_HOST', 'not set')}")
+        # FastAPI ignores on_event hooks when a lifespan is set, so run the ones
+        # registered during init() (e.g. the ORM startup) explicitly
+        for handler in app.router.on_startup:
+            await handler()
         yield
     except Exception as e:
         logger.error(f"Error during startup: {e}")
@@ -34,7 +39,12 @@ async def lifespan(app: FastAPI):
     finally:
         # Shutdown logic
         logger.info("Shutting down application...")
+        # In reverse, so components stop before the database connections they use are closed
+        for handler in reversed(app.router.on_shutdown):
+            await handler()
         logger.info("==========================================")
+        # Flush records still queued for the writer thread
+        await logger.complete()
 
 # Create FastAPI application instance
 app = FastAPI(
@@ -44,30 +54,17 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 @app.get("/", tags=["Root"])
 async def read_root():
     """Root endpoint that returns a welcome message."""
-    logger.info("Root endpoint accessed")
     return {
         "message": "Welcome to the FastAPI REST API with Tortoise ORM",
         "status": "online",
         "documentation": "/docs"
     }
 
-@app.get("/health", tags=["Health"])
-async def health_check():
-    """Health check endpoint for monitoring."""
-    logger.info("Health check endpoint accessed")
-    return {"status": "healthy"}
+# Registered outside init() so the probes keep answering (and report why) if init fails
+app.include_router(health_router, prefix="/health", tags=["Health"])
 
 # Simple test endpoint to check environment variables
 @app.get("/debug", tags=["Debug"])
@@ -81,7 +78,6 @@ async def debug_info():
         "postgres_user": os.environ.get("POSTGRES_USER", "not set"),
         "postgres_db": os.environ.get("POSTGRES_DB", "not set"),
     }
-    logger.info(f"Debug endpoint accessed: {env_info}")
     return env_info
 
 try:
@@ -93,6 +89,17 @@ except Exception as e:
     logger.error(f"Failed to initialize application: {str(e)}")
     import traceback
     logger.error(traceback.format_exc())
-    # Don't raise the exception, let the application start anyway
-    # This allows the health endpoint to work even if database fails
-    pass 
\ No newline at end of file
+    # Don't raise the exception, let the application start anyway so the
+    # health endpoints can report the failure instead of the process dying
+    health_monitor.record_init_error(e) 
+
+# Added last so it is the outermost middleware: responses from the middleware init()
+# added, such as admission control's 429 and 503, carry CORS headers too, and
+# preflight requests are answered before they can be shed
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
@@ -0,0 +1,81 @@
+"""Initial schema: items with the indexes behind its list queries, and idempotency keys.
+
+Every statement is IF NOT EXISTS, so databases created by generate_schemas
+before migrations existed are adopted as they are.
+"""
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from app.utils.db.migrations import dialect_sql, run_sql
+
+POSTGRES = """
+CREATE TABLE IF NOT EXISTS "items" (
+    "id" UUID NOT NULL PRIMARY KEY,
+    "name" VARCHAR(255) NOT NULL,
+    "price" DOUBLE PRECISION NOT NULL,
+    "description" TEXT,
+    "is_offer" BOOL NOT NULL DEFAULT False,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+COMMENT ON TABLE "items" IS 'Item model for storing product or service data.';
+CREATE INDEX IF NOT EXISTS "items_created_at_idx" ON "items" ("created_at", "id");
+CREATE INDEX IF NOT EXISTS "items_price_idx" ON "items" ("price", "id");
+CREATE INDEX IF NOT EXISTS "items_name_idx" ON "items" ("name", "id");
+CREATE INDEX IF NOT EXISTS "items_offers_idx" ON "items" ("created_at", "id") WHERE "is_offer" = true;
+CREATE INDEX IF NOT EXISTS "items_name_prefix_idx" ON "items" ("name" text_pattern_ops);
+CREATE INDEX IF NOT EXISTS "items_search_idx" ON "items"
+    USING GIN ((to_tsvector('simple', coalesce("name", '') || ' ' || coalesce("description", ''))));
+
+CREATE TABLE IF NOT EXISTS "idempotency_keys" (
+    "key" VARCHAR(320) NOT NULL PRIMARY KEY,
+    "fingerprint" VARCHAR(64) NOT NULL,
+    "status_code" INT,
+    "body" BYTEA,
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "expires_at" TIMESTAMPTZ NOT NULL
+);
+COMMENT ON TABLE "idempotency_keys" IS 'Response stored for an Idempotency-Key, replayed when a request is retried.';
+CREATE INDEX IF NOT EXISTS "idx_idempotency_expires_ae52bb" ON "idempotency_keys" ("expires_at");
+"""
+
+SQLITE = """
+CREATE TABLE IF NOT EXISTS "items" (
+    "id" CHAR(36) NOT NULL PRIMARY KEY,
+    "name" VARCHAR(255) NOT NULL,
+    "price" REAL NOT NULL,
+    "description" TEXT,
+    "is_offer" INT NOT NULL DEFAULT 0,
+    "created_at" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+) /* Item model for storing product or service data. */;
+CREATE INDEX IF NOT EXISTS "items_created_at_idx" ON "items" ("created_at", "id");
+CREATE INDEX IF NOT EXISTS "items_price_idx" ON "items" ("price", "id");
+CREATE INDEX IF NOT EXISTS "items_name_idx" ON "items" ("name", "id");
+CREATE INDEX IF NOT EXISTS "items_offers_idx" ON "items" ("created_at", "id") WHERE "is_offer" = 1;
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(name, description, content='items', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, name, description) VALUES ('delete', old.rowid, old.name, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, name, description) VALUES ('delete', old.rowid, old.name, old.description);
+    INSERT INTO items_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+END;
+INSERT INTO items_fts(items_fts) SELECT 'rebuild'
+    WHERE (SELECT count(*) FROM items_fts_docsize) <> (SELECT count(*) FROM items);
+
+CREATE TABLE IF NOT EXISTS "idempotency_keys" (
+    "key" VARCHAR(320) NOT NULL PRIMARY KEY,
+    "fingerprint" VARCHAR(64) NOT NULL,
+    "status_code" INT,
+    "body" BLOB,
+    "created_at" TIMESTAMP NOT NULL,
+    "expires_at" TIMESTAMP NOT NULL
+) /* Response stored for an Idempotency-Key, replayed when a request is retried. */;
+CREATE INDEX IF NOT EXISTS "idx_idempotency_expires_ae52bb" ON "idempotency_keys" ("expires_at");
+"""
+
+async def upgrade(connection: BaseDBAsyncClient) -> None:
+    await run_sql(connection, dialect_sql(connection, postgres=POSTGRES, sqlite=SQLITE))
@@ -0,0 +1,33 @@
+"""Delta sync: an (updated_at, id) index on items, and tombstones for deleted items.
+
+The index is built inside the migration transaction, which blocks writes to
+items while it builds; on a large table, create it CONCURRENTLY by hand first
+and this migration skips it.
+"""
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from app.utils.db.migrations import dialect_sql, run_sql
+
+POSTGRES = """
+CREATE INDEX IF NOT EXISTS "items_updated_at_idx" ON "items" ("updated_at", "id");
+
+CREATE TABLE IF NOT EXISTS "item_deletions" (
+    "id" UUID NOT NULL PRIMARY KEY,
+    "deleted_at" TIMESTAMPTZ NOT NULL
+);
+COMMENT ON TABLE "item_deletions" IS 'Tombstone for a deleted item, so delta sync can report deletions.';
+CREATE INDEX IF NOT EXISTS "item_deletions_deleted_at_idx" ON "item_deletions" ("deleted_at", "id");
+"""
+
+SQLITE = """
+CREATE INDEX IF NOT EXISTS "items_updated_at_idx" ON "items" ("updated_at", "id");
+
+CREATE TABLE IF NOT EXISTS "item_deletions" (
+    "id" CHAR(36) NOT NULL PRIMARY KEY,
+    "deleted_at" TIMESTAMP NOT NULL
+) /* Tombstone for a deleted item, so delta sync can report deletions. */;
+CREATE INDEX IF NOT EXISTS "item_deletions_deleted_at_idx" ON "item_deletions" ("deleted_at", "id");
+"""
+
+async def upgrade(connection: BaseDBAsyncClient) -> None:
+    await run_sql(connection, dialect_sql(connection, postgres=POSTGRES, sqlite=SQLITE))
@@ -0,0 +1,54 @@
+"""Background jobs table."""
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from app.utils.db.migrations import dialect_sql, run_sql
+
+POSTGRES = """
+CREATE TABLE IF NOT EXISTS "jobs" (
+    "id" UUID NOT NULL PRIMARY KEY,
+    "type" VARCHAR(64) NOT NULL,
+    "status" VARCHAR(16) NOT NULL,
+    "payload" JSONB NOT NULL,
+    "result" JSONB,
+    "error" TEXT,
+    "progress" INT NOT NULL DEFAULT 0,
+    "total" INT,
+    "attempts" INT NOT NULL DEFAULT 0,
+    "max_attempts" INT NOT NULL,
+    "cancel_requested" BOOL NOT NULL DEFAULT False,
+    "run_at" TIMESTAMPTZ NOT NULL,
+    "locked_by" VARCHAR(64),
+    "locked_until" TIMESTAMPTZ,
+    "created_at" TIMESTAMPTZ NOT NULL,
+    "started_at" TIMESTAMPTZ,
+    "finished_at" TIMESTAMPTZ
+);
+COMMENT ON TABLE "jobs" IS 'Background job, such as an item import, export or reindex, run outside the request that submitted it.';
+CREATE INDEX IF NOT EXISTS "jobs_status_run_at_idx" ON "jobs" ("status", "run_at");
+"""
+
+SQLITE = """
+CREATE TABLE IF NOT EXISTS "jobs" (
+    "id" CHAR(36) NOT NULL PRIMARY KEY,
+    "type" VARCHAR(64) NOT NULL,
+    "status" VARCHAR(16) NOT NULL,
+    "payload" JSON NOT NULL,
+    "result" JSON,
+    "error" TEXT,
+    "progress" INT NOT NULL DEFAULT 0,
+    "total" INT,
+    "attempts" INT NOT NULL DEFAULT 0,
+    "max_attempts" INT NOT NULL,
+    "cancel_requested" INT NOT NULL DEFAULT 0,
+    "run_at" TIMESTAMP NOT NULL,
+    "locked_by" VARCHAR(64),
+    "locked_until" TIMESTAMP,
+    "created_at" TIMESTAMP NOT NULL,
+    "started_at" TIMESTAMP,
+    "finished_at" TIMESTAMP
+) /* Background job, such as an item import, export or reindex, run outside the request that submitted it. */;
+CREATE INDEX IF NOT EXISTS "jobs_status_run_at_idx" ON "jobs" ("status", "run_at");
+"""
+
+async def upgrade(connection: BaseDBAsyncClient) -> None:
+    await run_sql(connection, dialect_sql(connection, postgres=POSTGRES, sqlite=SQLITE))
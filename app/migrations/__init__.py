@@ -0,0 +1,5 @@
+"""Schema migrations, applied in version order by ``python migrate.py upgrade``.
+
+Each module is named ``NNNN_description.py`` and defines
+``async def upgrade(connection)``; see ``app.utils.db.migrations``.
+"""
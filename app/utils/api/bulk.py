@@ -0,0 +1,51 @@
+"""Request body utilities for bulk endpoints."""
+import json
+from typing import Any, Callable, Dict, List, Type
+
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def bulk_body(model: Type[Any], max_items: int) -> Callable:
+    """
+    Build a dependency that parses a JSON array or NDJSON request body into a list of models.
+
+    Args:
+        model: The Pydantic model (or plain type) each element is validated against.
+        max_items: Maximum number of elements accepted in one request.
+    """
+    adapter = TypeAdapter(List[model])
+
+    async def dependency(request: Request) -> List[Any]:
+        body = await request.body()
+        try:
+            if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+                raw = [json.loads(line) for line in body.splitlines() if line.strip()]
+            else:
+                raw = json.loads(body or b"[]")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Malformed request body: {e}")
+
+        if isinstance(raw, list) and len(raw) > max_items:
+            raise HTTPException(status_code=413, detail=f"Too many items in one request (max {max_items})")
+        try:
+            return adapter.validate_python(raw)
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+
+    return dependency
+
+def bulk_openapi(model: Type[Any]) -> Dict[str, Any]:
+    """Describe a bulk request body in OpenAPI for both JSON arrays and NDJSON."""
+    schema = TypeAdapter(List[model]).json_schema()
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schema},
+                NDJSON_MEDIA_TYPE: {"schema": schema},
+            },
+        }
+    }
@@ -0,0 +1,92 @@
+"""HTTP conditional request utilities."""
+import base64
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Response
+
+def item_etag(updated_at: datetime) -> str:
+    """Build a strong ETag that encodes the row version (its updated_at timestamp)."""
+    token = base64.urlsafe_b64encode(updated_at.isoformat().encode()).decode().rstrip("=")
+    return f'"{token}"'
+
+def parse_etag(etag: str) -> Optional[datetime]:
+    """Decode a strong ETag produced by item_etag, or return None if it is not one."""
+    etag = etag.strip()
+    if etag.startswith("W/") or len(etag) < 2 or not (etag.startswith('"') and etag.endswith('"')):
+        return None
+    token = etag[1:-1]
+    try:
+        return datetime.fromisoformat(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode())
+    except ValueError:
+        return None
+
+def parse_if_match(header: str) -> Optional[List[datetime]]:
+    """
+    Parse an If-Match header into the row versions it accepts.
+
+    Returns None for ``*`` (any version), otherwise the list of versions,
+    which is empty when no tag in the header is a valid ETag. Weak tags are
+    accepted: the compression middleware weakens item ETags only because the
+    encoded bytes differ, so they still name one exact row version.
+    """
+    if header.strip() == "*":
+        return None
+    versions = [parse_etag(tag.strip().removeprefix("W/")) for tag in header.split(",")]
+    return [version for version in versions if version is not None]
+
+def page_etag(versions: Iterable[Tuple[Any, datetime]], extra: str = "") -> str:
+    """Build a strong ETag for a list of items from each item's (id, updated_at) pair and any extra page data."""
+    digest = hashlib.sha256(extra.encode())
+    for item_id, updated_at in versions:
+        digest.update(f"{item_id}:{updated_at.isoformat()};".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+def http_date(value: datetime) -> str:
+    """Format a datetime as an HTTP-date, treating naive values as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    """Build the ETag and Last-Modified response headers."""
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+def is_not_modified(
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    last_modified: Optional[datetime],
+) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against the current validators.
+
+    If-None-Match takes precedence when present, as required by RFC 9110.
+    """
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        current = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP-dates only carry whole seconds
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]) -> Response:
+    """Build an empty 304 response carrying the current validators."""
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
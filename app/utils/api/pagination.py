@@ -0,0 +1,78 @@
+"""Keyset pagination utilities."""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Sequence, Tuple, Type
+
+from tortoise.expressions import Q
+from tortoise.models import Model
+from tortoise.queryset import QuerySet
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+class InvalidSortError(ValueError):
+    """Raised when a sort parameter names a column that cannot be sorted on."""
+
+class Sort(NamedTuple):
+    """A sort column and direction; rows are walked by (column, id) so positions are unique."""
+    field: str
+    descending: bool = False
+
+    @property
+    def token(self) -> str:
+        """The sort as written in a query string, e.g. ``-price``."""
+        return f"-{self.field}" if self.descending else self.field
+
+    @property
+    def ordering(self) -> Tuple[str, str]:
+        """Arguments for ``QuerySet.order_by``."""
+        prefix = "-" if self.descending else ""
+        return f"{prefix}{self.field}", f"{prefix}id"
+
+DEFAULT_SORT = Sort("created_at")
+
+def parse_sort(value: str, allowed: Sequence[str]) -> Sort:
+    """Parse a ``column`` or ``-column`` sort parameter against a whitelist of columns."""
+    sort = Sort(value[1:], True) if value.startswith("-") else Sort(value)
+    if sort.field not in allowed:
+        raise InvalidSortError(f"Cannot sort by {sort.field!r}, expected one of: {', '.join(allowed)}")
+    return sort
+
+def encode_cursor(value: Any, item_id: uuid.UUID, sort: Sort = DEFAULT_SORT) -> str:
+    """Encode a (sort value, id) position under a sort as an opaque URL-safe token."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([sort.token, value, str(item_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, model: Type[Model]) -> Tuple[Sort, Tuple[Any, uuid.UUID]]:
+    """
+    Decode a token produced by encode_cursor back into its sort and (sort value, id) position.
+
+    Cursors come from clients, so anything that does not decode to a sort
+    and a value of the sort column's type is rejected here rather than
+    failing in the query.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        token, value, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(token, str) or not isinstance(item_id, str) or value is None:
+            raise TypeError("cursor must hold a sort, a value and an id")
+        sort = parse_sort(token, list(model._meta.fields_map))
+        value = model._meta.fields_map[sort.field].to_python_value(value)
+        return sort, (value, uuid.UUID(item_id))
+    except Exception as e:
+        # Conversions raise ValueError, TypeError, tortoise's ValidationError or worse for crafted input
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+def keyset_after(queryset: QuerySet, cursor: Optional[Tuple[Any, uuid.UUID]], sort: Sort = DEFAULT_SORT) -> QuerySet:
+    """Restrict a queryset to rows strictly after the cursor position, in keyset order."""
+    if cursor:
+        value, item_id = cursor
+        op = "lt" if sort.descending else "gt"
+        queryset = queryset.filter(
+            Q(**{f"{sort.field}__{op}": value}) | Q(**{sort.field: value, f"id__{op}": item_id})
+        )
+    return queryset.order_by(*sort.ordering)
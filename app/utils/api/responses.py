@@ -0,0 +1,37 @@
+"""Fast JSON encoding for responses built from raw database rows."""
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Encode the non-JSON types Tortoise returns from ``values()``."""
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Encode content as compact JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode()
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with ``dumps``.
+
+    Returning one from a route skips FastAPI's response-model validation, so
+    the content must already have the documented shape.
+    """
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
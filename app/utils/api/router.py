@@ -1,10 +1,12 @@
 """Router utilities for FastAPI."""
 from typing import List
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 class TypedAPIRouter(BaseModel):
     """Router with additional metadata for easier management."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     router: APIRouter
     prefix: str = ""
     tags: List[str] = []
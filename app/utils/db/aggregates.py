@@ -0,0 +1,70 @@
+"""Counting and aggregate helpers that avoid full table scans where the database allows.
+
+Estimates come from Postgres planner statistics. Other dialects have none,
+so callers fall back to exact SQL aggregates there.
+"""
+import json
+from typing import Optional, Tuple, Type
+
+from tortoise.models import Model
+from tortoise.queryset import QuerySet
+
+# Rows read by a sampled average; enough for a stable mean on a dashboard
+SAMPLE_ROWS = 10000
+
+async def table_estimate(model: Type[Model]) -> Optional[int]:
+    """
+    Row count of a model's table from ``pg_class.reltuples``.
+
+    Returns None on other dialects, and when the table has not been analysed yet.
+    """
+    db = model._meta.db
+    if db.capabilities.dialect != "postgres":
+        return None
+    _, rows = await db.execute_query(
+        "SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = to_regclass($1)",
+        [model._meta.db_table],
+    )
+    estimate = rows[0]["estimate"] if rows else None
+    # -1 (Postgres 14+) or 0 means the table was never vacuumed or analysed
+    return estimate if estimate and estimate > 0 else None
+
+async def plan_estimate(queryset: QuerySet) -> Optional[int]:
+    """Rows the Postgres planner expects a queryset to return, or None on other dialects."""
+    db = queryset._choose_db()
+    if db.capabilities.dialect != "postgres":
+        return None
+    _, rows = await db.execute_query(f"EXPLAIN (FORMAT JSON) {queryset.sql()}")
+    plan = rows[0]["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+async def count_rows(queryset: QuerySet, exact: bool = False) -> Tuple[int, bool]:
+    """
+    Count the rows of a queryset, estimating unless an exact count is requested.
+
+    Returns:
+        A (count, exact) tuple; exact is True when the count is not an estimate.
+    """
+    if not exact:
+        estimate = await plan_estimate(queryset)
+        if estimate is not None:
+            return estimate, False
+    return await queryset.count(), True
+
+async def sampled_avg(model: Type[Model], field: str, estimate: int) -> Optional[float]:
+    """
+    Average of a column over a block sample of about SAMPLE_ROWS rows (Postgres only).
+
+    Returns None when sampling is unavailable or picked no rows.
+    """
+    db = model._meta.db
+    if db.capabilities.dialect != "postgres":
+        return None
+    percent = min(100.0, 100.0 * SAMPLE_ROWS / max(estimate, 1))
+    _, rows = await db.execute_query(
+        f'SELECT avg("{field}") AS value FROM "{model._meta.db_table}" TABLESAMPLE SYSTEM ($1)',
+        [percent],
+    )
+    return float(rows[0]["value"]) if rows and rows[0]["value"] is not None else None
@@ -0,0 +1,64 @@
+"""Portable index declarations for Tortoise model ``Meta.indexes``.
+
+Tortoise's own ``Index`` classes never emit ``IF NOT EXISTS``, so they fail
+when ``generate_schemas`` runs against an existing database, and the
+Postgres-specific ones are invalid on SQLite. These render per dialect.
+"""
+from typing import Any, Dict, Optional, Tuple, Type
+
+from pypika.terms import ValueWrapper
+from tortoise.indexes import Index
+from tortoise.models import Model
+
+class BTreeIndex(Index):
+    """B-tree index on one or more columns, optionally partial."""
+    def __init__(self, *, fields: Tuple[str, ...], name: str, condition: Optional[Dict[str, Any]] = None):
+        super().__init__(fields=fields, name=name)
+        self.condition = condition or {}
+
+    def column_sql(self, schema_generator: Any, field: str) -> str:
+        """Render one indexed column."""
+        return schema_generator.quote(field)
+
+    def get_sql(self, schema_generator: Any, model: Type[Model], safe: bool) -> str:
+        sql = "CREATE INDEX {exists}{name} ON {table} ({columns})".format(
+            exists="IF NOT EXISTS " if safe else "",
+            name=schema_generator.quote(self.name),
+            table=schema_generator.quote(model._meta.db_table),
+            columns=", ".join(self.column_sql(schema_generator, field) for field in self.fields),
+        )
+        if self.condition:
+            sql += " WHERE " + " AND ".join(
+                f"{schema_generator.quote(field)} = {self.literal_sql(schema_generator, value)}"
+                for field, value in self.condition.items()
+            )
+        return sql + ";"
+
+    @staticmethod
+    def literal_sql(schema_generator: Any, value: Any) -> str:
+        """
+        Render a condition value the way the dialect's queries compare it.
+
+        SQLite only uses a partial index when the query repeats its condition,
+        and Tortoise stores and filters booleans as 0/1 there.
+        """
+        if schema_generator.DIALECT == "sqlite" and isinstance(value, bool):
+            value = int(value)
+        return ValueWrapper(value).get_sql()
+
+class PrefixIndex(BTreeIndex):
+    """
+    B-tree index serving ``LIKE 'prefix%'`` lookups on Postgres.
+
+    Postgres only uses a b-tree for LIKE under the C collation, so the columns
+    get ``text_pattern_ops``. Other dialects run prefix lookups as ranges (see
+    ``app.utils.db.search.prefix_filter``) that any b-tree led by the column
+    serves, so nothing is created there.
+    """
+    def column_sql(self, schema_generator: Any, field: str) -> str:
+        return f"{super().column_sql(schema_generator, field)} text_pattern_ops"
+
+    def get_sql(self, schema_generator: Any, model: Type[Model], safe: bool) -> str:
+        if schema_generator.DIALECT != "postgres":
+            return ""
+        return super().get_sql(schema_generator, model, safe)
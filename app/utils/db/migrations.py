@@ -0,0 +1,162 @@
+"""Versioned schema migrations.
+
+Migrations are modules in ``app/migrations`` named ``NNNN_description.py``,
+each defining ``async def upgrade(connection)``. Pending migrations run in
+order inside one transaction, under a lock that makes concurrent runners
+(several containers starting a deploy at once) wait and then find nothing
+left to do. Applied versions are recorded in the ``schema_migrations`` table.
+"""
+import importlib
+import pkgutil
+import re
+import sqlite3
+from types import ModuleType
+from typing import Iterator, List, NamedTuple, Optional, Set
+
+from tortoise.backends.base.client import BaseDBAsyncClient
+from tortoise.exceptions import OperationalError
+from tortoise.transactions import in_transaction
+
+MIGRATIONS_PACKAGE = "app.migrations"
+MIGRATIONS_TABLE = "schema_migrations"
+# Arbitrary application-wide key for pg_advisory_xact_lock
+ADVISORY_LOCK_KEY = 721_004_118
+
+MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+class MigrationError(RuntimeError):
+    """Raised when migrations cannot be discovered or applied."""
+
+class Migration(NamedTuple):
+    """One migration module and the version it brings the schema to."""
+    version: int
+    name: str
+    module: ModuleType
+
+    @property
+    def description(self) -> str:
+        """First line of the migration's docstring."""
+        return (self.module.__doc__ or "").strip().split("\n")[0]
+
+class SchemaStatus(NamedTuple):
+    """Schema version of a database compared with the migrations shipped in the code."""
+    current: Optional[int]
+    latest: int
+    pending: List[int]
+
+    @property
+    def up_to_date(self) -> bool:
+        """Whether every migration in the code has been applied."""
+        return not self.pending
+
+def discover(package: str = MIGRATIONS_PACKAGE) -> List[Migration]:
+    """Load the migration modules of a package, ordered by version."""
+    module = importlib.import_module(package)
+    migrations = []
+    for info in pkgutil.iter_modules(module.__path__):
+        match = MODULE_NAME.match(info.name)
+        if match is None:
+            continue
+        migration_module = importlib.import_module(f"{package}.{info.name}")
+        if not callable(getattr(migration_module, "upgrade", None)):
+            raise MigrationError(f"Migration {info.name} does not define upgrade(connection)")
+        migrations.append(Migration(int(match.group(1)), match.group(2), migration_module))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise MigrationError(f"Duplicate migration versions in {package}: {versions}")
+    return migrations
+
+def statements(sql: str) -> Iterator[str]:
+    """
+    Split a SQL script into single statements.
+
+    Statements are run one by one because SQLite's script runner commits the
+    open transaction first. Trigger bodies, which contain semicolons, stay whole.
+    """
+    statement = ""
+    for line in sql.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            if statement.strip().rstrip(";").strip():
+                yield statement.strip()
+            statement = ""
+    if statement.strip():
+        yield statement.strip()
+
+async def run_sql(connection: BaseDBAsyncClient, sql: str) -> None:
+    """Run a SQL script statement by statement on a connection or transaction."""
+    for statement in statements(sql):
+        await connection.execute_query(statement)
+
+def dialect_sql(connection: BaseDBAsyncClient, **scripts: str) -> str:
+    """Pick the script written for the connection's dialect, e.g. ``dialect_sql(conn, postgres=..., sqlite=...)``."""
+    dialect = connection.capabilities.dialect
+    if dialect not in scripts:
+        raise MigrationError(f"No migration SQL for the {dialect} dialect")
+    return scripts[dialect]
+
+async def ensure_table(connection: BaseDBAsyncClient) -> None:
+    """Create the table recording applied migrations."""
+    await connection.execute_query(
+        f'CREATE TABLE IF NOT EXISTS "{MIGRATIONS_TABLE}" '
+        '("version" INT NOT NULL PRIMARY KEY, "name" VARCHAR(255) NOT NULL, "applied_at" TIMESTAMP NOT NULL)'
+    )
+
+async def applied_versions(connection: BaseDBAsyncClient) -> Set[int]:
+    """Versions recorded as applied, or an empty set before the first migration."""
+    try:
+        _, rows = await connection.execute_query(f'SELECT "version" FROM "{MIGRATIONS_TABLE}"')
+    except OperationalError:
+        return set()
+    return {row["version"] for row in rows}
+
+async def schema_status(connection: BaseDBAsyncClient, migrations: Optional[List[Migration]] = None) -> SchemaStatus:
+    """Compare the database's applied migrations with the ones in the code."""
+    migrations = discover() if migrations is None else migrations
+    applied = await applied_versions(connection)
+    return SchemaStatus(
+        current=max(applied, default=None),
+        latest=migrations[-1].version if migrations else 0,
+        pending=[migration.version for migration in migrations if migration.version not in applied],
+    )
+
+async def _lock(connection: BaseDBAsyncClient) -> None:
+    """Serialise migration runs for the rest of the transaction, and make sure the version table exists."""
+    if connection.capabilities.dialect == "postgres":
+        # Lock first: concurrent CREATE TABLE IF NOT EXISTS can still collide in the Postgres catalogue
+        await connection.execute_query(f"SELECT pg_advisory_xact_lock({ADVISORY_LOCK_KEY})")
+        await ensure_table(connection)
+    else:
+        # Any write takes SQLite's database write lock until the transaction ends
+        await ensure_table(connection)
+        await connection.execute_query(f'DELETE FROM "{MIGRATIONS_TABLE}" WHERE "version" IS NULL')
+
+async def migrate(
+    connection: BaseDBAsyncClient,
+    target: Optional[int] = None,
+    migrations: Optional[List[Migration]] = None,
+) -> List[Migration]:
+    """
+    Apply pending migrations up to target (default: all) in one transaction.
+
+    Returns:
+        The migrations applied by this call; empty when another runner got there first.
+    """
+    migrations = discover() if migrations is None else migrations
+    async with in_transaction(connection.connection_name) as transaction:
+        await _lock(transaction)
+        # Read after taking the lock, so a runner that waited sees what the other one applied
+        applied = await applied_versions(transaction)
+        pending = [
+            migration for migration in migrations
+            if migration.version not in applied and (target is None or migration.version <= target)
+        ]
+        for migration in pending:
+            await migration.module.upgrade(transaction)
+            # Version and name come from a module name matched against MODULE_NAME, so they are safe to inline
+            await transaction.execute_query(
+                f'INSERT INTO "{MIGRATIONS_TABLE}" ("version", "name", "applied_at") '
+                f"VALUES ({migration.version}, '{migration.name}', CURRENT_TIMESTAMP)"
+            )
+    return pending
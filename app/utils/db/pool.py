@@ -0,0 +1,88 @@
+"""Instrumented asyncpg backend for Tortoise ORM.
+
+Use ``app.utils.db.pool`` as the connection engine to get the stock asyncpg
+client with pool utilisation and acquire latency tracking.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from tortoise import connections
+from tortoise.backends.asyncpg.client import AsyncpgDBClient
+
+class PoolStats:
+    """Counters describing how connections are acquired from a pool."""
+    def __init__(self):
+        self.waiting = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.acquire_seconds_total = 0.0
+        self.acquire_seconds_max = 0.0
+
+    def record_acquire(self, seconds: float) -> None:
+        """Record the time spent waiting for one connection."""
+        self.acquired += 1
+        self.acquire_seconds_total += seconds
+        self.acquire_seconds_max = max(self.acquire_seconds_max, seconds)
+
+    def dict(self) -> dict:
+        """Convert the counters to a dict, including the mean acquire latency."""
+        return {
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "acquire_seconds_avg": self.acquire_seconds_total / self.acquired if self.acquired else 0.0,
+            "acquire_seconds_max": self.acquire_seconds_max,
+        }
+
+class InstrumentedPool:
+    """Proxy around an asyncpg pool that times every acquire."""
+    def __init__(self, pool: Any, stats: PoolStats):
+        self._pool = pool
+        self.stats = stats
+
+    async def acquire(self, *, timeout: Optional[float] = None) -> Any:
+        self.stats.waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = await self._pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.waiting -= 1
+        self.stats.record_acquire(time.perf_counter() - started)
+        return connection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+class InstrumentedAsyncpgDBClient(AsyncpgDBClient):
+    """Asyncpg client whose pool records utilisation and acquire latency."""
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.pool_stats = PoolStats()
+
+    async def create_pool(self, **kwargs: Any) -> InstrumentedPool:
+        return InstrumentedPool(await super().create_pool(**kwargs), self.pool_stats)
+
+    def pool_info(self) -> Dict[str, Any]:
+        """Describe the current pool utilisation."""
+        info = {"min_size": self.pool_minsize, "max_size": self.pool_maxsize, **self.pool_stats.dict()}
+        if self._pool is not None:
+            size = self._pool.get_size()
+            idle = self._pool.get_idle_size()
+            info.update(size=size, idle=idle, in_use=size - idle)
+        return info
+
+def pool_metrics() -> Dict[str, Any]:
+    """Collect pool utilisation for every initialised database connection."""
+    metrics = {}
+    for client in connections.all():
+        if isinstance(client, InstrumentedAsyncpgDBClient):
+            metrics[client.connection_name] = client.pool_info()
+        else:
+            metrics[client.connection_name] = {"engine": type(client).__name__, "pooled": False}
+    return metrics
+
+client_class = InstrumentedAsyncpgDBClient
@@ -0,0 +1,104 @@
+"""Read-replica routing for Tortoise ORM."""
+import math
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from fastapi import Cookie, Header, Response
+
+from app.config import tortoise_config
+
+# Connection the current request reads from; None means the primary
+read_connection: ContextVar[Optional[str]] = ContextVar("read_connection", default=None)
+# Cookie set on write responses holding the Unix time until which the client's reads stay on the primary
+STICKY_COOKIE = "read_primary_until"
+
+class ReplicaSelector:
+    """Pick a read replica per request, keeping a client's reads on the primary right after its writes."""
+    def __init__(self, names: List[str], strategy: str = "round_robin", sticky_seconds: float = 0.0):
+        self.names = names
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self.latency: Dict[str, float] = {}
+        self._next = 0
+
+    def sticky_until(self) -> Optional[float]:
+        """Unix time until which a client that writes now should read from the primary, or None when not needed."""
+        if not self.names or self.sticky_seconds <= 0:
+            return None
+        return time.time() + self.sticky_seconds
+
+    def choose(self, force_primary: bool = False, primary_until: Optional[float] = None) -> Optional[str]:
+        """
+        Return the replica connection name to read from, or None for the primary.
+
+        primary_until is the client's own sticky deadline from its last write,
+        so one client's writes never move other clients off the replicas.
+        """
+        if not self.names or force_primary:
+            return None
+        if primary_until is not None and time.time() < primary_until:
+            return None
+
+        if self.strategy == "least_latency":
+            # Replicas without samples yet sort first so every replica gets measured
+            return min(self.names, key=lambda name: self.latency.get(name, 0.0))
+        name = self.names[self._next % len(self.names)]
+        self._next += 1
+        return name
+
+    def record_latency(self, name: str, seconds: float, weight: float = 0.2) -> None:
+        """Fold one observed request latency into the replica's moving average."""
+        previous = self.latency.get(name)
+        self.latency[name] = seconds if previous is None else previous + weight * (seconds - previous)
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the replicas and their observed latency."""
+        return {
+            "replicas": self.names,
+            "strategy": self.strategy,
+            "sticky_seconds": self.sticky_seconds,
+            "latency_seconds": dict(self.latency),
+        }
+
+class ReplicaRouter:
+    """Tortoise database router sending reads to the replica chosen for the current request."""
+    def db_for_read(self, model: Any) -> Optional[str]:
+        return read_connection.get()
+
+    def db_for_write(self, model: Any) -> Optional[str]:
+        return None
+
+replica_selector = ReplicaSelector(
+    tortoise_config.replicas.connection_names,
+    strategy=tortoise_config.replicas.strategy,
+    sticky_seconds=tortoise_config.replicas.sticky_seconds,
+)
+
+def pinned_to_primary() -> bool:
+    """Whether the current request reads from the primary although replicas are configured, to see its own writes."""
+    return bool(replica_selector.names) and read_connection.get() is None
+
+async def use_read_replica(
+    x_read_primary: bool = Header(False, description="Read from the primary to see your own writes"),
+    read_primary_until: Optional[float] = Cookie(None, description="Set by write responses: read from the primary until then"),
+):
+    """Dependency routing the request's reads to a replica."""
+    # Each request runs in its own task context, so the value does not leak into other requests
+    name = replica_selector.choose(force_primary=x_read_primary, primary_until=read_primary_until)
+    read_connection.set(name)
+    started = time.perf_counter()
+    yield
+    if name:
+        replica_selector.record_latency(name, time.perf_counter() - started)
+
+async def use_primary(response: Response):
+    """Dependency for write handlers, keeping the writing client's reads on the primary afterwards."""
+    read_connection.set(None)
+    until = replica_selector.sticky_until()
+    if until is not None:
+        # Set before the handler runs, as headers added after it would miss the response
+        response.set_cookie(
+            STICKY_COOKIE, f"{until:.3f}", max_age=max(1, math.ceil(replica_selector.sticky_seconds)), httponly=True,
+        )
+    yield
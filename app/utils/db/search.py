@@ -0,0 +1,117 @@
+"""Index-backed text search for Tortoise models.
+
+Postgres matches a ``to_tsvector`` expression covered by a GIN index. SQLite
+matches an FTS5 table kept in sync with the model table by triggers. Both
+treat the query as plain words that must all be present.
+"""
+import sys
+from typing import Any, Tuple, Type
+
+from pypika.terms import Term, ValueWrapper
+from pypika.utils import format_alias_sql
+from tortoise.expressions import Q
+from tortoise.indexes import Index
+from tortoise.models import Model
+
+# Text search configuration used by both the index and the queries; they must match
+SEARCH_CONFIG = "simple"
+
+def search_vector_sql(fields: Tuple[str, ...], quote: str = '"') -> str:
+    """The Postgres tsvector expression over the given columns."""
+    document = " || ' ' || ".join(f"coalesce({quote}{field}{quote}, '')" for field in fields)
+    return f"to_tsvector('{SEARCH_CONFIG}', {document})"
+
+def fts_table(model: Type[Model]) -> str:
+    """Name of the SQLite FTS5 table shadowing a model table."""
+    return f"{model._meta.db_table}_fts"
+
+def fts_query(text: str) -> str:
+    """Quote every word so FTS5 treats user input as plain terms, never as query syntax."""
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in text.split())
+
+class TextSearchIndex(Index):
+    """
+    Full-text index over text columns.
+
+    Renders a GIN expression index on Postgres and an external-content FTS5
+    table with sync triggers on SQLite, rebuilt at schema generation if it has
+    fallen out of step with the table. Other dialects get no index.
+    """
+    def __init__(self, *, fields: Tuple[str, ...], name: str):
+        super().__init__(fields=fields, name=name)
+
+    def get_sql(self, schema_generator: Any, model: Type[Model], safe: bool) -> str:
+        exists = "IF NOT EXISTS " if safe else ""
+        table = model._meta.db_table
+        if schema_generator.DIALECT == "postgres":
+            return (
+                f'CREATE INDEX {exists}"{self.name}" ON "{table}" '
+                f"USING GIN (({search_vector_sql(tuple(self.fields))}));"
+            )
+        if schema_generator.DIALECT != "sqlite":
+            return ""
+
+        fts = fts_table(model)
+        columns = ", ".join(self.fields)
+        new_values = ", ".join(f"new.{field}" for field in self.fields)
+        old_values = ", ".join(f"old.{field}" for field in self.fields)
+        delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});"
+        insert = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new_values});"
+        return "\n".join([
+            f"CREATE VIRTUAL TABLE {exists}{fts} USING fts5({columns}, content='{table}', content_rowid='rowid');",
+            f"CREATE TRIGGER {exists}{fts}_ai AFTER INSERT ON {table} BEGIN {insert} END;",
+            f"CREATE TRIGGER {exists}{fts}_ad AFTER DELETE ON {table} BEGIN {delete} END;",
+            f"CREATE TRIGGER {exists}{fts}_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END;",
+            # Index rows written before the FTS table existed
+            f"INSERT INTO {fts}({fts}) SELECT 'rebuild' "
+            f"WHERE (SELECT count(*) FROM {fts}_docsize) <> (SELECT count(*) FROM {table});",
+        ])
+
+class TextSearchMatch(Term):
+    """Boolean SQL term that is true for rows matching a text search."""
+    def __init__(self, model: Type[Model], fields: Tuple[str, ...], text: str, dialect: str):
+        super().__init__()
+        self.model = model
+        self.fields = fields
+        self.text = text
+        self.dialect = dialect
+
+    def get_sql(self, with_alias: bool = False, **kwargs: Any) -> str:
+        table = self.model._meta.db_table
+        if self.dialect == "postgres":
+            query = ValueWrapper(self.text).get_sql()
+            sql = f"({search_vector_sql(self.fields)} @@ plainto_tsquery('{SEARCH_CONFIG}', {query}))"
+        elif self.dialect == "sqlite":
+            fts = fts_table(self.model)
+            query = ValueWrapper(fts_query(self.text)).get_sql()
+            sql = f'("{table}".rowid IN (SELECT rowid FROM {fts} WHERE {fts} MATCH {query}))'
+        else:
+            # No full-text index on this dialect: every word must be a substring of some column
+            matches = [
+                "(" + " OR ".join(
+                    f'"{table}"."{field}" LIKE {ValueWrapper("%" + word + "%").get_sql()}'
+                    for field in self.fields
+                ) + ")"
+                for word in self.text.split()
+            ]
+            sql = f"({' AND '.join(matches) or '1=1'})"
+        return format_alias_sql(sql, self.alias, **kwargs) if with_alias else sql
+
+def prefix_filter(field: str, prefix: str, dialect: str) -> Q:
+    """
+    Case-sensitive prefix match that can use a b-tree index on the column.
+
+    Postgres uses LIKE against a ``text_pattern_ops`` index. Elsewhere the
+    prefix becomes a range, because Tortoise wraps LIKE operands in a CAST
+    that SQLite cannot match to an index.
+    """
+    if dialect == "postgres":
+        return Q(**{f"{field}__startswith": prefix})
+    # The last code point has no successor: bump the character before it, or leave the range open
+    stem = prefix.rstrip(chr(sys.maxunicode))
+    if not stem:
+        return Q(**{f"{field}__gte": prefix})
+    last = ord(stem[-1])
+    # Surrogates cannot be encoded for the database, so the next character skips them
+    upper = stem[:-1] + chr(0xE000 if last + 1 == 0xD800 else last + 1)
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": upper})
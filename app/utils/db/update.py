@@ -0,0 +1,41 @@
+"""Single-statement update helpers for Tortoise models."""
+from typing import Any, Dict, Optional, Type
+
+from tortoise.expressions import Q
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+
+async def update_returning(
+    model: Type[Model],
+    pk: Any,
+    values: Dict[str, Any],
+    condition: Optional[Q] = None,
+) -> Optional[Model]:
+    """
+    Update only the given columns of one row and return the row as stored.
+
+    Postgres does this in a single ``UPDATE ... RETURNING *`` statement. Other
+    dialects run the UPDATE and re-read the row inside one transaction.
+
+    Args:
+        model: The Tortoise model class.
+        pk: Primary key of the row to update.
+        values: Column values to set.
+        condition: Extra filter the row must match (e.g. an expected version).
+
+    Returns:
+        The updated model instance, or None when no row matched.
+    """
+    queryset = model.filter(condition or Q(), pk=pk)
+    update = queryset.update(**values)
+    db = update._choose_db(True)
+    if db.capabilities.dialect == "postgres":
+        update._db = db
+        query = update.as_query().returning("*")
+        _, rows = await db.execute_query(str(query), update.values)
+        return model._init_from_db(**dict(rows[0])) if rows else None
+
+    async with in_transaction(db.connection_name) as connection:
+        if not await queryset.using_db(connection).update(**values):
+            return None
+        return await model.filter(pk=pk).using_db(connection).first()
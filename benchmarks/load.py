@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+"""
+Load benchmark: drive every /items endpoint in-process and report latency, RPS and memory.
+
+Seeds a database (a throwaway SQLite file by default, or any URL passed with
+--db, e.g. a disposable Postgres), runs each scenario through an in-process
+ASGI client at the given concurrency, and reports p50/p95/p99 latency,
+requests per second and the process's peak RSS. With --baseline the run is
+compared against stored results, and the exit code is 1 if any scenario
+regressed by more than --threshold.
+
+Examples:
+    python benchmarks/load.py --items 10000 --concurrency 32 --output load.json
+    python benchmarks/load.py --baseline load.json --threshold 0.15
+    python benchmarks/load.py --results load-new.json --baseline load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Keep logging off the measured path unless the caller asks for it
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("ACCESS_LOG_ENABLED", "false")
+# The seeded database is created fresh, so migrate it as the app starts
+os.environ.setdefault("DB_MIGRATE_ON_STARTUP", "true")
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+if TYPE_CHECKING:
+    # Imported for real in run(), once the environment above is set
+    import httpx
+
+Request = Callable[["httpx.AsyncClient", int], Awaitable["httpx.Response"]]
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MiB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+class Scenarios:
+    """Requests for each /items endpoint, sharing the IDs of the seeded items."""
+    def __init__(self, ids: List[str], seed: int):
+        self.ids = ids
+        self.random = random.Random(seed)
+        self.etags: Dict[str, str] = {}
+
+    def item(self) -> dict:
+        """A random ItemCreate body."""
+        number = self.random.randrange(1_000_000)
+        return {
+            "name": f"load {number}",
+            "price": number / 100,
+            "description": "load test item",
+            "is_offer": number % 3 == 0,
+        }
+
+    def all(self) -> Dict[str, Request]:
+        """Every scenario by name, in the order they run."""
+        return {
+            "list": lambda client, i: client.get("/items/", params={"limit": 50}),
+            "list_filtered": lambda client, i: client.get(
+                "/items/", params={"limit": 50, "price_min": 10, "price_max": 400, "is_offer": "true", "sort": "-price"},
+            ),
+            "list_count": lambda client, i: client.get("/items/", params={"limit": 50, "count": "estimated"}),
+            "search": lambda client, i: client.get("/items/", params={"limit": 20, "q": "seed"}),
+            "name_prefix": lambda client, i: client.get("/items/", params={"limit": 20, "name_prefix": "seed 1"}),
+            "stream": lambda client, i: client.get("/items/", params={"stream": "true", "name_prefix": "seed 2"}),
+            "stats": lambda client, i: client.get("/items/stats"),
+            "changes": lambda client, i: client.get("/items/changes", params={"limit": 50}),
+            "get": lambda client, i: client.get(f"/items/{self.random.choice(self.ids)}"),
+            "get_conditional": self.get_conditional,
+            "create": lambda client, i: client.post("/items/", json=self.item()),
+            "create_idempotent": lambda client, i: client.post(
+                "/items/", json={"name": "idempotent", "price": 1.0}, headers={"Idempotency-Key": f"load-{i % 50}"},
+            ),
+            "update": lambda client, i: client.put(
+                f"/items/{self.random.choice(self.ids)}", json={"price": self.random.randrange(1000) / 10},
+            ),
+            "bulk_create": lambda client, i: client.post("/items/bulk", json=[self.item() for _ in range(50)]),
+            "bulk_update": lambda client, i: client.patch(
+                "/items/bulk", json=[{"id": item_id, "is_offer": True} for item_id in self.random.sample(self.ids, 50)],
+            ),
+            "delete": self.delete,
+            "bulk_delete": self.bulk_delete,
+        }
+
+    async def get_conditional(self, client, i: int):
+        """Revalidate an item with the ETag from its last response, as a caching client does."""
+        item_id = self.random.choice(self.ids)
+        headers = {"If-None-Match": self.etags[item_id]} if item_id in self.etags else {}
+        response = await client.get(f"/items/{item_id}", headers=headers)
+        if "etag" in response.headers:
+            self.etags[item_id] = response.headers["etag"]
+        return response
+
+    async def delete(self, client, i: int):
+        """Create then delete an item, so the seeded ones stay available to the other scenarios."""
+        created = await client.post("/items/", json=self.item())
+        return await client.delete(f"/items/{created.json()['id']}")
+
+    async def bulk_delete(self, client, i: int):
+        """Create then bulk-delete a batch of items."""
+        created = await client.post("/items/bulk", json=[self.item() for _ in range(50)])
+        return await client.request("DELETE", "/items/bulk", json=[result["id"] for result in created.json()["results"]])
+
+async def seed(count: int) -> List[str]:
+    """Top the items table up to count rows and return every item ID."""
+    from tortoise import connections
+
+    from app.core.models.tortoise import Item as ItemModel
+
+    missing = count - await ItemModel.all().count()
+    if missing > 0:
+        generator = random.Random(count)
+        await ItemModel.bulk_create(
+            [
+                ItemModel(
+                    name=f"seed {index}",
+                    price=generator.randrange(100000) / 100,
+                    description=f"seed item number {index}",
+                    is_offer=index % 3 == 0,
+                )
+                for index in range(missing)
+            ],
+            batch_size=1000,
+        )
+    db = connections.get("default")
+    if db.capabilities.dialect == "postgres":
+        # Fresh planner statistics, so estimated counts behave as in production
+        await db.execute_script(f'ANALYZE "{ItemModel._meta.db_table}"')
+    return [str(item_id) for item_id in await ItemModel.all().values_list("id", flat=True)]
+
+async def run_scenario(client, request: Request, requests: int, concurrency: int) -> dict:
+    """Send requests from concurrency workers and summarise their latency."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            try:
+                response = await request(client, index)
+                failed = response.status_code >= 500 or response.status_code in (400, 404, 409, 422)
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "seconds": elapsed,
+        "rps": requests / elapsed,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "mean": statistics.fmean(latencies) * 1000,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+async def run(args: argparse.Namespace) -> dict:
+    """Start the app against DATABASE_URL, seed it and run the selected scenarios."""
+    import fastapi
+    import httpx
+    import pydantic
+    import tortoise
+
+    from app.main import app
+
+    async with app.router.lifespan_context(app):
+        ids = await seed(args.items)
+        scenarios = Scenarios(ids, args.seed).all()
+        names = args.scenarios or list(scenarios)
+        unknown = [name for name in names if name not in scenarios]
+        if unknown:
+            raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}; choose from {', '.join(scenarios)}")
+
+        transport = httpx.ASGITransport(app=app)
+        results = {}
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for name in names:
+                await run_scenario(client, scenarios[name], args.warmup, args.concurrency)
+                result = await run_scenario(client, scenarios[name], args.requests, args.concurrency)
+                results[name] = result
+                latency = result["latency_ms"]
+                print(
+                    f"{name:>18}: {result['rps']:>8.0f} req/s  p50 {latency['p50']:>7.2f}ms  "
+                    f"p95 {latency['p95']:>7.2f}ms  p99 {latency['p99']:>7.2f}ms  errors {result['errors']}"
+                )
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "fastapi": fastapi.__version__,
+            "pydantic": pydantic.VERSION,
+            "tortoise-orm": tortoise.__version__,
+            "database": os.environ["DATABASE_URL"].split("://")[0],
+            "items": args.items,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "scenarios": results,
+    }
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Compare scenarios present in both runs.
+
+    A scenario regresses when its RPS drops, or its p95 or p99 latency rises,
+    by more than threshold (a fraction of the baseline value).
+    """
+    regressions = []
+    print(f"\n{'scenario':>18}  {'rps':>18}  {'p95 ms':>18}  {'p99 ms':>18}")
+    for name, current in results["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        changes = {
+            "rps": (before["rps"], current["rps"], before["rps"] * (1 - threshold)),
+            "p95": (before["latency_ms"]["p95"], current["latency_ms"]["p95"], None),
+            "p99": (before["latency_ms"]["p99"], current["latency_ms"]["p99"], None),
+        }
+        cells = []
+        for metric, (old, new, floor) in changes.items():
+            change = (new - old) / old if old else 0.0
+            regressed = new < floor if floor is not None else change > threshold
+            cells.append(f"{old:>7.1f}->{new:>7.1f}{'!' if regressed else ' '}")
+            if regressed:
+                regressions.append(f"{name} {metric}: {old:.2f} -> {new:.2f} ({change:+.0%})")
+        print(f"{name:>18}  " + "  ".join(cells))
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="Database URL to seed and load; defaults to a throwaway SQLite file")
+    parser.add_argument("--items", type=int, default=10000, help="Items to seed before the run")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests per scenario before measuring")
+    parser.add_argument("--scenarios", nargs="+", help="Scenarios to run (default: all)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for request parameters")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--results", help="Compare these stored results instead of running the benchmark")
+    parser.add_argument("--baseline", help="Stored results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed regression as a fraction of the baseline")
+    args = parser.parse_args()
+
+    if args.results:
+        results = json.loads(Path(args.results).read_text())
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            os.environ["DATABASE_URL"] = args.db or f"sqlite://{directory}/load.sqlite3"
+            results = asyncio.run(run(args))
+        if args.output:
+            Path(args.output).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.threshold)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("\nNo regressions")
+
+if __name__ == "__main__":
+    main()
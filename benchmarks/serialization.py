@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Serialisation benchmark: item rows/second from the database to JSON bytes.
+
+Compares the pydantic path the item routes used before (from_queryset, then
+FastAPI's response-model validation and encoding) with the fast path
+(values() rows encoded straight to JSON bytes) on an in-memory SQLite table.
+
+Example:
+    python benchmarks/serialization.py --sizes 1000 10000 100000 --output serialization.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from tortoise import Tortoise, connections
+
+from app.core.models.pydantic import Item
+from app.core.models.tortoise import Item as ItemModel
+from app.utils.api.responses import dumps, orjson
+
+ITEM_FIELDS = tuple(Item.model_fields)
+RESPONSE_FIELD = create_response_field(name="response", type_=List[Item], mode="serialization")
+
+async def pydantic_path() -> bytes:
+    """from_queryset plus FastAPI's response-model validation, as the routes did before."""
+    items = await Item.from_queryset(ItemModel.all())
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=items)
+    return JSONResponse(content).body
+
+async def fast_path() -> bytes:
+    """values() rows encoded directly to JSON bytes."""
+    return dumps(await ItemModel.all().values(*ITEM_FIELDS))
+
+async def measure(path: Callable[[], Awaitable[bytes]], rows: int, repeat: int) -> dict:
+    """Run a serialisation path several times and report its throughput."""
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await path()
+        seconds.append(time.perf_counter() - started)
+    best = min(seconds)
+    return {
+        "seconds_min": best,
+        "seconds_median": statistics.median(seconds),
+        "rows_per_second": rows / best,
+        "bytes": len(body),
+    }
+
+async def run(sizes: List[int], repeat: int) -> dict:
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": ["app.core.models.tortoise"]})
+    await Tortoise.generate_schemas()
+    results = []
+    try:
+        for size in sizes:
+            missing = size - await ItemModel.all().count()
+            await ItemModel.bulk_create(
+                [
+                    ItemModel(name=f"item {index}", price=index * 0.5, description="benchmark row", is_offer=index % 3 == 0)
+                    for index in range(missing)
+                ],
+                batch_size=1000,
+            )
+            before = await measure(pydantic_path, size, repeat)
+            after = await measure(fast_path, size, repeat)
+            results.append({
+                "rows": size,
+                "pydantic": before,
+                "fast": after,
+                "speedup": after["rows_per_second"] / before["rows_per_second"],
+            })
+            print(
+                f"{size:>7} rows: pydantic {before['rows_per_second']:>10.0f} rows/s, "
+                f"fast {after['rows_per_second']:>10.0f} rows/s ({results[-1]['speedup']:.1f}x)"
+            )
+    finally:
+        await connections.close_all()
+    return {"encoder": "orjson" if orjson is not None else "json", "repeat": repeat, "results": results}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Row counts to measure")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path and size; the fastest is reported")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(sorted(args.sizes), args.repeat))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
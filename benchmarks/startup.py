@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Startup benchmark: time from process launch to the first healthy response.
+
+Example:
+    DATABASE_URL=sqlite://:memory: DB_MIGRATE_ON_STARTUP=true python benchmarks/startup.py --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def time_to_healthy(health_path: str, timeout: float) -> float:
+    """Start the app in a subprocess and return seconds until the health endpoint answers 200."""
+    port = free_port()
+    command = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    url = f"http://127.0.0.1:{port}{health_path}"
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode} before becoming healthy")
+            try:
+                with urllib.request.urlopen(url, timeout=0.5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            time.sleep(0.01)
+        raise TimeoutError(f"No healthy response from {url} within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def time_import() -> float:
+    """Return seconds taken to import the application module in a fresh interpreter."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Number of cold starts to measure")
+    parser.add_argument("--health-path", default="/health", help="Endpoint polled for readiness")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for each start")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    imports = [time_import() for _ in range(args.runs)]
+    starts = [time_to_healthy(args.health_path, args.timeout) for _ in range(args.runs)]
+    results = {
+        "runs": args.runs,
+        "health_path": args.health_path,
+        "import_seconds": {"min": min(imports), "median": statistics.median(imports), "max": max(imports)},
+        "time_to_healthy_seconds": {"min": min(starts), "median": statistics.median(starts), "max": max(starts)},
+        "samples": {"import_seconds": imports, "time_to_healthy_seconds": starts},
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "database_url_set": bool(os.environ.get("DATABASE_URL")),
+    }
+    print(json.dumps(results, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
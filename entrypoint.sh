@@ -1,10 +1,21 @@
 #!/bin/bash
 
-echo "======================================"
-echo "Running environment diagnostics..."
-python env_check.py
+# Diagnostics are slow (network probes, filesystem walks), so only run them on request
+if [ "${RUN_DIAGNOSTICS:-false}" = "true" ]; then
+    echo "======================================"
+    echo "Running environment diagnostics..."
+    python env_check.py
+fi
+# Apply schema migrations once per container start, before any worker serves traffic;
+# concurrent containers wait on a lock and find nothing left to do
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    echo "======================================"
+    echo "Applying database migrations..."
+    python migrate.py upgrade || exit 1
+fi
 echo "======================================"
 echo "Starting FastAPI application..."
-echo "Environment: PORT=$PORT"
+echo "Environment: PORT=$PORT SERVER_MODE=${SERVER_MODE:-development}"
 echo "======================================"
-exec python -m uvicorn app.main:app --host 0.0.0.0 --port $PORT 
\ No newline at end of file
+# start.py picks single-process or pre-fork multi-worker mode from SERVER_MODE
+exec python start.py
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Schema migration commands.
+
+Run `upgrade` once per deploy, before the workers start; concurrent runs wait
+on a lock and find nothing left to do. The application itself only checks the
+schema version at startup.
+
+Examples:
+    python migrate.py upgrade
+    python migrate.py upgrade --to 3
+    python migrate.py status
+    python migrate.py new add_item_sku
+    python migrate.py sql
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from loguru import logger
+from tortoise import Tortoise, connections
+from tortoise.utils import get_schema_sql
+
+from app.config import tortoise_config
+from app.utils.db.migrations import MIGRATIONS_PACKAGE, MigrationError, discover, migrate, schema_status
+
+ROOT = Path(__file__).resolve().parent
+MIGRATIONS_DIR = ROOT.joinpath(*MIGRATIONS_PACKAGE.split("."))
+
+TEMPLATE = '''"""{description}"""
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+from app.utils.db.migrations import dialect_sql, run_sql
+
+POSTGRES = """
+"""
+
+SQLITE = """
+"""
+
+async def upgrade(connection: BaseDBAsyncClient) -> None:
+    await run_sql(connection, dialect_sql(connection, postgres=POSTGRES, sqlite=SQLITE))
+'''
+
+async def connect() -> None:
+    """Open the ORM connections the application would use."""
+    await tortoise_config.resolve_host()
+    await Tortoise.init(config=tortoise_config.to_config())
+
+async def upgrade(args: argparse.Namespace) -> None:
+    """Apply pending migrations."""
+    applied = await migrate(connections.get("default"), target=args.to)
+    for migration in applied:
+        logger.info(f"Applied {migration.version:04d}_{migration.name}: {migration.description}")
+    logger.success(f"{len(applied)} migration(s) applied" if applied else "Schema is up to date")
+
+async def status(args: argparse.Namespace) -> None:
+    """Print the schema version and the pending migrations."""
+    migrations = discover()
+    current = await schema_status(connections.get("default"), migrations)
+    print(f"Current version: {current.current if current.current is not None else 'none'}")
+    print(f"Latest version:  {current.latest}")
+    for migration in migrations:
+        state = "pending" if migration.version in current.pending else "applied"
+        print(f"  {migration.version:04d}_{migration.name:<32} {state:<8} {migration.description}")
+    if not current.up_to_date:
+        sys.exit(1)
+
+async def sql(args: argparse.Namespace) -> None:
+    """Print the schema Tortoise would generate for the models, as a reference for writing migrations."""
+    print(get_schema_sql(connections.get("default"), safe=True))
+
+def new(args: argparse.Namespace) -> None:
+    """Create the next migration module from a template."""
+    migrations = discover()
+    version = migrations[-1].version + 1 if migrations else 1
+    path = MIGRATIONS_DIR / f"{version:04d}_{args.name}.py"
+    path.write_text(TEMPLATE.format(description=args.name.replace("_", " ").capitalize() + "."))
+    print(path.relative_to(ROOT))
+
+async def run(command, args: argparse.Namespace) -> None:
+    """Run a command with the ORM connected."""
+    await connect()
+    try:
+        await command(args)
+    finally:
+        await connections.close_all()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="Apply pending migrations")
+    upgrade_parser.add_argument("--to", type=int, help="Stop after this version (default: latest)")
+    commands.add_parser("status", help="Show applied and pending migrations; exits 1 when any are pending")
+    new_parser = commands.add_parser("new", help="Create the next migration module")
+    new_parser.add_argument("name", help="Short snake_case description, e.g. add_item_sku")
+    commands.add_parser("sql", help="Print the schema generated from the models")
+    args = parser.parse_args()
+
+    if args.command == "new":
+        if not args.name.isidentifier():
+            parser.error("name must be a snake_case identifier")
+        new(args)
+        return
+    handlers = {"upgrade": upgrade, "status": status, "sql": sql}
+    try:
+        asyncio.run(run(handlers[args.command], args))
+    except MigrationError as e:
+        logger.error(f"Migration failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,29 @@
 #!/usr/bin/env python
 """
-Startup script for the FastAPI application with automatic port detection.
+Startup script for the FastAPI application.
+
+SERVER_MODE=development runs a single uvicorn process with automatic port detection.
+SERVER_MODE=production runs a pre-fork gunicorn supervisor with uvicorn workers.
 """
+import math
 import os
+import shutil
 import socket
 import sys
+import tempfile
 import traceback
 import uvicorn
 from loguru import logger
 
+from app.config import (
+    admission_config, cache_config, changes_config, idempotency_config, metrics_config, server_config, tortoise_config,
+)
+from app.config.server import ServerSettings
+
+APP_MODULE = "app.main:app"
+# uvicorn worker that picks uvloop and httptools when they are installed
+WORKER_CLASS = "uvicorn.workers.UvicornWorker"
+
 def is_port_in_use(port):
     """Check if a port is in use."""
     try:
@@ -27,13 +42,151 @@ def find_available_port(start_port, max_attempts=10):
         port += 1
     return None
 
+def cpu_limit():
+    """
+    Number of CPUs this process may use.
+
+    Honours the cgroup CPU quota set by Docker/Coolify (v2, then v1) and the
+    scheduler affinity mask, falling back to os.cpu_count().
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            limit, period = f.read().split()[:2]
+            if limit != "max":
+                quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                limit = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if limit > 0 and period > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    if quota:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+def resolve_workers(settings: ServerSettings):
+    """Worker count from WEB_CONCURRENCY, or one per usable CPU when it is 0."""
+    workers = settings.workers or cpu_limit()
+    if settings.max_workers:
+        workers = min(workers, settings.max_workers)
+    return max(1, workers)
+
+def warn_per_process_state(workers):
+    """
+    Warn about backends that keep their state in each worker process when several run.
+
+    Only reads settings: importing app.core here would create its objects in
+    the supervisor, and every forked worker would inherit the same ones.
+    """
+    if workers <= 1:
+        return
+    if idempotency_config.backend == "memory":
+        logger.warning("IDEMPOTENCY_BACKEND=memory only deduplicates retries that reach the same worker; use database")
+    if admission_config.rate_limit and admission_config.backend == "memory":
+        logger.warning(f"RATE_LIMIT_BACKEND=memory gives each of the {workers} workers its own buckets; use redis")
+    postgres_feed = (
+        changes_config.enabled
+        and changes_config.backend in ("auto", "postgres")
+        and tortoise_config.db_url.startswith(("postgres://", "postgresql://", "asyncpg://"))
+    )
+    if cache_config.backend == "memory" and not postgres_feed:
+        logger.warning(
+            "CACHE_BACKEND=memory is not invalidated by other workers' writes without the Postgres change feed; "
+            "reads may be stale for CACHE_TTL_SECONDS. Use redis or none"
+        )
+
+def share_metrics(workers):
+    """
+    Give the workers a fresh directory to merge their metrics through, so a scrape reports all of them.
+
+    Set here before the workers start: gunicorn's inherit the settings
+    object, uvicorn's re-read the environment.
+    """
+    if workers <= 1 or not metrics_config.enabled:
+        return
+    directory = metrics_config.multiprocess_dir
+    if directory:
+        # Counters left by a previous run would be added to this one's
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+    else:
+        directory = tempfile.mkdtemp(prefix="metrics-")
+    metrics_config.multiprocess_dir = directory
+    os.environ["METRICS_MULTIPROCESS_DIR"] = directory
+
+def run_development(port):
+    """Run a single uvicorn process."""
+    uvicorn.run(
+        APP_MODULE,
+        host=server_config.host,
+        port=port,
+        log_level="info",
+        reload=False
+    )
+
+def run_production(port, workers):
+    """
+    Run a pre-fork gunicorn supervisor with uvicorn workers.
+
+    The supervisor binds the socket once (with SO_REUSEPORT when enabled) and
+    forks the workers, restarts any that exit or are recycled after
+    SERVER_MAX_REQUESTS, and on SIGTERM stops accepting connections and gives
+    in-flight requests SERVER_GRACEFUL_TIMEOUT seconds to finish.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        # gunicorn is unavailable on Windows; uvicorn's supervisor cannot recycle workers
+        logger.warning("gunicorn is not installed, falling back to uvicorn workers without recycling")
+        uvicorn.run(
+            APP_MODULE,
+            host=server_config.host,
+            port=port,
+            workers=workers,
+            loop="auto",
+            http="auto",
+            timeout_keep_alive=server_config.keepalive,
+            timeout_graceful_shutdown=server_config.graceful_timeout,
+            log_level="info",
+        )
+        return
+
+    class ProductionServer(BaseApplication):
+        """gunicorn application configured from the server settings."""
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from gunicorn.util import import_app
+            return import_app(APP_MODULE)
+
+    ProductionServer({
+        "bind": f"{server_config.host}:{port}",
+        "workers": workers,
+        "worker_class": WORKER_CLASS,
+        "max_requests": server_config.max_requests,
+        "max_requests_jitter": server_config.max_requests_jitter,
+        "graceful_timeout": server_config.graceful_timeout,
+        "keepalive": server_config.keepalive,
+        "reuse_port": server_config.reuse_port,
+        "accesslog": None,
+        "loglevel": "info",
+    }).run()
+
 if __name__ == "__main__":
     try:
-        # Print environment for debugging
-        logger.info("Environment variables:")
-        for key, value in os.environ.items():
-            if not key.startswith("PATH") and not key.startswith("LS_") and not key.startswith("PYTHON"):
-                logger.info(f"  {key}={value}")
+        production = server_config.mode == "production"
 
         # Get port from environment variable or use default
         port_str = os.environ.get("PORT", "3000")
@@ -45,8 +198,8 @@ if __name__ == "__main__":
             logger.error(f"Invalid PORT value: {port_str}. Using default port 3000.")
             requested_port = 3000
         
-        # If the port is in use, find an alternative
-        if is_port_in_use(requested_port):
+        # If the port is in use, find an alternative (in production the port must match the deployment)
+        if not production and is_port_in_use(requested_port):
             logger.warning(f"Port {requested_port} is already in use.")
             available_port = find_available_port(requested_port + 1)
             
@@ -60,20 +213,19 @@ if __name__ == "__main__":
         else:
             port = requested_port
         
-        # Run the server with the new app module path
-        logger.info(f"Starting server on port {port}")
-        logger.info(f"Working directory: {os.getcwd()}")
-        logger.info(f"Files in current directory: {os.listdir('.')}")
-        logger.info(f"App directory content: {os.listdir('./app') if os.path.exists('./app') else 'app directory not found'}")
-        
-        uvicorn.run(
-            "app.main:app",
-            host="0.0.0.0",
-            port=port,
-            log_level="info",
-            reload=False
-        )
+        if production:
+            workers = resolve_workers(server_config)
+            # Exported before the workers fork so each sizes its DB pool from the connection budget
+            os.environ["WEB_CONCURRENCY"] = str(workers)
+            logger.info(f"Starting production server on port {port} with {workers} workers")
+            warn_per_process_state(workers)
+            share_metrics(workers)
+            run_production(port, workers)
+        else:
+            logger.info(f"Starting development server on port {port}")
+            logger.info(f"Working directory: {os.getcwd()}")
+            run_development(port)
     except Exception as e:
         logger.error(f"Failed to start server: {e}")
         logger.error(traceback.format_exc())
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1)
@@ -0,0 +1,101 @@
+"""Read-replica routing and the sticky read-your-writes cookie, against two SQLite databases."""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DATA_DIR = Path(tempfile.mkdtemp(prefix="replicas-"))
+STICKY_SECONDS = 1.0
+
+# Settings are read on import, so the primary and replica stand-ins are configured first
+os.environ["DATABASE_URL"] = f"sqlite://{DATA_DIR / 'primary.db'}"
+os.environ["DB_READ_REPLICA_URLS"] = f"sqlite://{DATA_DIR / 'replica.db'}"
+os.environ["DB_REPLICA_STICKY_SECONDS"] = str(STICKY_SECONDS)
+os.environ["DB_MIGRATE_ON_STARTUP"] = "true"
+os.environ["CACHE_BACKEND"] = "memory"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from tortoise import connections  # noqa: E402
+
+from app.core.cache import item_cache, stats_cache  # noqa: E402
+from app.core.models.tortoise import Item as ItemModel  # noqa: E402
+from app.main import app  # noqa: E402
+from app.utils.db.migrations import migrate  # noqa: E402
+from app.utils.db.replicas import STICKY_COOKIE  # noqa: E402
+
+ITEM = {"name": "widget", "price": 1.5, "quantity": 3}
+
+def run(scenario):
+    """Run a scenario with the app started, the replica migrated and both databases empty."""
+    async def main():
+        async with app.router.lifespan_context(app):
+            replica = connections.get("replica_0")
+            # The replica never replicates here, standing in for one that lags indefinitely
+            await migrate(replica)
+            await ItemModel.all().delete()
+            await ItemModel.all().using_db(replica).delete()
+            await item_cache.clear()
+            await stats_cache.clear()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as writer, \
+                    httpx.AsyncClient(transport=transport, base_url="http://test") as other:
+                await scenario(writer, other, replica)
+    asyncio.run(main())
+
+def listed_ids(response: httpx.Response) -> list:
+    assert response.status_code == 200, response.text
+    return [item["id"] for item in response.json()["items"]]
+
+def test_reads_go_to_the_replica_unless_the_client_just_wrote():
+    async def scenario(writer, other, replica):
+        created = await writer.post("/items/", json=ITEM)
+        assert created.status_code == 201, created.text
+        assert STICKY_COOKIE in created.cookies
+        item_id = created.json()["id"]
+
+        # The writer sees its own write on the primary; other clients read the lagging replica
+        assert listed_ids(await writer.get("/items/")) == [item_id]
+        assert listed_ids(await other.get("/items/")) == []
+        # Asking for the primary explicitly works without the cookie
+        assert listed_ids(await other.get("/items/", headers={"X-Read-Primary": "true"})) == [item_id]
+
+        # Once the cookie's deadline passes, the writer is back on the replica
+        await asyncio.sleep(STICKY_SECONDS + 0.2)
+        assert listed_ids(await writer.get("/items/")) == []
+    run(scenario)
+
+def test_item_cache_is_filled_from_the_primary_only():
+    async def scenario(writer, other, replica):
+        created = await writer.post("/items/", json=ITEM)
+        item_id = created.json()["id"]
+        # A stale copy of the row on the replica must never reach the cache
+        await ItemModel.create(using_db=replica, **{**ITEM, "id": item_id, "name": "stale"})
+
+        response = await other.get(f"/items/{item_id}")
+        assert response.status_code == 200, response.text
+        assert response.json()["name"] == "widget"
+        assert b"widget" in await item_cache.get(item_id)
+    run(scenario)
+
+def test_clients_pinned_to_the_primary_skip_the_item_cache():
+    async def scenario(writer, other, replica):
+        created = await writer.post("/items/", json=ITEM)
+        item_id = created.json()["id"]
+        assert (await other.get(f"/items/{item_id}")).json()["name"] == "widget"
+
+        # A write by another process, whose eviction has not reached this worker yet
+        await ItemModel.filter(id=item_id).update(name="renamed")
+        assert (await other.get(f"/items/{item_id}")).json()["name"] == "widget"
+        assert (await writer.get(f"/items/{item_id}")).json()["name"] == "renamed"
+    run(scenario)
+
+def test_sticky_deadline_is_per_client():
+    async def scenario(writer, other, replica):
+        until = time.time() + STICKY_SECONDS
+        await writer.post("/items/", json=ITEM)
+        assert float(writer.cookies[STICKY_COOKIE]) >= until - 0.5
+        assert STICKY_COOKIE not in other.cookies
+    run(scenario)
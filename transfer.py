@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+"""
+Bulk item import and export.
+
+Moves the items table to and from CSV, NDJSON or Parquet files directly
+against the database, without going through the API: COPY on Postgres,
+batched executemany on SQLite. Memory use stays constant whatever the file
+size. The format is taken from the file extension unless --format is given.
+
+Examples:
+    python transfer.py export items.csv
+    python transfer.py export offers.parquet --is-offer true
+    python transfer.py import items.csv
+    python transfer.py import items.ndjson --mode insert --max-errors 10
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+from loguru import logger
+from tortoise import Tortoise, connections
+from tortoise.exceptions import IntegrityError
+
+from app.config import tortoise_config, transfer_config
+from app.core.routers.items import item_filters, publish_import
+from app.core.transfer import (
+    FORMATS,
+    MODES,
+    UPSERT,
+    FormatError,
+    ImportRejected,
+    available_formats,
+    detect_format,
+    export_item_file,
+    import_item_file,
+)
+
+async def connect() -> None:
+    """Open the ORM connections the application would use."""
+    await tortoise_config.resolve_host()
+    await Tortoise.init(config=tortoise_config.to_config())
+
+class ProgressLog:
+    """Progress callback logging rows done at most every few seconds."""
+    def __init__(self, interval: float = 5.0):
+        self.interval = interval
+        self.started = time.monotonic()
+        self._next = self.started + interval
+
+    def __call__(self, done: int, total=None) -> None:
+        now = time.monotonic()
+        if now >= self._next:
+            self._next = now + self.interval
+            rate = done / (now - self.started)
+            logger.info(f"{done} rows" + (f" of {total}" if total else "") + f" ({rate:,.0f} rows/s)")
+
+async def export(args: argparse.Namespace) -> None:
+    """Write the items matching the filters to a file."""
+    queryset = item_filters(
+        price_min=args.price_min, price_max=args.price_max, is_offer=args.is_offer, name_prefix=args.name_prefix, q=args.q,
+    )
+    started = time.monotonic()
+    rows = await export_item_file(
+        queryset, args.file, args.format, transfer_config.batch_size, transfer_config.row_group_size, ProgressLog(),
+    )
+    logger.success(f"Exported {rows} items to {args.file} in {time.monotonic() - started:.1f}s")
+
+async def load(args: argparse.Namespace) -> None:
+    """Load a file into the items table in one transaction."""
+    started = time.monotonic()
+    try:
+        result = await import_item_file(args.file, args.format, args.mode, args.batch_size, args.max_errors, ProgressLog())
+    except ImportRejected as e:
+        for error in e.errors:
+            logger.error(f"Row {error['row']}: {error['error']}")
+        raise SystemExit(f"Import rejected, nothing was written: {e}")
+    except (FormatError, IntegrityError) as e:
+        raise SystemExit(f"Import failed, nothing was written: {e}")
+    for error in result["errors"]:
+        logger.warning(f"Skipped row {error['row']}: {error['error']}")
+    logger.success(
+        f"Imported {args.file} in {time.monotonic() - started:.1f}s: {result['rows']} rows, {result['written']} written, "
+        f"{result['unchanged']} unchanged, {result['invalid']} invalid"
+    )
+    # With Postgres the change feed reaches the API's workers, which evict the imported items from their caches
+    await publish_import(datetime.fromisoformat(result["updated_at"]), result["written"])
+
+async def run(command, args: argparse.Namespace) -> None:
+    """Run a command with the ORM connected."""
+    await connect()
+    try:
+        await command(args)
+    finally:
+        await connections.close_all()
+
+def parse_bool(value: str) -> bool:
+    if value.lower() not in ("true", "false"):
+        raise argparse.ArgumentTypeError("expected true or false")
+    return value.lower() == "true"
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write items to a file")
+    export_parser.add_argument("file", help="File to write")
+    export_parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension)")
+    export_parser.add_argument("--price-min", type=float)
+    export_parser.add_argument("--price-max", type=float)
+    export_parser.add_argument("--is-offer", type=parse_bool)
+    export_parser.add_argument("--name-prefix")
+    export_parser.add_argument("--q", help="Full-text search over name and description")
+
+    import_parser = commands.add_parser("import", help="Load items from a file")
+    import_parser.add_argument("file", help="File to read")
+    import_parser.add_argument("--format", choices=FORMATS, help="File format (default: from the extension)")
+    import_parser.add_argument("--mode", choices=MODES, default=UPSERT, help="insert fails on an existing ID (default: upsert)")
+    import_parser.add_argument("--max-errors", type=int, default=0, help="Invalid rows to skip before rejecting the import")
+    import_parser.add_argument("--batch-size", type=int, default=transfer_config.batch_size, help="Rows validated and written at a time")
+    args = parser.parse_args()
+
+    args.format = args.format or detect_format(filename=args.file)
+    if args.format is None:
+        parser.error("cannot tell the format from the file name, pass --format")
+    if args.format not in available_formats():
+        parser.error(f"{args.format} support needs the pyarrow package")
+    handlers = {"export": export, "import": load}
+    try:
+        asyncio.run(run(handlers[args.command], args))
+    except SystemExit:
+        raise
+    except Exception as e:
+        logger.error(f"{args.command.capitalize()} failed: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
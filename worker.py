@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Background job worker.
+
+Runs the jobs the API submits in a separate process, so long imports and
+exports never compete with requests for the web workers' event loops. Start
+as many as needed against the same database, and set JOBS_RUN_IN_APP=false
+on the web service. Needs JOBS_BACKEND=database and, for exports, the same
+JOBS_FILES_DIR as the web service.
+
+Examples:
+    python worker.py
+    python worker.py --concurrency 4 --types items.import,items.export
+"""
+import argparse
+import asyncio
+import signal
+import sys
+
+from loguru import logger
+from tortoise import Tortoise, connections
+
+from app.config import jobs_config, tortoise_config
+from app.core.jobs import JobRunner, JobTypes, job_store, job_types
+# Importing the routers registers the job handlers they define
+import app.core.routers  # noqa: F401
+
+async def connect() -> None:
+    """Open the ORM connections the application would use."""
+    await tortoise_config.resolve_host()
+    await Tortoise.init(config=tortoise_config.to_config())
+
+async def run(args: argparse.Namespace) -> None:
+    """Run jobs until SIGINT or SIGTERM, then hand running jobs back to the queue."""
+    types = job_types
+    if args.types:
+        names = [name.strip() for name in args.types.split(",") if name.strip()]
+        unknown = [name for name in names if name not in job_types]
+        if unknown:
+            raise SystemExit(f"Unknown job types: {', '.join(unknown)}")
+        types = JobTypes(job_types.limits, job_types.max_attempts)
+        for name in names:
+            job_type = job_types[name]
+            types.register(name, job_type.max_attempts)(job_type.handler)
+
+    runner = JobRunner(
+        job_store,
+        types,
+        concurrency=args.concurrency,
+        poll_interval=jobs_config.poll_interval,
+        lease_seconds=jobs_config.lease_seconds,
+        backoff_seconds=jobs_config.backoff_seconds,
+        backoff_max_seconds=jobs_config.backoff_max_seconds,
+        retention_days=jobs_config.retention_days,
+        files_dir=jobs_config.files_dir,
+    )
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await connect()
+    try:
+        await runner.start()
+        await stop.wait()
+        logger.info("Stopping job worker...")
+        await runner.stop()
+    finally:
+        await connections.close_all()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--concurrency", type=int, default=jobs_config.concurrency,
+        help=f"Jobs run at once (default: JOBS_CONCURRENCY, {jobs_config.concurrency})",
+    )
+    parser.add_argument("--types", help="Comma-separated job types to run (default: all)")
+    args = parser.parse_args()
+
+    if jobs_config.backend != "database":
+        logger.error("The job worker needs JOBS_BACKEND=database to see jobs submitted by the API")
+        sys.exit(1)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()